@@ -159,7 +159,13 @@ def init_extra_listeners():
   """Initializes listeners for additional services"""
   from ggrc.automapper import register_automapping_listeners
   from ggrc.snapshotter.listeners import register_snapshot_listeners
+  from ggrc.utils.collection_versions import \
+      register_collection_version_listeners
+  from ggrc.utils.person_permissions import \
+      register_person_permissions_listeners
   register_automapping_listeners()
+  register_collection_version_listeners()
+  register_person_permissions_listeners()
   register_snapshot_listeners()
 
 
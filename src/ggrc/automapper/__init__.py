@@ -19,6 +19,7 @@ from ggrc.rbac.permissions import is_allowed_update
 from ggrc.services.common import get_cache
 from ggrc.services import signals
 from ggrc.utils import benchmark, with_nop
+from ggrc.utils import collection_versions
 
 
 # pylint: disable=invalid-name
@@ -171,6 +172,7 @@ class AutomapperGenerator(object):
           "automapping_id": automapping.id}
           for src, dst in self.auto_mappings
           if (src, dst) != original]))  # (src, dst) is sorted
+      collection_versions.mark_modified("Relationship")
       cache = get_cache(create=True)
       if cache:
         # Add inserted relationships into new objects collection of the cache,
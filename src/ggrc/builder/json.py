@@ -482,42 +482,48 @@ def walk_representation(obj):  # noqa
         yield value, index, obj
 
 
-def gather_queries(resource):
-  queries = []
-  for val, _, _ in walk_representation(resource):
-    if isinstance(val, LazyStubRepresentation):
-      queries.append((val.type, val.conditions))
-  return queries
-
-
-def reify_representation(resource, results, type_columns):
-  for val, key, obj in walk_representation(resource):
-    if isinstance(val, LazyStubRepresentation):
-      obj[key] = val.render(results, type_columns)
-  return resource
+def gather_stubs(resource):
+  """Get (stub, key, container) locations of all lazy stubs in resource."""
+  return [(val, key, obj) for val, key, obj in walk_representation(resource)
+          if isinstance(val, LazyStubRepresentation)]
 
 
 def publish_representation(resource):
-  queries = gather_queries(resource)
+  """Replace all lazy stubs in ``resource`` with stub representations.
 
-  if len(queries) == 0:
+  ``resource`` can be a single published object or any structure of them,
+  such as a whole collection. The stubs are deduplicated and resolved with a
+  single query, so callers should publish all objects of a response first
+  and then resolve them together.
+  """
+  stubs = gather_stubs(resource)
+  if not stubs:
     return resource
-  else:
-    results, type_columns, query = build_stub_union_query(queries)
-    rows = query.all()
-    for row in rows:
-      type_ = row[0]
-      for columns, matches in results[type_].items():
-        vals = tuple(row[type_columns[type_][c]] for c in columns)
-        if vals in matches:
-          matches[vals].append(row)
 
-    return reify_representation(resource, results, type_columns)
+  queries = {
+      (val.type, val.condition_key, val.condition_val): (val.type,
+                                                         val.conditions)
+      for val, _, _ in stubs
+  }
+  results, type_columns, query = build_stub_union_query(queries.values())
+  rows = query.all()
+  for row in rows:
+    type_ = row[0]
+    for columns, matches in results[type_].items():
+      vals = tuple(row[type_columns[type_][c]] for c in columns)
+      if vals in matches:
+        matches[vals].append(row)
+
+  for val, key, obj in stubs:
+    obj[key] = val.render(results, type_columns)
+  return resource
 
 
 class Builder(AttributeInfo):
   """JSON Dictionary builder for ggrc.models.* objects and their mixins."""
 
+  MAX_PUBLISH_PLANS = 1000
+
   def generate_link_object_for(
           self, obj, inclusions, include, inclusion_filter):
     """Generate a link object for this object. If there are property paths
@@ -635,62 +641,128 @@ class Builder(AttributeInfo):
       else:
         return None
 
+  def __init__(self, tgt_class):
+    super(Builder, self).__init__(tgt_class)
+    self._attr_publishers = {}
+    self._publish_plans = {}
+
   def publish_attr(
           self, obj, attr_name, inclusions, include, inclusion_filter):
-    class_attr = getattr(obj.__class__, attr_name)
-    result = None
+    publisher = self._get_attr_publisher(obj.__class__, attr_name)
+    return publisher(obj, inclusions, include, inclusion_filter)
+
+  def _get_attr_publisher(self, cls, attr_name):
+    """Get the cached publisher for ``attr_name`` of ``cls`` instances."""
+    publisher = self._attr_publishers.get((cls, attr_name))
+    if publisher is None:
+      publisher = self._compile_attr_publisher(cls, attr_name)
+      self._attr_publishers[(cls, attr_name)] = publisher
+    return publisher
+
+  def _compile_attr_publisher(self, cls, attr_name):
+    """Get a function that publishes ``attr_name`` of ``cls`` instances.
+
+    The kind of the class attribute is resolved once here, so the returned
+    function only has to access the data of the published object.
+    """
+    class_attr = getattr(cls, attr_name)
 
-    if attr_name in getattr(obj.__class__, "_custom_publish", {}):
+    if attr_name in getattr(cls, "_custom_publish", {}):
       # The attribute has a custom publish logic
-      result = obj.__class__._custom_publish[attr_name](obj)
-    elif isinstance(class_attr, AssociationProxy):
-      if getattr(class_attr, 'publish_raw', False):
+      custom_publish = cls._custom_publish[attr_name]
+      return lambda obj, inclusions, include, inclusion_filter: \
+          custom_publish(obj)
+
+    if isinstance(class_attr, AssociationProxy):
+      return self._compile_association_proxy_publisher(attr_name, class_attr)
+
+    if isinstance(class_attr, InstrumentedAttribute) and \
+            isinstance(class_attr.property, RelationshipProperty):
+      def publish_relationship(obj, inclusions, include, inclusion_filter):
+        return self.publish_relationship(
+            obj, attr_name, class_attr, inclusions, include, inclusion_filter)
+      return publish_relationship
+
+    if class_attr.__class__.__name__ == 'property':
+      return self._compile_property_publisher(attr_name)
+
+    return lambda obj, inclusions, include, inclusion_filter: \
+        getattr(obj, attr_name)
+
+  def _compile_association_proxy_publisher(self, attr_name, class_attr):
+    """Get a publisher for an association proxy attribute."""
+    if getattr(class_attr, 'publish_raw', False):
+      def publish_raw(obj, inclusions, include, inclusion_filter):
         published_attr = getattr(obj, attr_name)
         if hasattr(published_attr, "copy"):
-          result = published_attr.copy()
-        else:
-          result = published_attr
-      else:
-        result = self.publish_association_proxy(
-            obj, attr_name, class_attr, inclusions, include, inclusion_filter)
-    elif isinstance(class_attr, InstrumentedAttribute) and \
-            isinstance(class_attr.property, RelationshipProperty):
-      result = self.publish_relationship(
+          return published_attr.copy()
+        return published_attr
+      return publish_raw
+
+    def publish_association_proxy(obj, inclusions, include, inclusion_filter):
+      return self.publish_association_proxy(
           obj, attr_name, class_attr, inclusions, include, inclusion_filter)
-    elif class_attr.__class__.__name__ == 'property':
-      if not inclusions or include:
-        if getattr(obj, '{0}_id'.format(attr_name)):
-          result = LazyStubRepresentation(
-              getattr(obj, '{0}_type'.format(attr_name)),
-              getattr(obj, '{0}_id'.format(attr_name)))
-      else:
-        result = self.publish_link(
-            obj, attr_name, inclusions, include, inclusion_filter)
-    else:
-      result = getattr(obj, attr_name)
+    return publish_association_proxy
 
-    return result
+  def _compile_property_publisher(self, attr_name):
+    """Get a publisher for a polymorphic reference property."""
+    id_attr = '{0}_id'.format(attr_name)
+    type_attr = '{0}_type'.format(attr_name)
+
+    def publish_property(obj, inclusions, include, inclusion_filter):
+      if not inclusions or include:
+        if getattr(obj, id_attr):
+          return LazyStubRepresentation(
+              getattr(obj, type_attr), getattr(obj, id_attr))
+        return None
+      return self.publish_link(
+          obj, attr_name, inclusions, include, inclusion_filter)
+    return publish_property
 
   def _publish_attrs_for(
           self, obj, attrs, json_obj, inclusions=None, inclusion_filter=None,
           attribute_whitelist=None):
-    if inclusions is None:
-      inclusions = []
-    for attr in attrs:
-      if hasattr(attr, '__call__'):
-        attr_name = attr.attr_name
-      else:
-        attr_name = attr
-      local_inclusion = ()
-      for inclusion in inclusions:
-        if inclusion[0] == attr_name:
-          local_inclusion = inclusion
-          break
-      if attribute_whitelist and attr_name not in attribute_whitelist:
-        continue
-      json_obj[attr_name] = self.publish_attr(
-          obj, attr_name, local_inclusion[1:], len(local_inclusion) > 0,
-          inclusion_filter)
+    for attr_name, publisher, local_inclusions, include in \
+            self._get_publish_plan(
+                obj.__class__, attrs, inclusions, attribute_whitelist):
+      json_obj[attr_name] = publisher(
+          obj, local_inclusions, include, inclusion_filter)
+
+  def _get_publish_plan(self, cls, attrs, inclusions, attribute_whitelist):
+    """Get the cached list of attribute publishers for the given arguments.
+
+    Returns:
+      list of (attr_name, publisher, inclusions, include) tuples, one for
+      every published attribute.
+    """
+    if attribute_whitelist:
+      attribute_whitelist = frozenset(attribute_whitelist)
+    key = (cls, tuple(attrs), inclusions, attribute_whitelist)
+    plan = self._publish_plans.get(key)
+    if plan is None:
+      if len(self._publish_plans) >= self.MAX_PUBLISH_PLANS:
+        # inclusions come from request arguments, do not let them grow the
+        # cache without limits
+        self._publish_plans.clear()
+      plan = []
+      for attr in attrs:
+        if hasattr(attr, '__call__'):
+          attr_name = attr.attr_name
+        else:
+          attr_name = attr
+        local_inclusion = ()
+        for inclusion in inclusions or ():
+          if inclusion[0] == attr_name:
+            local_inclusion = inclusion
+            break
+        if attribute_whitelist and attr_name not in attribute_whitelist:
+          continue
+        plan.append((attr_name, self._get_attr_publisher(cls, attr_name),
+                     local_inclusion[1:], len(local_inclusion) > 0))
+      # cache the plan only when it is complete, so that an error in one of
+      # the publishers doesn't leave a partial plan behind
+      self._publish_plans[key] = plan
+    return plan
 
   def publish_attrs(self, obj, json_obj, extra_inclusions, inclusion_filter,
                     attribute_whitelist):
@@ -708,6 +780,9 @@ class Builder(AttributeInfo):
       ('directives')
       [('directives'),('cycles')]
       [('directives', ('audit_frequency','organization')),('cycles')]
+
+    Publishers for each combination of inclusions and whitelisted attributes
+    are compiled on first use and cached in the builder.
     """
     inclusions = tuple((attr,) for attr in self._include_links)
     inclusions = tuple(set(inclusions).union(set(extra_inclusions)))
@@ -24,6 +24,8 @@ class CacheManager:
                          before and after flush
     marked_for_<op>: dictionaries used in session event listeners after flush,
                      before and after commit
+    marked_for_invalidation: cache namespaces whose generations are
+                             incremented after commit
 
   Returns:
     None
@@ -51,7 +53,7 @@ class CacheManager:
     self.deleted = {}
     self.marked_for_add = {}
     self.marked_for_update = {}
-    self.marked_for_delete = []
+    self.marked_for_invalidation = set()
 
   def get_collection(self, category, resource, filter):
     """Get collection from cache.
@@ -201,4 +203,4 @@ class CacheManager:
     self.deleted = {}
     self.marked_for_add = {}
     self.marked_for_update = {}
-    self.marked_for_delete = []
+    self.marked_for_invalidation = set()
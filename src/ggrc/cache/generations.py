@@ -0,0 +1,101 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Generation counters of cached collection entries
+
+Cached representations of objects are stored under keys that contain the
+current generation of the resource namespace ("collection:<resource>"), e.g.
+"collection:controls:12@1503925000123". Incrementing the generation of a
+namespace makes all of its entries unreachable with a single memcache
+operation, the old entries are left to expire.
+
+Generations start at the current time in milliseconds, so that a counter
+evicted from memcache is not recreated with a value that has been used.
+"""
+
+import time
+
+GENERATION_PREFIX = "generation:"
+
+
+def _initial_value():
+  return int(time.time() * 1000)
+
+
+def get_namespace(key):
+  """Get the resource part of a collection cache key or None."""
+  parts = key.split(":")
+  if len(parts) == 3 and parts[0] == "collection":
+    return parts[0] + ":" + parts[1]
+  return None
+
+
+def versioned_key(key, generation):
+  """Get key of an entry in the given generation of its namespace."""
+  return "{}@{}".format(key, generation)
+
+
+def is_versioned(key):
+  """Check if the key is of an entry in a generation of its namespace."""
+  return "@" in key
+
+
+def get_generations(client, namespaces):
+  """Get current generations of namespaces, creating the missing ones.
+
+  Args:
+    client: memcache client
+    namespaces: iterable of namespace names
+
+  Returns:
+    dict with namespace as key and its generation as value, the value is None
+    if the generation is not available.
+  """
+  namespaces = set(namespaces)
+  if not namespaces:
+    return {}
+  keys = {GENERATION_PREFIX + namespace: namespace for namespace in namespaces}
+  generations = client.get_multi(keys.keys()) or {}
+  missing = [key for key in keys if generations.get(key) is None]
+  if missing:
+    for key in missing:
+      client.add(key, _initial_value())
+    generations.update(client.get_multi(missing) or {})
+  return {namespace: generations.get(key) for key, namespace in keys.items()}
+
+
+def get_snapshot_generations(client, namespaces):
+  """Get generations of namespaces and start a newer database snapshot.
+
+  Data read in the current transaction can be older than the generations
+  read now, so entries built from it could be stored under generations of
+  a commit the data doesn't contain. The transaction is ended after the
+  generations are read, so that the following queries read a snapshot that
+  contains every commit the generations were incremented for.
+
+  Returns:
+    dict like `get_generations`, or None if the transaction has uncommitted
+    changes and can't be ended. Entries must not be cached in that case.
+  """
+  from ggrc import db
+  from ggrc.utils import collection_versions
+  if collection_versions.has_changes(db.session):
+    return None
+  result = get_generations(client, namespaces)
+  db.session.commit()
+  return result
+
+
+def increment(client, namespaces):
+  """Increment generations of namespaces with a single memcache call.
+
+  Returns:
+    dict with namespace as key and its new generation as value
+  """
+  keys = {GENERATION_PREFIX + namespace: namespace for namespace in namespaces}
+  if not keys:
+    return {}
+  result = client.offset_multi(
+      {key: 1 for key in keys}, initial_value=_initial_value()) or {}
+  return {namespace: result.get(key) for key, namespace in keys.items()}
@@ -1,37 +1,177 @@
 # Copyright (C) 2017 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
-from collections import OrderedDict
-from cache import Cache
-from cache import all_cache_entries
-
 """
 LocalCache implements the caching mechanism that is local to
 the AppEngine instance
 """
 
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from cache import Cache
+from cache import all_cache_entries
+from ggrc import settings
+
+MISSING = object()
+
+
+def estimate_size(value):
+  """Estimate the memory used by a JSON like value in bytes."""
+  size = sys.getsizeof(value)
+  if isinstance(value, dict):
+    for key, item in value.iteritems():
+      size += estimate_size(key) + estimate_size(item)
+  elif isinstance(value, (list, tuple)):
+    for item in value:
+      size += estimate_size(item)
+  return size
+
+
+class LocalCacheEntries(object):
+  """Cache entries of a single resource with LRU eviction and TTL expiry.
+
+  Entries are kept in least recently used first order. When the number of
+  entries or their estimated size goes over the limits, least recently used
+  entries are evicted. A limit of 0 disables it.
+
+  The object is not thread-safe, LocalCache serializes access to it.
+
+  Attributes:
+    max_entries: maximal number of entries
+    max_bytes: maximal estimated size of all entries in bytes
+    ttl: default time to live of an entry in seconds
+    size: current estimated size of all entries in bytes
+    hits, misses, evictions, expirations: access counters
+  """
+
+  def __init__(self, max_entries=0, max_bytes=0, ttl=0):
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.ttl = ttl
+    self.items = OrderedDict()
+    self.size = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+  def __len__(self):
+    return len(self.items)
+
+  def get(self, key, now):
+    """Get value of key and mark it as recently used.
+
+    Returns:
+      stored value or MISSING if the key is not cached or has expired.
+    """
+    item = self.items.pop(key, None)
+    if item is None:
+      self.misses += 1
+      return MISSING
+    expires_at, size, value = item
+    if expires_at is not None and expires_at <= now:
+      self.size -= size
+      self.expirations += 1
+      self.misses += 1
+      return MISSING
+    self.items[key] = item
+    self.hits += 1
+    return value
+
+  def set(self, key, value, now, ttl=0):
+    """Store value of key and evict entries over the limits."""
+    self.discard(key)
+    size = estimate_size(value)
+    if self.max_bytes and size > self.max_bytes:
+      return
+    ttl = ttl or self.ttl
+    self.items[key] = (now + ttl if ttl else None, size, value)
+    self.size += size
+    while self.items and self._over_limits():
+      _, (_, evicted_size, _) = self.items.popitem(last=False)
+      self.size -= evicted_size
+      self.evictions += 1
+
+  def _over_limits(self):
+    """Check if the cache holds more entries or bytes than allowed."""
+    return bool((self.max_entries and len(self.items) > self.max_entries) or
+                (self.max_bytes and self.size > self.max_bytes))
+
+  def discard(self, key):
+    """Remove key if it is cached."""
+    item = self.items.pop(key, None)
+    if item is not None:
+      self.size -= item[1]
+
+  def clear(self):
+    """Remove all entries."""
+    self.items.clear()
+    self.size = 0
+
+  def keys(self, now):
+    """Get all keys that have not expired yet."""
+    for key, (expires_at, size, _) in self.items.items():
+      if expires_at is not None and expires_at <= now:
+        del self.items[key]
+        self.size -= size
+        self.expirations += 1
+    return self.items.keys()
+
+  def get_stats(self):
+    """Get size and access counters."""
+    return {
+        "entries": len(self.items),
+        "bytes": self.size,
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "expirations": self.expirations,
+    }
+
 
 class LocalCache(Cache):
   """ LocalCache inherits from cache and it provides caching mechanism that is
       local to a particular GGRC instance
 
+      Limits of every resource are taken from LOCAL_CACHE_RESOURCE_LIMITS
+      setting, which maps model plural names to dictionaries with any of
+      max_entries, max_bytes and ttl keys. Missing limits default to the
+      constructor arguments and then to the LOCAL_CACHE_<LIMIT> settings.
+
       Attributes:
-        cache_entries: Ordered dictionary containing resource id as key and
-        value as JSON object (dictionary)
+        cache_entries: Ordered dictionary containing cache key as key and
+        LocalCacheEntries of the resource as value
+        lock: lock serializing access to cache_entries
   """
 
   cache_entries = OrderedDict()
+  lock = threading.RLock()
 
-  def __init__(self):
+  def __init__(self, max_entries=None, max_bytes=None, ttl=None):
     self.name = 'local'
+    defaults = {
+        "max_entries": max_entries,
+        "max_bytes": max_bytes,
+        "ttl": ttl,
+    }
+    for limit, value in defaults.items():
+      if value is None:
+        defaults[limit] = getattr(
+            settings, "LOCAL_CACHE_" + limit.upper(), 0)
+    resource_limits = getattr(settings, "LOCAL_CACHE_RESOURCE_LIMITS", {})
 
     for cache_entry in all_cache_entries():
       if cache_entry.cache_type is self.name:
         self.supported_resources[cache_entry.model_plural] = \
             cache_entry.class_name
 
-    for key in self.supported_resources.keys():
-      self.cache_entries['collection:' + key] = {}
+    with self.lock:
+      for key in self.supported_resources.keys():
+        limits = dict(defaults, **resource_limits.get(key, {}))
+        self.cache_entries['collection:' + key] = LocalCacheEntries(**limits)
 
   def get_name(self):
     return self.name
@@ -56,18 +196,26 @@ class LocalCache(Cache):
     if cache_key is None:
       return None
 
-    entries = self.cache_entries.get(cache_key)
-    if entries is None:
-      return None
-
     ids, attrs = self.parse_filter(filter)
     if ids is None and attrs is None:
       return None
-    else:
+
+    with self.lock:
+      entries = self.cache_entries.get(cache_key)
+      if entries is None:
+        return None
+      now = time.time()
       if ids is None:
-        return self.get_data(entries.keys(), entries, attrs)
-      else:
-        return self.get_data(ids, entries, attrs)
+        ids = entries.keys(now)
+      values = OrderedDict()
+      for key in ids:
+        value = entries.get(key, now)
+        if value is MISSING:
+          #  ALL or None Policy: if a key is not in cache, stop processing and
+          #  continue as before going to Data-ORM layer
+          return None
+        values[key] = value
+    return self.get_data(values, attrs)
 
   def add(self, category, resource, data, expiration_time=0):
     """ Add data to local cache for the specified data
@@ -76,25 +224,27 @@ class LocalCache(Cache):
       category: collection or stub
       resource: regulation, controls, etc.
       data: dictionary containing ids and attrs
+      expiration_time: time to live of the added entries in seconds, the
+        default time to live of the resource is used if not set
 
     Returns:
       None on any errors
-      Mapping of DTO formatted string, e.g. JSON string representation
+      LocalCacheEntries of the resource
     """
     if not self.is_caching_supported(category, resource):
       return None
     cache_key = self.get_key(category, resource)
     if cache_key is None:
       return None
-    if self.cache_entries is None:
-      return None
-    entries = self.cache_entries.get(cache_key)
-    if entries is None:
-      return None
+    with self.lock:
+      entries = self.cache_entries.get(cache_key)
+      if entries is None:
+        return None
 
-    # TODO(dan): Should we perform deep copy of data
-    for key in data.keys():
-      entries[key] = data.get(key)
+      # TODO(dan): Should we perform deep copy of data
+      now = time.time()
+      for key, value in data.iteritems():
+        entries.set(key, value, now, expiration_time)
 
     return entries
 
@@ -113,43 +263,37 @@ class LocalCache(Cache):
 
     Returns:
       None on any errors
-      mapping of DTO formatted string, e.g. JSON string representation
+      LocalCacheEntries of the resource
     """
     if not self.is_caching_supported(category, resource):
       return None
     cache_key = self.get_key(category, resource)
     if cache_key is None:
       return None
-    if self.cache_entries is None:
-      return None
-    entries = self.cache_entries.get(cache_key)
-
-    for key in data.keys():
-      del entries[key]
+    with self.lock:
+      entries = self.cache_entries.get(cache_key)
+      if entries is None:
+        return None
+      for key in data.keys():
+        entries.discard(key)
 
     return entries
 
-  def get_data(self, keys, cacheitems, attrs):
-    """ Get data from cache for the given set of keys and attributes in cache
+  @staticmethod
+  def get_data(values, attrs):
+    """ Get data for the given set of attributes from cached values
         TODO(dan): all or none default policy is implemeted here, it should be
         in cachemanager
     Args:
-      keys: set of keys to search from local cache
-      cacheitems: cache entries
+      values: ordered mapping of keys to values found in local cache
       attrs:  set of attributes to search from local cache
 
     Returns:
-      None on any errors
       mapping of DTO formatted string, e.g. JSON string representation
     """
     data = OrderedDict()
 
-    for key in keys:
-      if key not in cacheitems:
-        #  ALL or None Policy: if a key is not in cache, stop processing and
-        #  continue as before going to Data-ORM layer
-        return None
-      attrvalues = cacheitems.get(key)
+    for key, attrvalues in values.iteritems():
       targetattrs = None
       if attrs is None and attrvalues is not None:
         targetattrs = attrvalues.keys()
@@ -168,12 +312,29 @@ class LocalCache(Cache):
 
     return data
 
+  def get_stats(self):
+    """ Get size and access counters of the cache
+
+    Returns:
+      dictionary with counters of every cached resource and their totals
+    """
+    with self.lock:
+      resources = {key: entries.get_stats()
+                   for key, entries in self.cache_entries.iteritems()}
+    total = {}
+    for stats in resources.values():
+      for name, value in stats.iteritems():
+        total[name] = total.get(name, 0) + value
+    return {"resources": resources, "total": total}
+
   def clean(self):
     """ Cleanup
     """
-    self.cache_entries.clear()
+    with self.lock:
+      for entries in self.cache_entries.values():
+        entries.clear()
 
   def __repr__(self):
     """ Print content of cache
     """
-    return str(self.cache_entries.keys()) + str(self.cache_entries.values())
+    return str(self.cache_entries.keys()) + str(self.get_stats())
@@ -5,6 +5,7 @@
 from google.appengine.api import memcache
 from cache import Cache
 from cache import all_cache_entries
+from ggrc.cache.tieredcache import TieredClient
 from collections import OrderedDict
 from copy import deepcopy
 
@@ -13,14 +14,21 @@ from copy import deepcopy
 
 """
 class MemCache(Cache):
-  def __init__(self):
+  def __init__(self, client=None, tiered=False):
+    """
+    Args:
+      client: memcache client to use instead of the App Engine one
+      tiered: put an instance local first tier in front of memcache
+    """
     self.name = 'memcache'
     self.client = None
 
     for cache_entry in all_cache_entries():
       if cache_entry.cache_type is self.name:
         self.supported_resources[cache_entry.model_plural]=cache_entry.class_name
-        self.memcache_client = memcache.Client()
+        self.memcache_client = client or memcache.Client()
+    if tiered:
+      self.memcache_client = TieredClient(self.memcache_client)
 
   def get_name(self):
     return self.name
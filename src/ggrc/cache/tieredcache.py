@@ -0,0 +1,206 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+TieredClient adds an instance local first tier in front of the memcache
+client
+
+Only collection entries ("collection:<resource>:<id>") are stored in the
+first tier (L1), all other keys go straight to memcache (L2). Reads that miss
+L1 fall through to L2 and fill L1. Deletes clear both tiers and increment the
+generation of the resource in memcache, which is used as the version stamp
+of its L1 entries. Before L1 is read, the stamps of the read resources are
+compared with the stamps L1 entries were stored with, and entries of
+resources changed by other instances are dropped.
+
+Entries stored under versioned keys ("collection:<resource>:<id>@<gen>") are
+never changed, readers look up the key of the current generation, so they
+are served from L1 without checking the stamps.
+"""
+
+import threading
+import time
+
+from ggrc import settings
+from ggrc.cache import generations
+from ggrc.cache.generations import get_namespace
+from ggrc.cache.localcache import LocalCacheEntries
+from ggrc.cache.localcache import MISSING
+
+
+class TieredClient(object):
+  """Memcache client wrapper with an instance local first tier.
+
+  L1 is shared by all clients in the instance. Any method that is not
+  defined here is passed to the memcache client unchanged.
+
+  Attributes:
+    l1: LocalCacheEntries with the local entries
+    versions: resource namespace to the stamp its L1 entries are valid for
+    last_sync: resource namespace to the time its stamp was last checked
+    lock: lock serializing access to l1, versions and last_sync
+  """
+
+  l1 = None
+  versions = {}
+  last_sync = {}
+  lock = threading.RLock()
+
+  def __init__(self, client, max_entries=None, max_bytes=None, ttl=None,
+               sync_interval=None):
+    self.client = client
+    if sync_interval is None:
+      sync_interval = getattr(settings, "MEMCACHE_L1_SYNC_INTERVAL", 0)
+    self.sync_interval = sync_interval
+    with self.lock:
+      if TieredClient.l1 is None:
+        TieredClient.l1 = LocalCacheEntries(
+            max_entries=self._get_limit(max_entries, "MAX_ENTRIES"),
+            max_bytes=self._get_limit(max_bytes, "MAX_BYTES"),
+            ttl=self._get_limit(ttl, "TTL"),
+        )
+
+  @staticmethod
+  def _get_limit(value, name):
+    if value is not None:
+      return value
+    return getattr(settings, "MEMCACHE_L1_" + name, 0)
+
+  def __getattr__(self, name):
+    return getattr(self.client, name)
+
+  def _drop_namespace(self, namespace):
+    """Remove all L1 entries of a resource."""
+    prefix = namespace + ":"
+    for key in self.l1.items.keys():
+      if key.startswith(prefix):
+        self.l1.discard(key)
+
+  def sync(self, namespaces):
+    """Drop L1 entries of resources that have been changed elsewhere."""
+    now = time.time()
+    with self.lock:
+      namespaces = [
+          namespace for namespace in set(namespaces)
+          if now - self.last_sync.get(namespace, 0) >= self.sync_interval
+      ]
+    if not namespaces:
+      return
+    stamps = generations.get_generations(self.client, namespaces)
+    with self.lock:
+      for namespace, stamp in stamps.iteritems():
+        if stamp is None or self.versions.get(namespace) != stamp:
+          self._drop_namespace(namespace)
+          self.versions[namespace] = stamp
+        if stamp is not None:
+          self.last_sync[namespace] = now
+
+  def _invalidate(self, keys):
+    """Remove keys from L1 and increment the stamps of their resources."""
+    namespaces = set()
+    with self.lock:
+      for key in keys:
+        namespace = get_namespace(key)
+        if namespace:
+          self.l1.discard(key)
+          namespaces.add(namespace)
+    stamps = generations.increment(self.client, namespaces)
+    with self.lock:
+      for namespace, stamp in stamps.iteritems():
+        known = self.versions.get(namespace)
+        if stamp is not None and known is not None and stamp == known + 1:
+          self.versions[namespace] = stamp
+        else:
+          # Other instances changed the resource as well
+          self._drop_namespace(namespace)
+          self.versions.pop(namespace, None)
+        self.last_sync.pop(namespace, None)
+
+  def _fill(self, values):
+    """Store values read from memcache in L1."""
+    now = time.time()
+    with self.lock:
+      for key, value in values.iteritems():
+        namespace = get_namespace(key)
+        if namespace and (generations.is_versioned(key) or
+                          self.versions.get(namespace) is not None):
+          self.l1.set(key, value, now)
+
+  def get_multi(self, keys, *args, **kwargs):
+    """Get values of keys from L1 and the missing ones from memcache.
+
+    Reads with extra memcache arguments, such as for_cas, skip L1.
+    """
+    if args or kwargs:
+      return self.client.get_multi(keys, *args, **kwargs)
+    keys = list(keys)
+    cached_keys = [key for key in keys if get_namespace(key)]
+    self.sync(get_namespace(key) for key in cached_keys
+              if not generations.is_versioned(key))
+    result = {}
+    now = time.time()
+    with self.lock:
+      for key in cached_keys:
+        value = self.l1.get(key, now)
+        if value is not MISSING:
+          result[key] = value
+    missing = [key for key in keys if key not in result]
+    if missing:
+      values = self.client.get_multi(missing) or {}
+      self._fill(values)
+      result.update(values)
+    return result
+
+  def get(self, key, *args, **kwargs):
+    """Get value of key from L1 or from memcache."""
+    if args or kwargs or not get_namespace(key):
+      return self.client.get(key, *args, **kwargs)
+    return self.get_multi([key]).get(key)
+
+  def add(self, key, value, *args, **kwargs):
+    """Add value to memcache, and to L1 if it has been added."""
+    result = self.client.add(key, value, *args, **kwargs)
+    if result and get_namespace(key):
+      if not generations.is_versioned(key):
+        self.sync([get_namespace(key)])
+      self._fill({key: value})
+    return result
+
+  def set(self, key, value, *args, **kwargs):
+    """Set value in memcache and drop the outdated L1 entry."""
+    result = self.client.set(key, value, *args, **kwargs)
+    self._invalidate([key])
+    return result
+
+  def cas(self, key, value, *args, **kwargs):
+    """Compare and set value in memcache and drop the outdated L1 entry."""
+    result = self.client.cas(key, value, *args, **kwargs)
+    self._invalidate([key])
+    return result
+
+  def cas_multi(self, mapping, *args, **kwargs):
+    """Compare and set values in memcache and drop outdated L1 entries."""
+    result = self.client.cas_multi(mapping, *args, **kwargs)
+    self._invalidate(mapping.keys())
+    return result
+
+  def delete(self, key, *args, **kwargs):
+    """Delete key from both tiers."""
+    result = self.client.delete(key, *args, **kwargs)
+    self._invalidate([key])
+    return result
+
+  def delete_multi(self, keys, *args, **kwargs):
+    """Delete keys from both tiers."""
+    keys = list(keys)
+    result = self.client.delete_multi(keys, *args, **kwargs)
+    self._invalidate(keys)
+    return result
+
+  def flush_all(self):
+    """Flush memcache and L1."""
+    with self.lock:
+      self.l1.clear()
+      self.versions.clear()
+      self.last_sync.clear()
+    return self.client.flush_all()
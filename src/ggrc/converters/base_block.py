@@ -21,6 +21,7 @@ from ggrc import db
 from ggrc import models
 from ggrc.rbac import permissions
 from ggrc.utils import benchmark
+from ggrc.utils import pending_revisions
 from ggrc.utils import structures
 from ggrc.converters import errors
 from ggrc.converters import get_shared_unique_rules
@@ -41,8 +42,6 @@ from ggrc_workflows.models.cycle_task_group_object_task import \
 # pylint: disable=invalid-name
 logger = getLogger(__name__)
 
-CACHE_EXPIRY_IMPORT = 600
-
 
 class BlockConverter(object):
   # pylint: disable=too-many-public-methods
@@ -581,8 +580,9 @@ class BlockConverter(object):
     try:
       modified_objects = get_modified_objects(db.session)
       import_event = log_event(db.session, None)
-      update_memcache_before_commit(
-          self, modified_objects, CACHE_EXPIRY_IMPORT)
+      if import_event and pending_revisions.is_enabled():
+        pending_revisions.flush_pending_revisions(event=import_event)
+      update_memcache_before_commit(self, modified_objects)
       db.session.commit()
       self._store_revision_ids(import_event)
       update_memcache_after_commit(self)
@@ -30,6 +30,7 @@ from ggrc.models import Standard
 from ggrc.models import all_models
 from ggrc.models.reflection import AttributeInfo
 from ggrc.rbac import permissions
+from ggrc.utils import collection_versions
 
 
 # pylint: disable=invalid-name
@@ -658,6 +659,7 @@ class ObjectPersonColumnHandler(UserColumnHandler):
     ObjectPerson.query.filter_by(
         personable_id=self.row_converter.obj.id,
         personable_type=self.row_converter.obj.__class__.__name__).delete()
+    collection_versions.mark_modified("ObjectPerson")
 
   def insert_object(self):
     if self.dry_run or not self.value:
@@ -715,6 +717,7 @@ class PersonUnmappingColumnHandler(ObjectPersonColumnHandler):
         # from ``ggrc_basic_permissions``. But it is the only way I found to
         # fix the issue, without massive refactoring.
         user_role.query.filter_by(person=person, context=context).delete()
+    collection_versions.mark_modified("ObjectPerson", "UserRole")
     self.dry_run = True
 
 
@@ -23,6 +23,7 @@ import sqlalchemy as sa
 
 from ggrc import db
 from ggrc import login
+from ggrc.fulltext import get_indexer
 from ggrc.utils import revisions as revision_utils
 from ggrc.utils import benchmark
 from ggrc.models import all_models as models
@@ -560,6 +561,12 @@ def store_data(attributes_data, index_data):
     db.session.execute(ATTRIBUTE_REPLACE_STATEMENT, attributes_data)
   if index_data:
     db.session.execute(INDEX_REPLACE_STATEMENT, index_data)
+    objects = collections.defaultdict(set)
+    for row in index_data:
+      objects[row["type"]].add(row["key"])
+    indexer = get_indexer()
+    for model_name, keys in objects.iteritems():
+      indexer.records_updated(model_name, keys)
   db.session.commit()
 
 
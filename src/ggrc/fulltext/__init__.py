@@ -42,6 +42,13 @@ class Indexer(object):
   def delete_record(self, key):
     raise NotImplementedError()
 
+  def records_updated(self, model_name, keys):
+    """Handle records of objects written directly to the index table.
+
+    Indexers that keep data derived from the records update it here.
+    """
+    pass
+
   def search(self, terms):
     raise NotImplementedError()
 
@@ -0,0 +1,130 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Deferred updates of the full text index.
+
+When DEFERRED_INDEXING is enabled, commits store the type and id of every
+object that needs to be reindexed in the `pending_reindex` table instead of
+updating its records. A background task started after the request drains
+the queue in batches of DEFERRED_INDEXING_BATCH_SIZE entries and reindexes
+every object once, no matter how many times it was queued.
+
+Commits reindex entries older than DEFERRED_INDEXING_STALENESS seconds
+themselves, so the index doesn't lag behind by more than that if background
+tasks are delayed or objects are changed outside of requests. Such entries
+were committed before the current transaction started, so their changes are
+visible to it.
+
+With the option disabled, which is the default and what tests use, records
+are updated synchronously before every commit.
+"""
+
+import datetime
+from collections import defaultdict
+from logging import getLogger
+
+import sqlalchemy as sa
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models.inflector import get_model
+from ggrc.models.pending_reindex import PendingReindex
+from ggrc.utils import benchmark
+
+
+# pylint: disable=invalid-name
+logger = getLogger(__name__)
+
+
+def is_enabled():
+  return getattr(settings, "DEFERRED_INDEXING", False)
+
+
+def get_batch_size():
+  return getattr(settings, "DEFERRED_INDEXING_BATCH_SIZE", 1000)
+
+
+def enqueue(session, models_ids):
+  """Queue objects for reindexing.
+
+  Args:
+    session: session the entries are inserted in
+    models_ids: dict of model name to ids of objects of the model
+  """
+  now = datetime.datetime.utcnow()
+  rows = [{"type": model_name, "key": id_, "created_at": now}
+          for model_name, ids in models_ids.iteritems() for id_ in ids]
+  if rows:
+    session.execute(PendingReindex.__table__.insert(), rows)
+    session.reindex_queued = True
+
+
+def reindex(models_ids):
+  """Update records of objects immediately.
+
+  Args:
+    models_ids: dict of model name to ids of objects of the model
+  """
+  db.session.expire_all()  # expire required to fix declared_attr cached value
+  for model_name, ids in models_ids.iteritems():
+    model = get_model(model_name)
+    if model is None:
+      logger.warning("Skipping reindex of invalid model: %s", model_name)
+      continue
+    model.bulk_record_update_for(ids)
+
+
+def flush_pending_reindex(limit=None, before=None):
+  """Reindex queued objects and remove their entries.
+
+  Entries are read in queue order and locked. All entries of the read
+  objects are removed, so an object queued by many commits is reindexed
+  once. The caller is responsible for committing the session.
+
+  Args:
+    limit: maximum number of entries read
+    before: if set, only entries created before this time are processed
+
+  Returns:
+    number of entries read.
+  """
+  table = PendingReindex.__table__
+  query = sa.select([table.c.type, table.c.key]).order_by(
+      table.c.id).with_for_update()
+  conditions = []
+  if before is not None:
+    conditions.append(table.c.created_at < before)
+  if conditions:
+    query = query.where(sa.and_(*conditions))
+  if limit is not None:
+    query = query.limit(limit)
+  rows = db.session.execute(query).fetchall()
+  if not rows:
+    return 0
+  with benchmark("Flush pending reindex"):
+    models_ids = defaultdict(set)
+    for model_name, id_ in rows:
+      models_ids[model_name].add(id_)
+    conditions.append(tuple_(table.c.type, table.c.key).in_(
+        list({tuple(row) for row in rows})))
+    db.session.execute(table.delete().where(sa.and_(*conditions)))
+    reindex(models_ids)
+  return len(rows)
+
+
+def drain():
+  """Reindex all queued objects, committing after every batch."""
+  while flush_pending_reindex(limit=get_batch_size()):
+    db.session.commit()
+
+
+def flush_stale():
+  """Reindex objects that have been queued for longer than allowed."""
+  staleness = getattr(settings, "DEFERRED_INDEXING_STALENESS", 300)
+  before = datetime.datetime.utcnow() - datetime.timedelta(seconds=staleness)
+  # The plain read doesn't lock, entries are locked only if some are stale.
+  oldest = db.session.query(sa.func.min(PendingReindex.created_at)).scalar()
+  if oldest is not None and oldest < before:
+    logger.info("Reindexing objects queued before %s", before)
+    flush_pending_reindex(limit=get_batch_size(), before=before)
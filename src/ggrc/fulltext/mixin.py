@@ -5,15 +5,30 @@
 import itertools
 from collections import namedtuple
 
+import sqlalchemy as sa
 from sqlalchemy import inspect, orm
 
 from ggrc import db
+from ggrc import settings
 
 from ggrc import fulltext
 
 
 ReindexRule = namedtuple("ReindexRule", ["model", "rule"])
 
+# Columns identifying an index record of an object and columns compared by
+# incremental updates
+RECORD_KEY = ("key", "property", "subproperty")
+RECORD_CONTENT = ("context_id", "tags", "content")
+
+
+def _bind_params(values):
+  """Prefix names of record values to match bind parameters of statements.
+
+  Bind parameters of update statements can't have the names of columns.
+  """
+  return {"_" + name: value for name, value in values.items()}
+
 
 # pylint: disable=too-few-public-methods
 class Indexed(object):
@@ -45,18 +60,33 @@ class Indexed(object):
   def get_reindex_pair(self):
     return (self.__class__.__name__, self.id)
 
+  @classmethod
+  def get_record_values_for(cls, ids):
+    """Return column values of index records of instances with given ids.
+
+    Data of all instances is prefetched before their records are built, see
+    RecordBuilder.prefetch.
+    """
+    instances = cls.indexed_query().filter(cls.id.in_(ids)).all()
+    indexer = fulltext.get_indexer()
+    keys = inspect(indexer.record_type).c
+    builder = indexer.get_builder(cls)
+    builder.prefetch(instances)
+    try:
+      records = [builder.as_record(i) for i in instances]
+    finally:
+      builder.clear_prefetched()
+    rows = itertools.chain(*[indexer.records_generator(i) for i in records])
+    return [{c.name: getattr(r, a) for a, c in keys.items()} for r in rows]
+
   @classmethod
   def get_insert_query_for(cls, ids):
     """Return insert class record query. It will return None, if it's empty."""
     if not ids:
       return
-    instances = cls.indexed_query().filter(cls.id.in_(ids))
-    indexer = fulltext.get_indexer()
-    keys = inspect(indexer.record_type).c
-    records = (indexer.fts_record_for(i) for i in instances)
-    rows = itertools.chain(*[indexer.records_generator(i) for i in records])
-    values = [{c.name: getattr(r, a) for a, c in keys.items()} for r in rows]
+    values = cls.get_record_values_for(ids)
     if values:
+      indexer = fulltext.get_indexer()
       return indexer.record_type.__table__.insert().values(values)
 
   @classmethod
@@ -71,14 +101,89 @@ class Indexed(object):
         indexer.record_type.key.in_(ids)
     )
 
+  @classmethod
+  def get_stored_values_for(cls, ids):
+    """Return stored index records of instances with given ids.
+
+    Returns:
+      dict of (key, property, subproperty) to (context_id, tags, content)
+    """
+    table = fulltext.get_indexer().record_type.__table__
+    rows = db.session.execute(sa.select([
+        table.c.key, table.c.property, table.c.subproperty,
+        table.c.context_id, table.c.tags, table.c.content,
+    ]).where(
+        table.c.type == cls.__name__
+    ).where(
+        table.c.key.in_(ids)
+    ))
+    return {tuple(row[:3]): tuple(row[3:]) for row in rows}
+
+  @classmethod
+  def get_record_changes_for(cls, ids):
+    """Compare new index records of instances with the stored ones.
+
+    Returns:
+      tuple of lists of column values of records to delete, to insert and
+      to update.
+    """
+    stored = cls.get_stored_values_for(ids)
+    to_insert = []
+    to_update = []
+    for values in cls.get_record_values_for(ids):
+      row_key = tuple(values[name] for name in RECORD_KEY)
+      stored_content = stored.pop(row_key, None)
+      if stored_content is None:
+        to_insert.append(values)
+      elif stored_content != tuple(values[name] for name in RECORD_CONTENT):
+        to_update.append(values)
+    to_delete = [dict(zip(RECORD_KEY, stored_key), type=cls.__name__)
+                 for stored_key in stored]
+    return to_delete, to_insert, to_update
+
+  @classmethod
+  def incremental_record_update_for(cls, ids):
+    """Write only the index records of instances that have changed.
+
+    Records are matched by key, property and subproperty. Obsolete records
+    are deleted first, so that records whose property names differ only in
+    case or trailing spaces can be inserted again.
+    """
+    if not ids:
+      return
+    table = fulltext.get_indexer().record_type.__table__
+    to_delete, to_insert, to_update = cls.get_record_changes_for(ids)
+    match = sa.and_(
+        table.c.type == sa.bindparam("_type"),
+        table.c.key == sa.bindparam("_key"),
+        table.c.property == sa.bindparam("_property"),
+        table.c.subproperty == sa.bindparam("_subproperty"),
+    )
+    if to_delete:
+      db.session.execute(table.delete().where(match), [
+          _bind_params(values) for values in to_delete
+      ])
+    if to_update:
+      db.session.execute(table.update().where(match).values(
+          context_id=sa.bindparam("_context_id"),
+          tags=sa.bindparam("_tags"),
+          content=sa.bindparam("_content"),
+      ), [_bind_params(values) for values in to_update])
+    if to_insert:
+      db.session.execute(table.insert().values(to_insert))
+
   @classmethod
   def bulk_record_update_for(cls, ids):
     """Bulky update index records for current class"""
-    delete_query = cls.get_delete_query_for(ids)
-    insert_query = cls.get_insert_query_for(ids)
-    for query in [delete_query, insert_query]:
-      if query is not None:
-        db.session.execute(query)
+    if getattr(settings, "FULLTEXT_INCREMENTAL_UPDATE", False):
+      cls.incremental_record_update_for(ids)
+    else:
+      delete_query = cls.get_delete_query_for(ids)
+      insert_query = cls.get_insert_query_for(ids)
+      for query in [delete_query, insert_query]:
+        if query is not None:
+          db.session.execute(query)
+    fulltext.get_indexer().records_updated(cls.__name__, ids)
 
   @classmethod
   def indexed_query(cls):
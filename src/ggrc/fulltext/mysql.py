@@ -23,8 +23,13 @@ from ggrc.models.inflector import get_model
 from ggrc.query import my_objects
 from ggrc.rbac import context_query_filter
 from ggrc.rbac import permissions
+from ggrc.fulltext import deferred
 from ggrc.fulltext.sql import SqlIndexer
 
+# Properties of records that are filtered by search terms
+SEARCHABLE_PROPERTIES = ('title', 'name', 'email', 'notes', 'description',
+                         'slug')
+
 
 # pylint: disable=too-few-public-methods
 class MysqlRecordProperty(db.Model):
@@ -55,8 +60,7 @@ class MysqlIndexer(SqlIndexer):
   @staticmethod
   def _get_filter_query(terms):
     """Get the whitelist of fields to filter in full text table."""
-    whitelist = MysqlRecordProperty.property.in_(
-        ['title', 'name', 'email', 'notes', 'description', 'slug'])
+    whitelist = MysqlRecordProperty.property.in_(SEARCHABLE_PROPERTIES)
 
     if not terms:
       return whitelist
@@ -80,7 +84,9 @@ class MysqlIndexer(SqlIndexer):
         if resources:
           resource_sql = and_(
               MysqlRecordProperty.type == model_name,
-              MysqlRecordProperty.key.in_(resources))
+              permissions.resource_query_filter(
+                  MysqlRecordProperty.key, permission_model or model_name,
+                  resources, permission_type))
         else:
           resource_sql = false()
 
@@ -234,7 +240,8 @@ Indexer = MysqlIndexer
 def update_indexer(session):  # pylint:disable=unused-argument
   """General function to update index
 
-  for all updated related instance before commit"""
+  for all updated related instance before commit. With deferred indexing
+  the instances are queued instead, see ggrc.fulltext.deferred."""
   models_ids_to_reindex = defaultdict(set)
   db.session.flush()
   for for_index in getattr(db.session, 'reindex_set', set()):
@@ -243,8 +250,12 @@ def update_indexer(session):  # pylint:disable=unused-argument
     type_name, id_value = for_index.get_reindex_pair()
     if type_name:
       models_ids_to_reindex[type_name].add(id_value)
-  db.session.expire_all()  # expire required to fix declared_attr cached value
   db.session.reindex_set = set()
+  if deferred.is_enabled():
+    deferred.enqueue(db.session, models_ids_to_reindex)
+    deferred.flush_stale()
+    return
+  db.session.expire_all()  # expire required to fix declared_attr cached value
   for model_name, ids in models_ids_to_reindex.iteritems():
     get_model(model_name).bulk_record_update_for(ids)
 
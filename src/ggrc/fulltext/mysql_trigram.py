@@ -0,0 +1,203 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Full text index engine with a trigram index for Mysql DB backend.
+
+MysqlIndexer filters records with `content LIKE '%term%'`, which can't use
+an index and scans all records of the searched types. TrigramIndexer keeps
+the trigrams of searchable properties of every object in the
+`fulltext_record_trigrams` table. A search first selects objects that have
+all trigrams of the term, and checks the LIKE condition only on records of
+these objects, so results are the same as with MysqlIndexer.
+
+Trigrams are recomputed from the stored records whenever records of an
+object are written, see `Indexer.records_updated`, and only the trigrams
+that differ from the stored ones are written. Terms that contain no literal
+part of three characters are searched without the trigram index.
+
+Enable with:
+
+  FULLTEXT_INDEXER = 'ggrc.fulltext.mysql_trigram.TrigramIndexer'
+
+and run a full reindex to build trigrams of existing records.
+"""
+
+import itertools
+import re
+
+from sqlalchemy import and_
+from sqlalchemy import select
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import db
+from ggrc.fulltext.mysql import MysqlIndexer
+from ggrc.fulltext.mysql import MysqlRecordProperty
+from ggrc.fulltext.mysql import SEARCHABLE_PROPERTIES
+from ggrc.utils import benchmark
+
+
+TRIGRAM_LENGTH = 3
+
+# Wildcards and escape character of LIKE patterns.
+LIKE_SPECIAL = re.compile(r"[%_\\]")
+
+
+# pylint: disable=too-few-public-methods
+class MysqlRecordTrigram(db.Model):
+  """Trigram of searchable records of an object.
+
+  Trigrams use the collation of the records, so that trigrams of a term
+  match every record that LIKE matches.
+  """
+  __tablename__ = 'fulltext_record_trigrams'
+
+  id = db.Column(db.Integer, primary_key=True)  # noqa
+  type = db.Column(db.String(64), nullable=False)
+  key = db.Column(db.Integer, nullable=False)
+  trigram = db.Column(db.String(TRIGRAM_LENGTH), nullable=False)
+
+  __table_args__ = (
+      db.Index('ix_fulltext_record_trigrams_trigram',
+               'trigram', 'type', 'key'),
+      db.Index('ix_fulltext_record_trigrams_object', 'type', 'key'),
+  )
+
+
+def get_trigrams(text):
+  """Get the set of lowercase trigrams of a text."""
+  text = text.lower()
+  return {text[i:i + TRIGRAM_LENGTH]
+          for i in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+def get_term_trigrams(terms):
+  """Get trigrams that every record matched by `LIKE '%terms%'` contains.
+
+  Only literal parts of the pattern between wildcards and escape
+  characters are used.
+  """
+  if not terms:
+    return set()
+  parts = LIKE_SPECIAL.split(unicode(terms))
+  return set(itertools.chain.from_iterable(get_trigrams(p) for p in parts))
+
+
+class TrigramIndexer(MysqlIndexer):
+  """Mysql indexer that looks up search candidates by trigrams."""
+
+  trigram_type = MysqlRecordTrigram
+
+  @staticmethod
+  def trigrams_generator(rows):
+    """Generate (key, trigram) pairs of objects from (key, content) rows."""
+    object_trigrams = {}
+    for key, content in rows:
+      if content:
+        trigrams = object_trigrams.setdefault(key, set())
+        trigrams.update(get_trigrams(content))
+    for key, trigrams in object_trigrams.iteritems():
+      for trigram in trigrams:
+        yield key, trigram
+
+  def get_trigram_changes(self, model_name, keys):
+    """Compare trigrams of the stored records with the stored trigrams.
+
+    Returns:
+      tuple of the list of ids of trigram rows to delete and the list of
+      (key, trigram) pairs to insert.
+    """
+    trigram_table = self.trigram_type.__table__
+    record_table = self.record_type.__table__
+    stored = {
+        (key, trigram): id_
+        for id_, key, trigram in db.session.execute(select([
+            trigram_table.c.id, trigram_table.c.key, trigram_table.c.trigram,
+        ]).where(and_(
+            trigram_table.c.type == model_name,
+            trigram_table.c.key.in_(keys),
+        )))
+    }
+    to_insert = []
+    for key_trigram in self.trigrams_generator(db.session.execute(select([
+        record_table.c.key, record_table.c.content,
+    ]).where(and_(
+        record_table.c.type == model_name,
+        record_table.c.key.in_(keys),
+        record_table.c.property.in_(SEARCHABLE_PROPERTIES),
+    )))):
+      if stored.pop(key_trigram, None) is None:
+        to_insert.append(key_trigram)
+    return stored.values(), to_insert
+
+  def records_updated(self, model_name, keys):
+    """Write the trigrams of objects that differ from the stored ones."""
+    keys = list(keys)
+    if not keys:
+      return
+    trigram_table = self.trigram_type.__table__
+    with benchmark("Update trigrams for %s" % model_name):
+      to_delete, to_insert = self.get_trigram_changes(model_name, keys)
+      if to_delete:
+        db.session.execute(trigram_table.delete().where(
+            trigram_table.c.id.in_(to_delete)))
+      if to_insert:
+        db.session.execute(trigram_table.insert().values([
+            {"type": model_name, "key": key, "trigram": trigram}
+            for key, trigram in to_insert
+        ]))
+
+  def _get_filter_query(self, terms):
+    """Get the filter of records by terms using the trigram index."""
+    query = super(TrigramIndexer, self)._get_filter_query(terms)
+    trigrams = get_term_trigrams(terms)
+    if not trigrams:
+      return query
+    # Every trigram is looked up separately: trigrams that differ in Python
+    # can be equal in the collation of the table.
+    record_object = tuple_(MysqlRecordProperty.type, MysqlRecordProperty.key)
+    candidates = [
+        record_object.in_(select([
+            self.trigram_type.type, self.trigram_type.key,
+        ]).where(self.trigram_type.trigram == trigram))
+        for trigram in sorted(trigrams)
+    ]
+    return and_(query, *candidates)
+
+  def create_record(self, record, commit=True):
+    super(TrigramIndexer, self).create_record(record, commit=False)
+    db.session.flush()
+    self.records_updated(record.type, [record.key])
+    if commit:
+      db.session.commit()
+
+  def delete_record(self, key, type, commit=True):
+    # pylint: disable=redefined-builtin
+    super(TrigramIndexer, self).delete_record(key, type, commit=False)
+    self.records_updated(type, [key])
+    if commit:
+      db.session.commit()
+
+  def delete_records_by_ids(self, type, keys, commit=True):
+    # pylint: disable=redefined-builtin
+    super(TrigramIndexer, self).delete_records_by_ids(type, keys,
+                                                      commit=False)
+    self.records_updated(type, keys or [])
+    if commit:
+      db.session.commit()
+
+  def delete_all_records(self, commit=True):
+    super(TrigramIndexer, self).delete_all_records(commit=False)
+    db.session.query(self.trigram_type).delete()
+    if commit:
+      db.session.commit()
+
+  def delete_records_by_type(self, type, commit=True):
+    # pylint: disable=redefined-builtin
+    super(TrigramIndexer, self).delete_records_by_type(type, commit=False)
+    db.session.query(self.trigram_type).filter(
+        self.trigram_type.type == type).delete()
+    if commit:
+      db.session.commit()
+
+
+Indexer = TrigramIndexer
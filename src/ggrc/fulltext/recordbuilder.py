@@ -4,12 +4,18 @@
 """Module for full text index record builder."""
 
 import logging
+from collections import defaultdict
+
+from sqlalchemy import or_
+from sqlalchemy import orm
 
 from ggrc import db
+from ggrc.access_control.roleable import Roleable
 from ggrc.models import all_models
 from ggrc.models.reflection import AttributeInfo
 from ggrc.models.person import Person
 from ggrc.models.mixins import CustomAttributable
+from ggrc.fulltext.attributes import CustomRoleAttr
 from ggrc.fulltext.attributes import FullTextAttr
 from ggrc.fulltext.mixin import Indexed
 
@@ -42,9 +48,21 @@ class Record(object):  # pylint: disable=too-few-public-methods
 
 
 class RecordBuilder(object):
-  """Basic record builder for full text index table."""
+  """Basic record builder for full text index table.
+
+  Records of many objects are built in two phases. `prefetch` loads custom
+  attributes, access control lists and people of all objects into the
+  indexer cache with a few queries, then `as_record` builds records of the
+  objects from the cache. Records of objects that were not prefetched are
+  built from their relationships.
+  """
   # pylint: disable=too-few-public-methods
 
+  # Cache entries with data of prefetched objects by (type, id) and with
+  # people and role names they reference
+  PREFETCHED = ("cad_map", "cav_map", "acl_map", "prefetched_people",
+                "prefetched_ac_roles")
+
   def __init__(self, tgt_class, indexer):
     self._fulltext_attrs = AttributeInfo.gather_attrs(
         tgt_class, '_fulltext_attrs')
@@ -81,13 +99,173 @@ class RecordBuilder(object):
       property_tmpl = u"{}"
 
     properties = {}
+    obj_key = (obj.__class__.__name__, obj.id)
     for attr in self._fulltext_attrs:
       if isinstance(attr, basestring):
         properties[property_tmpl.format(attr)] = {"": getattr(obj, attr)}
+      elif (isinstance(attr, CustomRoleAttr) and
+            obj_key in self.indexer.cache["acl_map"]):
+        properties.update(self._get_custom_role_properties(
+            self.indexer.cache["acl_map"][obj_key]))
       elif isinstance(attr, FullTextAttr):
         properties.update(attr.get_property_for(obj))
     return properties
 
+  def _get_custom_role_properties(self, acl_rows):
+    """Get properties of custom roles from prefetched data.
+
+    The properties are the same as the ones of CustomRoleAttr.
+    """
+    results = {}
+    sorted_roles = defaultdict(list)
+    for ac_role_id, person_id in acl_rows:
+      ac_role = self._get_prefetched_ac_role(ac_role_id)
+      person = self._get_prefetched_person(person_id)
+      if ac_role is None or person is None:
+        continue
+      person_name, person_email = person
+      user_name = person_email.split("@")[0]
+      role_properties = results.setdefault(ac_role, {})
+      sorted_roles[ac_role].append(user_name)
+      role_properties["{}-email".format(person_id)] = person_email
+      role_properties["{}-name".format(person_id)] = person_name
+      role_properties["{}-user_name".format(person_id)] = user_name
+    for role in sorted_roles:
+      results[role]["__sort__"] = u":".join(sorted(sorted_roles[role]))
+    return results
+
+  def prefetch(self, instances):
+    """Load data needed to build records of instances into the cache.
+
+    Args:
+      instances: list of objects of the same class.
+    """
+    if not instances:
+      return
+    tgt_class = instances[0].__class__
+    type_name = tgt_class.__name__
+    ids = [obj.id for obj in instances]
+    person_ids = set()
+    ac_role_ids = set()
+    if issubclass(tgt_class, CustomAttributable):
+      person_ids.update(self._prefetch_custom_attributes(tgt_class, ids))
+    if issubclass(tgt_class, Roleable):
+      acl_map = self.indexer.cache["acl_map"]
+      for id_ in ids:
+        acl_map[(type_name, id_)] = []
+      acl = all_models.AccessControlList
+      acl_query = db.session.query(
+          acl.object_id, acl.ac_role_id, acl.person_id,
+      ).filter(
+          acl.object_type == type_name,
+          acl.object_id.in_(ids),
+      )
+      for object_id, ac_role_id, person_id in acl_query:
+        acl_map[(type_name, object_id)].append((ac_role_id, person_id))
+        ac_role_ids.add(ac_role_id)
+        person_ids.add(person_id)
+    self._prefetch_people(person_ids)
+    self._prefetch_ac_roles(ac_role_ids)
+
+  def _prefetch_custom_attributes(self, tgt_class, ids):
+    """Load custom attribute definitions and values of objects.
+
+    Returns:
+      set of ids of people that are values of custom attributes.
+    """
+    cad = all_models.CustomAttributeDefinition
+    cav = all_models.CustomAttributeValue
+    type_name = tgt_class.__name__
+    definitions = cad.query.filter(
+        # pylint: disable=protected-access
+        cad.definition_type == tgt_class._inflector.table_singular,
+        or_(cad.definition_id.in_(ids), cad.definition_id.is_(None)),
+    ).options(
+        orm.undefer_group("CustomAttributeDefinition_complete"),
+    ).order_by(cad.id)
+    global_definitions = []
+    local_definitions = defaultdict(list)
+    for definition in definitions:
+      if definition.definition_id is None:
+        global_definitions.append(definition)
+      else:
+        local_definitions[definition.definition_id].append(definition)
+
+    cad_map = self.indexer.cache["cad_map"]
+    cav_map = self.indexer.cache["cav_map"]
+    for id_ in ids:
+      # Same order as CustomAttributable.custom_attribute_definitions
+      cad_map[(type_name, id_)] = local_definitions[id_] + global_definitions
+      cav_map[(type_name, id_)] = {}
+    values = db.session.query(
+        cav.attributable_id,
+        cav.custom_attribute_id,
+        cav.attribute_value,
+        cav.attribute_object_id,
+    ).filter(
+        cav.attributable_type == type_name,
+        cav.attributable_id.in_(ids),
+    )
+    person_ids = set()
+    for attributable_id, cad_id, value, object_id in values:
+      cav_map[(type_name, attributable_id)][cad_id] = (value, object_id)
+      if object_id:
+        person_ids.add(object_id)
+    return person_ids
+
+  def _get_prepared_map(self, name):
+    """Get a shared map if it was filled for a full reindex.
+
+    Otherwise the shared map can hold names that changed since they were
+    cached, and an empty map is returned.
+    """
+    if self.indexer.cache["prepared"].get(name):
+      return self.indexer.cache[name]
+    return {}
+
+  def _get_prefetched_person(self, person_id):
+    """Get name and email of a person referenced by prefetched objects."""
+    person = self.indexer.cache["prefetched_people"].get(person_id)
+    if person is None:
+      person = self._get_prepared_map("people_map").get(person_id)
+    return person
+
+  def _get_prefetched_ac_role(self, ac_role_id):
+    """Get name of a role referenced by prefetched objects."""
+    prefetched = self.indexer.cache["prefetched_ac_roles"]
+    if ac_role_id in prefetched:
+      return prefetched[ac_role_id]
+    return self._get_prepared_map("ac_role_map").get(ac_role_id)
+
+  def _prefetch_people(self, person_ids):
+    """Load names and emails of people for the current prefetch."""
+    people_map = self._get_prepared_map("people_map")
+    missing = [id_ for id_ in person_ids if id_ not in people_map]
+    if missing:
+      people = db.session.query(Person.id, Person.name, Person.email).filter(
+          Person.id.in_(missing))
+      self.indexer.cache["prefetched_people"].update(
+          (id_, (name, email)) for id_, name, email in people)
+
+  def _prefetch_ac_roles(self, ac_role_ids):
+    """Load names of roles for the current prefetch."""
+    ac_role_map = self._get_prepared_map("ac_role_map")
+    missing = [id_ for id_ in ac_role_ids if id_ not in ac_role_map]
+    if missing:
+      prefetched = self.indexer.cache["prefetched_ac_roles"]
+      prefetched.update(dict.fromkeys(missing))
+      prefetched.update(db.session.query(
+          all_models.AccessControlRole.id,
+          all_models.AccessControlRole.name,
+      ).filter(
+          all_models.AccessControlRole.id.in_(missing),
+      ))
+
+  def clear_prefetched(self):
+    """Remove data of prefetched objects from the cache."""
+    for name in self.PREFETCHED:
+      self.indexer.cache.pop(name, None)
+
   def get_person_id_name_email(self, person):
     """Get id, name and email for person (either object or dict).
 
@@ -97,7 +275,10 @@ class RecordBuilder(object):
       person_id = person["id"]
     else:
       person_id = person.id
-    if person_id in self.indexer.cache['people_map']:
+    if person_id in self.indexer.cache['prefetched_people']:
+      person_name, person_email = \
+          self.indexer.cache['prefetched_people'][person_id]
+    elif person_id in self.indexer.cache['people_map']:
       person_name, person_email = self.indexer.cache['people_map'][person_id]
     else:
       if isinstance(person, dict):
@@ -176,6 +357,37 @@ class RecordBuilder(object):
       properties[attribute_name] = {"": definition.get_indexed_value(value)}
     return properties
 
+  def _get_custom_attribute_values(self, obj):
+    """Get pairs of custom attribute definitions and values of an object.
+
+    Values of prefetched objects are taken from the cache, people are
+    represented by dicts with their id.
+    """
+    obj_key = (obj.__class__.__name__, obj.id)
+    if obj_key not in self.indexer.cache["cad_map"]:
+      cavs = {v.custom_attribute_id: v for v in obj.custom_attribute_values}
+      for cad in obj.custom_attribute_definitions:
+        cav = cavs.get(cad.id)
+        if not cav:
+          value = cad.default_value
+        elif cad.attribute_type == "Map:Person":
+          value = cav.attribute_object if cav.attribute_object_id else None
+        else:
+          value = cav.attribute_value
+        yield cad, value
+      return
+    cavs = self.indexer.cache["cav_map"][obj_key]
+    for cad in self.indexer.cache["cad_map"][obj_key]:
+      if cad.id not in cavs:
+        value = cad.default_value
+      elif cad.attribute_type == "Map:Person":
+        person_id = cavs[cad.id][1]
+        person = self._get_prefetched_person(person_id)
+        value = {"id": person_id} if person is not None else None
+      else:
+        value = cavs[cad.id][0]
+      yield cad, value
+
   def as_record(self, obj):  # noqa  # pylint:disable=too-many-branches
     """Generate record representation for an object.
 
@@ -194,15 +406,7 @@ class RecordBuilder(object):
 
     properties = self._get_properties(obj)
     if isinstance(obj, CustomAttributable):
-      cavs = {v.custom_attribute_id: v for v in obj.custom_attribute_values}
-      for cad in obj.custom_attribute_definitions:
-        cav = cavs.get(cad.id)
-        if not cav:
-          value = cad.default_value
-        elif cad.attribute_type == "Map:Person":
-          value = cav.attribute_object if cav.attribute_object_id else None
-        else:
-          value = cav.attribute_value
+      for cad, value in self._get_custom_attribute_values(obj):
         properties.update(self.get_custom_attribute_properties(cad, value))
 
     return Record(
@@ -0,0 +1,241 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Parallel and resumable full reindex of the full text search index.
+
+A full reindex splits ids of all indexed models and of snapshots into
+chunks of REINDEX_CHUNK_SIZE ids that are stored in the `reindex_chunks`
+table. Chunks are then reindexed by a pool of REINDEX_WORKERS processes and
+every chunk is marked as done once its records are written. If a reindex
+is interrupted, the next one continues with the chunks that are not done.
+Checkpoints are removed when all chunks are done.
+
+Process pools are not available on App Engine, where chunks are reindexed
+one after another in the task that runs the reindex.
+
+Only one reindex runs at a time. A reindex holds a named database lock and
+a reindex started while the lock is held does nothing.
+"""
+
+import contextlib
+import datetime
+import json
+from logging import getLogger
+
+import sqlalchemy as sa
+from sqlalchemy import false
+
+from ggrc import db
+from ggrc import settings
+from ggrc.fulltext import get_indexer
+from ggrc.fulltext import mixin
+from ggrc.models import all_models
+from ggrc.models.background_task import BackgroundTask
+from ggrc.models.reindex_chunk import ReindexChunk
+from ggrc.snapshotter.indexer import reindex_snapshots
+from ggrc.utils import benchmark
+
+
+# pylint: disable=invalid-name
+logger = getLogger(__name__)
+
+SNAPSHOT_TYPE = "Snapshot"
+
+REINDEX_LOCK = "ggrc_fulltext_reindex"
+
+
+def get_indexed_models():
+  """Get models reindexed by a full reindex by name, including snapshots."""
+  models = {
+      model.__name__: model for model in all_models.all_models
+      if issubclass(model, mixin.Indexed) and model.REQUIRED_GLOBAL_REINDEX
+  }
+  models[SNAPSHOT_TYPE] = all_models.Snapshot
+  return models
+
+
+def get_workers():
+  if getattr(settings, "APP_ENGINE", False):
+    return 1
+  return max(getattr(settings, "REINDEX_WORKERS", 1), 1)
+
+
+def get_chunk_size():
+  return getattr(settings, "REINDEX_CHUNK_SIZE", 1000)
+
+
+def prepare_indexer():
+  """Cache people and role names used by record builders of all chunks."""
+  indexer = get_indexer()
+  people_query = db.session.query(all_models.Person.id,
+                                  all_models.Person.name,
+                                  all_models.Person.email)
+  indexer.cache["people_map"] = {p.id: (p.name, p.email) for p in people_query}
+  indexer.cache["ac_role_map"] = dict(db.session.query(
+      all_models.AccessControlRole.id,
+      all_models.AccessControlRole.name,
+  ))
+  # Record builders use these maps instead of loading names of their own
+  indexer.cache["prepared"] = {"people_map": True, "ac_role_map": True}
+
+
+def create_chunks(chunk_size):
+  """Store chunks of ids of all indexed types.
+
+  Chunks are ranges of existing ids, so a chunk contains at most chunk_size
+  objects that existed when the reindex started.
+  """
+  values = []
+  for model_name, model in sorted(get_indexed_models().items()):
+    ids = [id_ for id_, in db.session.query(model.id).order_by(model.id)]
+    for start in range(0, len(ids), chunk_size):
+      chunk = ids[start:start + chunk_size]
+      values.append({"type": model_name, "start_id": chunk[0],
+                     "end_id": chunk[-1], "done": False})
+  if values:
+    db.session.execute(ReindexChunk.__table__.insert(), values)
+  db.session.commit()
+
+
+def get_pending_chunk_ids():
+  return [id_ for id_, in db.session.query(ReindexChunk.id).filter(
+      ReindexChunk.done == false(),
+  ).order_by(ReindexChunk.id)]
+
+
+def reindex_chunk(chunk_id):
+  """Write index records of a chunk and mark it as done."""
+  chunk = ReindexChunk.query.get(chunk_id)
+  if chunk is None or chunk.done:
+    logger.warning("Skipping reindex of removed or done chunk %s", chunk_id)
+    return
+  model = get_indexed_models()[chunk.type]
+  ids = [id_ for id_, in db.session.query(model.id).filter(
+      model.id.between(chunk.start_id, chunk.end_id))]
+  with benchmark("Create records for %s chunk" % chunk.type):
+    if chunk.type == SNAPSHOT_TYPE:
+      reindex_snapshots(ids)
+    else:
+      model.bulk_record_update_for(ids)
+  chunk.done = True
+  chunk.updated_at = datetime.datetime.utcnow()
+  db.session.commit()
+
+
+def _init_worker():
+  """Set up a pool process with its own application context.
+
+  The indexer cache is prepared before the pool is created and is inherited
+  by the forked processes.
+  """
+  from ggrc.app import app
+  app.app_context().push()
+
+
+def _reindex_chunk_in_worker(chunk_id):
+  try:
+    reindex_chunk(chunk_id)
+  finally:
+    db.session.remove()
+  return chunk_id
+
+
+def report_progress(task_id, done, total):
+  """Store progress of the reindex as the result of its background task."""
+  if task_id is None:
+    return
+  task = BackgroundTask.query.get(task_id)
+  task.result = {
+      "content": json.dumps({"done": done, "total": total}),
+      "status_code": 200,
+      "headers": [("Content-Type", "application/json")],
+  }
+  db.session.commit()
+
+
+def _reindex_chunks(chunk_ids, workers, task_id, done, total):
+  """Reindex chunks in the current process or in a process pool."""
+  if workers == 1:
+    for chunk_id in chunk_ids:
+      reindex_chunk(chunk_id)
+      done += 1
+      report_progress(task_id, done, total)
+    return
+  import multiprocessing
+  # Pool processes must open their own database connections.
+  db.session.remove()
+  db.engine.dispose()
+  pool = multiprocessing.Pool(workers, _init_worker)
+  try:
+    for _ in pool.imap_unordered(_reindex_chunk_in_worker, chunk_ids):
+      done += 1
+      report_progress(task_id, done, total)
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+@contextlib.contextmanager
+def reindex_lock():
+  """Hold the reindex lock while the block runs.
+
+  The lock is taken on a separate connection, so it is kept across commits
+  and disposal of the connection pool, and is released if the process dies.
+
+  Yields:
+    True if the lock was acquired, False if another reindex holds it.
+  """
+  connection = db.engine.connect()
+  acquired = False
+  try:
+    acquired = bool(connection.execute(
+        sa.text("SELECT GET_LOCK(:name, 0)"), name=REINDEX_LOCK,
+    ).scalar())
+    yield acquired
+  finally:
+    if acquired:
+      connection.execute(sa.text("SELECT RELEASE_LOCK(:name)"),
+                         name=REINDEX_LOCK)
+    connection.close()
+
+
+def reindex(task=None):
+  """Reindex all indexed objects, continuing an interrupted reindex.
+
+  Does nothing if another reindex is running.
+
+  Args:
+    task: background task that receives the progress, or None
+
+  Returns:
+    False if another reindex is running, True otherwise.
+  """
+  with reindex_lock() as acquired:
+    if not acquired:
+      logger.warning("Skipping reindex, another reindex is running")
+      return False
+    _reindex(task)
+  return True
+
+
+def _reindex(task):
+  """Reindex all indexed objects while holding the reindex lock."""
+  task_id = task.id if task is not None else None
+  if not db.session.query(ReindexChunk.query.exists()).scalar():
+    with benchmark("Create reindex chunks"):
+      create_chunks(get_chunk_size())
+  else:
+    logger.info("Continuing an interrupted reindex")
+  total = ReindexChunk.query.count()
+  chunk_ids = get_pending_chunk_ids()
+  done = total - len(chunk_ids)
+  report_progress(task_id, done, total)
+
+  indexer = get_indexer()
+  prepare_indexer()
+  try:
+    _reindex_chunks(chunk_ids, get_workers(), task_id, done, total)
+  finally:
+    indexer.invalidate_cache()
+  ReindexChunk.query.delete()
+  db.session.commit()
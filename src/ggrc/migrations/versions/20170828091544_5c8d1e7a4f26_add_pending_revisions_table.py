@@ -0,0 +1,44 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add pending revisions table
+
+Create Date: 2017-08-28 09:15:44.193522
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5c8d1e7a4f26'
+down_revision = '3f1a9e5c2d44'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'pending_revisions',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('event_id', sa.Integer(), nullable=False),
+      sa.Column('resource_type', sa.String(length=250), nullable=False),
+      sa.Column('resource_id', sa.Integer(), nullable=False),
+      sa.Column('action', sa.Enum(u'created', u'modified', u'deleted'),
+                nullable=False),
+      sa.Column('content', mysql.LONGTEXT(), nullable=False),
+      sa.Column('modified_by_id', sa.Integer(), nullable=True),
+      sa.Column('created_at', sa.DateTime(), nullable=False),
+      sa.ForeignKeyConstraint(['event_id'], ['events.id']),
+      sa.PrimaryKeyConstraint('id')
+  )
+  op.create_index('ix_pending_revisions_resource', 'pending_revisions',
+                  ['resource_type', 'resource_id'])
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('pending_revisions')
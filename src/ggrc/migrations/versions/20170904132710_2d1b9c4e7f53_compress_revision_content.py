@@ -0,0 +1,102 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Compress revision content
+
+Create Date: 2017-09-04 13:27:10.845311
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import zlib
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql import text
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2d1b9c4e7f53'
+down_revision = '5c8d1e7a4f26'
+
+PLAIN = 0
+ZLIB = 1
+CHUNK_SIZE = 1000
+
+
+def convert_content(from_format, to_format, convert):
+  """Convert content of all revisions in from_format chunk by chunk.
+
+  Every chunk is committed on its own connection, outside of the migration
+  transaction, so that the table is not locked for the whole conversion.
+  Revisions are readable in both formats, so an interrupted conversion
+  leaves consistent data and is continued by the next run.
+  """
+  connection = op.get_bind().engine.connect()
+  try:
+    last_id = 0
+    while True:
+      with connection.begin():
+        rows = connection.execute(
+            text("""
+                SELECT id, content
+                FROM revisions
+                WHERE content_format = :format AND id > :last_id
+                ORDER BY id
+                LIMIT :limit
+                FOR UPDATE
+            """),
+            format=from_format,
+            last_id=last_id,
+            limit=CHUNK_SIZE,
+        ).fetchall()
+        if not rows:
+          break
+        connection.execute(
+            text("""
+                UPDATE revisions
+                SET content = :content, content_format = :format
+                WHERE id = :id
+            """),
+            [{"id": row.id, "content": convert(row.content),
+              "format": to_format}
+             for row in rows]
+        )
+      last_id = rows[-1].id
+  finally:
+    connection.close()
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  columns = sa.inspect(op.get_bind()).get_columns('revisions')
+  if 'content_format' not in {column['name'] for column in columns}:
+    # the column is already there if a previous run has been interrupted
+    op.add_column(
+        'revisions',
+        sa.Column('content_format', sa.SmallInteger(), nullable=False,
+                  server_default=str(PLAIN)),
+    )
+  op.alter_column(
+      'revisions',
+      'content',
+      type_=mysql.LONGBLOB,
+      existing_type=mysql.LONGTEXT,
+      existing_nullable=False,
+  )
+  convert_content(PLAIN, ZLIB, zlib.compress)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  convert_content(ZLIB, PLAIN, zlib.decompress)
+  op.alter_column(
+      'revisions',
+      'content',
+      type_=mysql.LONGTEXT,
+      existing_type=mysql.LONGBLOB,
+      existing_nullable=False,
+  )
+  op.drop_column('revisions', 'content_format')
@@ -0,0 +1,41 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add person permissions table
+
+Create Date: 2017-09-05 10:15:32.618274
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2a1f9c3d'
+down_revision = '2d1b9c4e7f53'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'person_permissions',
+      sa.Column('person_id', sa.Integer(), nullable=False),
+      sa.Column('object_type', sa.String(length=250), nullable=False),
+      sa.Column('object_id', sa.Integer(), nullable=False),
+      sa.Column('action', sa.Enum(u'read', u'update', u'delete'),
+                nullable=False),
+      sa.PrimaryKeyConstraint('person_id', 'object_type', 'object_id',
+                              'action')
+  )
+  op.create_index('ix_person_permissions_person', 'person_permissions',
+                  ['person_id', 'object_type', 'action', 'object_id'])
+  op.create_index('ix_person_permissions_object', 'person_permissions',
+                  ['object_type', 'object_id'])
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('person_permissions')
@@ -0,0 +1,38 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add reindex chunks table
+
+Create Date: 2017-09-06 09:32:14.204917
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7c3f1e9a2b54'
+down_revision = '4b8e2a1f9c3d'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'reindex_chunks',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('type', sa.String(length=250), nullable=False),
+      sa.Column('start_id', sa.Integer(), nullable=False),
+      sa.Column('end_id', sa.Integer(), nullable=False),
+      sa.Column('done', sa.Boolean(), nullable=False),
+      sa.Column('updated_at', sa.DateTime(), nullable=True),
+      sa.PrimaryKeyConstraint('id')
+  )
+  op.create_index('ix_reindex_chunks_done', 'reindex_chunks', ['done'])
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('reindex_chunks')
@@ -0,0 +1,39 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add pending reindex table
+
+Create Date: 2017-09-07 14:15:08.539126
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a5d2c8e4f613'
+down_revision = '7c3f1e9a2b54'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'pending_reindex',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('type', sa.String(length=250), nullable=False),
+      sa.Column('key', sa.Integer(), nullable=False),
+      sa.Column('created_at', sa.DateTime(), nullable=False),
+      sa.PrimaryKeyConstraint('id')
+  )
+  op.create_index('ix_pending_reindex_object', 'pending_reindex',
+                  ['type', 'key'])
+  op.create_index('ix_pending_reindex_created_at', 'pending_reindex',
+                  ['created_at'])
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('pending_reindex')
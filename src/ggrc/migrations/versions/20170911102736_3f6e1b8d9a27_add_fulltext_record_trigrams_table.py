@@ -0,0 +1,39 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add fulltext record trigrams table
+
+Create Date: 2017-09-11 10:27:36.184512
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3f6e1b8d9a27'
+down_revision = 'a5d2c8e4f613'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'fulltext_record_trigrams',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('type', sa.String(length=64), nullable=False),
+      sa.Column('key', sa.Integer(), nullable=False),
+      sa.Column('trigram', sa.String(length=3), nullable=False),
+      sa.PrimaryKeyConstraint('id')
+  )
+  op.create_index('ix_fulltext_record_trigrams_trigram',
+                  'fulltext_record_trigrams', ['trigram', 'type', 'key'])
+  op.create_index('ix_fulltext_record_trigrams_object',
+                  'fulltext_record_trigrams', ['type', 'key'])
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('fulltext_record_trigrams')
@@ -0,0 +1,20 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Per-type collection version counters."""
+
+from ggrc import db
+
+
+class CollectionVersion(db.Model):
+  """Version counter of all objects of a single type.
+
+  The counter is incremented on every commit that creates, changes or
+  deletes objects of `resource_type`, so it can be used to validate cached
+  collection representations without querying the object tables.
+  """
+  __tablename__ = 'collection_versions'
+
+  resource_type = db.Column(db.String(250), primary_key=True)
+  version = db.Column(db.Integer, nullable=False, default=0)
+  updated_at = db.Column(db.DateTime, nullable=False)
@@ -113,30 +113,6 @@ class CustomAttributable(object):
   def custom_attribute_values(self):
     return self._custom_attribute_values
 
-  @classmethod
-  def indexed_query(cls):
-    return super(CustomAttributable, cls).indexed_query().options(
-        orm.Load(cls).subqueryload(
-            "custom_attribute_values"
-        ).joinedload(
-            "custom_attribute"
-        ).load_only(
-            "id",
-            "title",
-            "attribute_type",
-        ),
-        orm.Load(cls).subqueryload(
-            "custom_attribute_definitions"
-        ).undefer_group(
-            "CustomAttributeDefinition_complete"
-        ),
-        orm.Load(cls).subqueryload("custom_attribute_values").load_only(
-            "id",
-            "attribute_value",
-            "attribute_object_id",
-        ),
-    )
-
   @custom_attribute_values.setter
   def custom_attribute_values(self, values):
     """Setter function for custom attribute values.
@@ -255,6 +231,7 @@ class CustomAttributable(object):
     """
     from ggrc.models.custom_attribute_definition \
         import CustomAttributeDefinition as CADef
+    from ggrc.utils import collection_versions
 
     if not hasattr(self, "PER_OBJECT_CUSTOM_ATTRIBUTABLE"):
       return
@@ -264,6 +241,7 @@ class CustomAttributable(object):
           CADef.definition_id == self.id,
           CADef.definition_type == self._inflector.table_singular
       ).delete()
+      collection_versions.mark_modified("CustomAttributeDefinition")
       db.session.flush()
       db.session.expire_all()
 
@@ -278,6 +256,7 @@ class CustomAttributable(object):
     """Remove existing CAV and corresponding full text records."""
     from ggrc.fulltext.mysql import MysqlRecordProperty
     from ggrc.models.custom_attribute_value import CustomAttributeValue
+    from ggrc.utils import collection_versions
     if not attr_values:
       return
     # 2) Delete all fulltext_record_properties for the list of values
@@ -300,6 +279,7 @@ class CustomAttributable(object):
     db.session.query(CustomAttributeValue)\
         .filter(CustomAttributeValue.id.in_(attr_value_ids))\
         .delete(synchronize_session='fetch')
+    collection_versions.mark_modified("CustomAttributeValue")
     db.session.commit()
 
   def custom_attributes(self, src):
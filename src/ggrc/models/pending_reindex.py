@@ -0,0 +1,26 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Objects waiting for an update of their full text index records."""
+
+from ggrc import db
+
+
+class PendingReindex(db.Model):
+  """Object whose full text records must be updated.
+
+  Entries are created at commit time instead of updating the records when
+  DEFERRED_INDEXING is enabled. An object can be queued many times, all of
+  its entries are removed when it is reindexed.
+  """
+  __tablename__ = 'pending_reindex'
+
+  id = db.Column(db.Integer, primary_key=True)  # noqa
+  type = db.Column(db.String(250), nullable=False)
+  key = db.Column(db.Integer, nullable=False)
+  created_at = db.Column(db.DateTime, nullable=False)
+
+  __table_args__ = (
+      db.Index('ix_pending_reindex_object', 'type', 'key'),
+      db.Index('ix_pending_reindex_created_at', 'created_at'),
+  )
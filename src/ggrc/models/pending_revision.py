@@ -0,0 +1,33 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Change records waiting to be written as revisions."""
+
+from ggrc import db
+from ggrc.models.types import LongJsonType
+
+
+class PendingRevision(db.Model):
+  """Change of a single object that has no revision yet.
+
+  Records are created instead of revisions when ASYNC_REVISIONS is enabled
+  and are turned into revisions in id order, which keeps the order of
+  revisions of every object the same as the order of its changes. Every
+  record carries the content of the object at the time of the change.
+  """
+  __tablename__ = 'pending_revisions'
+
+  id = db.Column(db.Integer, primary_key=True)  # noqa
+  event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+  resource_type = db.Column(db.String(250), nullable=False)
+  resource_id = db.Column(db.Integer, nullable=False)
+  action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
+                     nullable=False)
+  content = db.Column(LongJsonType, nullable=False)
+  modified_by_id = db.Column(db.Integer, nullable=True)
+  created_at = db.Column(db.DateTime, nullable=False)
+
+  __table_args__ = (
+      db.Index('ix_pending_revisions_resource',
+               'resource_type', 'resource_id'),
+  )
@@ -0,0 +1,28 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Materialized object permissions of people."""
+
+from ggrc import db
+
+
+class PersonPermission(db.Model):
+  """Action a person is allowed to do on an object.
+
+  Rows are materialized from access control list entries and the flags of
+  their roles, so permission filters of search and query API can use a
+  subquery on this table instead of listing the ids of all objects a person
+  has access to.
+  """
+  __tablename__ = 'person_permissions'
+
+  person_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  object_type = db.Column(db.String(250), primary_key=True)
+  object_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  action = db.Column(db.Enum(u'read', u'update', u'delete'), primary_key=True)
+
+  __table_args__ = (
+      db.Index('ix_person_permissions_person',
+               'person_id', 'object_type', 'action', 'object_id'),
+      db.Index('ix_person_permissions_object', 'object_type', 'object_id'),
+  )
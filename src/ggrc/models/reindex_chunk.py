@@ -0,0 +1,27 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Checkpoints of the full text reindex."""
+
+from ggrc import db
+
+
+class ReindexChunk(db.Model):
+  """Range of ids of a type that is reindexed as a single unit of work.
+
+  Chunks of all indexed types are created when a full reindex starts and are
+  marked as done once their records are written, so an interrupted reindex
+  continues with the chunks that are not done.
+  """
+  __tablename__ = 'reindex_chunks'
+
+  id = db.Column(db.Integer, primary_key=True)
+  type = db.Column(db.String(250), nullable=False)
+  start_id = db.Column(db.Integer, nullable=False)
+  end_id = db.Column(db.Integer, nullable=False)
+  done = db.Column(db.Boolean, nullable=False, default=False)
+  updated_at = db.Column(db.DateTime)
+
+  __table_args__ = (
+      db.Index('ix_reindex_chunks_done', 'done'),
+  )
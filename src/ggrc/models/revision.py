@@ -8,7 +8,7 @@ from ggrc import db
 from ggrc.models.mixins import Base
 from ggrc.models import reflection
 from ggrc.access_control import role
-from ggrc.models.types import LongJsonType
+from ggrc.models.types import CompressedJsonType
 
 
 class Revision(Base, db.Model):
@@ -21,7 +21,9 @@ class Revision(Base, db.Model):
   event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
   action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
                      nullable=False)
-  _content = db.Column('content', LongJsonType, nullable=False)
+  _raw_content = db.Column('content', CompressedJsonType, nullable=False)
+  content_format = db.Column(db.SmallInteger, nullable=False,
+                             default=CompressedJsonType.ZLIB)
 
   resource_slug = db.Column(db.String, nullable=True)
   source_type = db.Column(db.String, nullable=True)
@@ -84,6 +86,24 @@ class Revision(Base, db.Model):
                  "destination_id"]:
       setattr(self, attr, getattr(obj, attr, None))
 
+  @property
+  def _content(self):
+    """Content dict, decoded on first access after it has been loaded."""
+    raw_content = self._raw_content
+    if raw_content is None or isinstance(raw_content, dict):
+      return raw_content
+    decoded = self.__dict__.get("_decoded_content")
+    if decoded is None or decoded[0] is not raw_content:
+      decoded = (raw_content,
+                 CompressedJsonType.decode(raw_content, self.content_format))
+      self.__dict__["_decoded_content"] = decoded
+    return decoded[1]
+
+  @_content.setter
+  def _content(self, value):
+    self._raw_content = value
+    self.content_format = CompressedJsonType.ZLIB
+
   @builder.simple_property
   def description(self):
     """Compute a human readable description from action and content."""
@@ -130,7 +150,17 @@ class Revision(Base, db.Model):
   def content(self):
     """Property. Contains the revision content dict.
 
-    Updated by required values, generated from saved content dict."""
+    Updated by required values, generated from saved content dict. The
+    result is computed once for every stored content dict."""
+    stored_content = self._content
+    populated = self.__dict__.get("_populated_content")
+    if populated is None or populated[0] is not stored_content:
+      populated = (stored_content, self._populate_content())
+      self.__dict__["_populated_content"] = populated
+    return populated[1].copy()
+
+  def _populate_content(self):
+    """Generate content with ACL and reference url data for old revisions."""
     # pylint: disable=too-many-locals
     roles_dict = role.get_custom_roles_for(self.resource_type)
     reverted_roles_dict = {n: i for i, n in roles_dict.iteritems()}
@@ -183,31 +213,7 @@ class Revision(Base, db.Model):
     populated_content["access_control_list"] = access_control_list
 
     if 'url' in self._content:
-      reference_url_list = []
-      for key in ('url', 'reference_url'):
-        link = self._content[key]
-        # link might exist, but can be an empty string - we treat those values
-        # as non-existing (empty) reference URLs
-        if not link:
-          continue
-
-        # if creation/modification date is not available, we estimate it by
-        # using the corresponding information from the Revision itself
-        created_at = (self._content.get("created_at") or
-                      self.created_at.isoformat())
-        updated_at = (self._content.get("updated_at") or
-                      self.updated_at.isoformat())
-
-        reference_url_list.append({
-            "display_name": link,
-            "document_type": "REFERENCE_URL",
-            "link": link,
-            "title": link,
-            "id": None,
-            "created_at": created_at,
-            "updated_at": updated_at,
-        })
-      populated_content['reference_url'] = reference_url_list
+      populated_content['reference_url'] = self._get_reference_url_list()
 
     return populated_content
 
@@ -215,3 +221,31 @@ class Revision(Base, db.Model):
   def content(self, value):
     """ Setter for content property."""
     self._content = value
+
+  def _get_reference_url_list(self):
+    """Generate reference url documents from urls of old revisions."""
+    reference_url_list = []
+    for key in ('url', 'reference_url'):
+      link = self._content[key]
+      # link might exist, but can be an empty string - we treat those values
+      # as non-existing (empty) reference URLs
+      if not link:
+        continue
+
+      # if creation/modification date is not available, we estimate it by
+      # using the corresponding information from the Revision itself
+      created_at = (self._content.get("created_at") or
+                    self.created_at.isoformat())
+      updated_at = (self._content.get("updated_at") or
+                    self.updated_at.isoformat())
+
+      reference_url_list.append({
+          "display_name": link,
+          "document_type": "REFERENCE_URL",
+          "link": link,
+          "title": link,
+          "id": None,
+          "created_at": created_at,
+          "updated_at": updated_at,
+      })
+    return reference_url_list
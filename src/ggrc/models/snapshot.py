@@ -274,6 +274,8 @@ def _ensure_program_relationships(objects):
 
 def _insert_program_relationships(relationship_stubs):
   """Insert missing obj-program relationships."""
+  # pylint: disable=cyclic-import
+  from ggrc.utils import collection_versions
   if not relationship_stubs:
     return
   current_user_id = get_current_user_id()
@@ -303,6 +305,7 @@ def _insert_program_relationships(relationship_stubs):
           for relationship_stub in relationship_stubs
       ])
   )
+  collection_versions.mark_modified("Relationship")
 
 
 def _set_latest_revisions(objects):
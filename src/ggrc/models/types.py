@@ -8,6 +8,7 @@ Add Json and Compressed type declaration for use in ORM models.
 
 import json
 import pickle
+import zlib
 import sqlalchemy.types as types
 from ggrc import utils
 from ggrc.models import exceptions
@@ -84,3 +85,40 @@ class CompressedType(types.TypeDecorator):
     if len(value) > self.MAX_BINARY_LENGTH:
       raise exceptions.ValidationError("Log record content too long")
     return value
+
+
+class CompressedJsonType(types.TypeDecorator):
+  # pylint: disable=W0223
+  """Custom compressed Json data type.
+
+  Custom type for storing Json objects in our database as zlib compressed
+  serialized text. Stored values are returned as they are, so that they are
+  only decoded when needed, with `decode` and the format of the value. Values
+  in PLAIN format are serialized text that has not been compressed.
+  """
+  MAX_BINARY_LENGTH = 4294967295
+  impl = types.LargeBinary(length=MAX_BINARY_LENGTH)
+
+  PLAIN = 0
+  ZLIB = 1
+
+  def process_bind_param(self, value, dialect):
+    if value is None:
+      return value
+    if not isinstance(value, basestring):
+      value = utils.as_json(value)
+    if isinstance(value, unicode):
+      value = value.encode('utf-8')
+    value = zlib.compress(value)
+    if len(value) > self.MAX_BINARY_LENGTH:
+      raise exceptions.ValidationError("Log record content too long")
+    return value
+
+  @classmethod
+  def decode(cls, value, value_format):
+    """Get Json object from a stored value in the given format."""
+    if value is None:
+      return value
+    if value_format == cls.ZLIB:
+      value = zlib.decompress(value)
+    return json.loads(value)
@@ -82,6 +82,9 @@ class QueryHelper(object):
 
   """
 
+  # Number of objects loaded at once to check read conditions
+  CONDITION_CHECK_CHUNK_SIZE = 1000
+
   def __init__(self, query):
     self.query = self._clean_query(query)
     self._count = 0
@@ -223,10 +226,8 @@ class QueryHelper(object):
     )
 
     if contexts is not None:
-      if resources:
-        resource_sql = model.id.in_(resources)
-      else:
-        resource_sql = sa.sql.false()
+      resource_sql = permissions.resource_query_filter(
+          model.id, model.__name__, resources, permission_type)
 
       return sa.or_(
           context_query_filter(model.context_id, contexts),
@@ -253,6 +254,24 @@ class QueryHelper(object):
 
     return objects
 
+  @classmethod
+  def _filter_readable_ids(cls, object_class, ids):
+    """Get ids of objects that satisfy read conditions, keeping their order.
+
+    Contexts and resources are filtered in the ids query, conditions can only
+    be checked on the loaded objects.
+    """
+    readable = []
+    for offset in range(0, len(ids), cls.CONDITION_CHECK_CHUNK_SIZE):
+      chunk = ids[offset:offset + cls.CONDITION_CHECK_CHUNK_SIZE]
+      id_object_map = {obj.id: obj for obj in object_class.eager_query(
+      ).filter(object_class.id.in_(chunk))}
+      objects = [id_object_map[id_] for id_ in chunk if id_ in id_object_map]
+      allowed = permissions.is_allowed_read_many(objects)
+      readable.extend(obj.id for obj, is_allowed in zip(objects, allowed)
+                      if is_allowed)
+    return readable
+
   def _get_ids(self, object_query):
     """Get a set of ids of objects described in the filters."""
 
@@ -291,14 +310,26 @@ class QueryHelper(object):
             object_query["order_by"],
             tgt_class,
         )
-    with benchmark("Apply limit"):
-      limit = object_query.get("limit")
+    limit = object_query.get("limit")
+    if requested_permissions == "read" and \
+       permissions.has_conditions("read", object_name):
+      # Read conditions are checked before paging, so that pages and the
+      # total count contain only readable objects
+      with benchmark("Check read conditions: _get_ids"):
+        ids = self._filter_readable_ids(object_class,
+                                        [obj.id for obj in query])
+      total = len(ids)
       if limit:
-        ids, total = self._apply_limit(query, limit)
-      else:
-        ids = [obj.id for obj in query]
-        total = len(ids)
-      object_query["total"] = total
+        page_size, first = self._get_limit(limit)
+        ids = ids[first:first + page_size]
+    else:
+      with benchmark("Apply limit"):
+        if limit:
+          ids, total = self._apply_limit(query, limit)
+        else:
+          ids = [obj.id for obj in query]
+          total = len(ids)
+    object_query["total"] = total
 
     if hasattr(flask.g, "similar_objects_query"):
       # delete similar_objects_query for the case when several queries are
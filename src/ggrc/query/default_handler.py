@@ -57,11 +57,8 @@ class DefaultHandler(QueryHelper):
         with benchmark("get_results > _get_last_modified"):
           object_query["last_modified"] = self._get_last_modified(model,
                                                                   objects)
-        with benchmark("serialization: get_results > _transform_to_json"):
-          object_query["values"] = self._transform_to_json(
-              objects,
-              object_query.get("fields"),
-          )
+        with benchmark("serialization: get_results > publish"):
+          object_query["values"] = [json.publish(obj) for obj in objects]
       else:
         with benchmark("Get result set: get_results -> _get_ids"):
           ids = self._get_ids(object_query)
@@ -69,17 +66,26 @@ class DefaultHandler(QueryHelper):
         object_query["last_modified"] = None  # synonymous to now()
         if query_type == "ids":
           object_query["ids"] = ids
+    with benchmark("serialization: get_results > _transform_to_json"):
+      self._transform_to_json(self.query)
     return self.query
 
   @staticmethod
-  def _transform_to_json(objects, fields=None):
-    """Make a JSON representation of objects from the list."""
-    objects_json = [json.publish(obj) for obj in objects]
-    objects_json = json.publish_representation(objects_json)
-    if fields:
-      objects_json = [{f: o.get(f) for f in fields}
-                      for o in objects_json]
-    return objects_json
+  def _transform_to_json(object_queries):
+    """Resolve stubs of all published values and apply requested fields.
+
+    The stubs of all object queries are resolved together, so that the whole
+    response needs a single stub query.
+    """
+    values_queries = [object_query for object_query in object_queries
+                      if object_query.get("type", "values") == "values"]
+    json.publish_representation(
+        [object_query["values"] for object_query in values_queries])
+    for object_query in values_queries:
+      fields = object_query.get("fields")
+      if fields:
+        object_query["values"] = [{f: o.get(f) for f in fields}
+                                  for o in object_query["values"]]
 
   @staticmethod
   def _get_last_modified(model, objects):
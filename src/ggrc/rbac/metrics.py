@@ -0,0 +1,122 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Metrics of the permissions subsystem.
+
+Counters of cached permission sections and histograms of loading times and
+permission sizes are kept in the memory of the process. They describe the
+requests served by the instance since it was started or since the metrics
+were reset, and are exposed to admins at /admin/permissions_metrics.
+
+Times are recorded in milliseconds. Sizes are the number of items in the
+lists of a permissions dict, which are mostly resource and context ids.
+"""
+
+import datetime
+import threading
+import time
+
+
+# Upper bounds of histogram buckets
+TIME_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+
+class Histogram(object):
+  """Distribution of observed values in buckets with upper bounds."""
+
+  def __init__(self, bounds):
+    self.bounds = bounds
+    self.buckets = [0] * (len(bounds) + 1)
+    self.count = 0
+    self.sum = 0
+    self.max = 0
+
+  def observe(self, value):
+    """Add a value to the first bucket with a bound that is not lower."""
+    index = len(self.bounds)
+    for i, bound in enumerate(self.bounds):
+      if value <= bound:
+        index = i
+        break
+    self.buckets[index] += 1
+    self.count += 1
+    self.sum += value
+    self.max = max(self.max, value)
+
+  def as_dict(self):
+    labels = ["<={}".format(bound) for bound in self.bounds] + ["+Inf"]
+    return {
+        "count": self.count,
+        "sum": self.sum,
+        "max": self.max,
+        "avg": float(self.sum) / self.count if self.count else 0,
+        "buckets": dict(zip(labels, self.buckets)),
+    }
+
+
+class Metrics(object):
+  """Named counters and histograms shared by all threads of the process."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.reset()
+
+  def reset(self):
+    with self._lock:
+      self.since = datetime.datetime.utcnow()
+      self.counters = {}
+      self.histograms = {}
+
+  def increment(self, name, value=1):
+    with self._lock:
+      self.counters[name] = self.counters.get(name, 0) + value
+
+  def observe(self, name, value, bounds):
+    with self._lock:
+      if name not in self.histograms:
+        self.histograms[name] = Histogram(bounds)
+      self.histograms[name].observe(value)
+
+  def observe_time(self, name, seconds):
+    self.observe("time:" + name, seconds * 1000, TIME_BUCKETS)
+
+  def observe_size(self, name, permissions):
+    self.observe("size:" + name, get_size(permissions), SIZE_BUCKETS)
+
+  def as_dict(self):
+    with self._lock:
+      return {
+          "since": self.since.isoformat(),
+          "counters": dict(self.counters),
+          "histograms": {name: histogram.as_dict()
+                         for name, histogram in self.histograms.items()},
+      }
+
+
+class timed(object):  # pylint: disable=invalid-name
+  """Context manager recording the duration of a block in a histogram."""
+
+  def __init__(self, name):
+    self.name = name
+    self.start = 0
+
+  def __enter__(self):
+    self.start = time.time()
+
+  def __exit__(self, exc_type, exc_value, exc_trace):
+    METRICS.observe_time(self.name, time.time() - self.start)
+
+
+def get_size(permissions):
+  """Count items in the lists of a permissions dict."""
+  if isinstance(permissions, dict):
+    return sum(get_size(value) for value in permissions.itervalues())
+  if isinstance(permissions, tuple):
+    return sum(get_size(value) for value in permissions)
+  if isinstance(permissions, (list, set)):
+    return len(permissions)
+  return 0
+
+
+METRICS = Metrics()
@@ -5,8 +5,11 @@
 
 from flask import g
 from flask.ext.login import current_user
+from sqlalchemy import or_
+from sqlalchemy.sql import false
 
 from ggrc import login
+from ggrc import settings
 from ggrc.extensions import get_extension_instance
 from ggrc.rbac import SystemWideRoles
 
@@ -81,6 +84,19 @@ def is_allowed_read_for(instance):
   return permissions_for(get_user()).is_allowed_read_for(instance)
 
 
+def is_allowed_read_many(instances):
+  """Whether or not the user is allowed to read each of the resource
+  instances.
+
+  Returns:
+    list of booleans in the order of instances
+  """
+  instances = list(instances)
+  if _system_wide_read():
+    return [True] * len(instances)
+  return permissions_for(get_user()).is_allowed_read_many(instances)
+
+
 def is_allowed_update(resource_type, resource_id, context_id):
   """Whether or not the user is allowed to update a resource of the specified
   type in the context.
@@ -192,3 +208,35 @@ def get_context_resource(model_name, permission_type='read',
     contexts = set(contexts) & set(read_contexts_for(model_name))
 
   return contexts, resources
+
+
+def resource_query_filter(key_column, resource_type, resources,
+                          permission_type='read'):
+  """Get filter of objects of a type that the user has resource permissions
+  for.
+
+  With MATERIALIZED_PERMISSIONS enabled, resources granted by access control
+  list entries are selected with a subquery on the person permissions table,
+  and only the remaining resources are listed in the filter.
+
+  Args:
+    key_column: column with ids of the filtered objects
+    resource_type: type name the resources were read for
+    resources: list of resource ids from `get_context_resource`
+    permission_type: action the resources were read for
+  """
+  if not resources:
+    return false()
+  if not getattr(settings, "MATERIALIZED_PERMISSIONS", False) or \
+     permission_type not in ("read", "update", "delete"):
+    return key_column.in_(resources)
+  from ggrc.utils import person_permissions
+  user = get_user()
+  materialized = permissions_for(user).materialized_resources_for(
+      permission_type, resource_type)
+  resources = [id_ for id_ in resources if id_ not in materialized]
+  filter_expr = key_column.in_(person_permissions.objects_query(
+      user.id, resource_type, permission_type))
+  if resources:
+    filter_expr = or_(filter_expr, key_column.in_(resources))
+  return filter_expr
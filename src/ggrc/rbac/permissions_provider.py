@@ -1,11 +1,18 @@
 # Copyright (C) 2017 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
+import collections
+import functools
 from collections import namedtuple
+from operator import attrgetter
+
+import sqlalchemy as sa
 from flask import g
 from flask.ext.login import current_user
+from sqlalchemy import orm
+from sqlalchemy.orm.attributes import set_committed_value
 from .user_permissions import UserPermissions
-from ggrc.app import db
+from ggrc import db
 from ggrc.rbac.permissions import permissions_for as find_permissions
 from ggrc.rbac.permissions import is_allowed_create
 from ggrc.models import get_model
@@ -169,11 +176,243 @@ _CONDITIONS_MAP = {
 }
 
 
+ADMIN_ACTION = '__GGRC_ADMIN__'
+ALL_RESOURCE_TYPES = '__GGRC_ALL__'
+
+
+def _compile_contains(value, list_property, **_):
+  """Compile contains_condition into a predicate."""
+  value = resolve_permission_variable(value)
+  get_list = attrgetter(list_property)
+  return lambda instance: value in get_list(instance)
+
+
+def _compile_is(value, property_name, **_):
+  """Compile is_condition into a predicate."""
+  value = resolve_permission_variable(value)
+  get_property = attrgetter(property_name)
+  return lambda instance: value == get_property(instance)
+
+
+"""
+Conditions that are compiled into closures with resolved variables and
+attribute getters, all functions with a signature
+
+..
+
+  func(**terms)
+"""
+_CONDITION_COMPILERS = {
+    'contains': _compile_contains,
+    'is': _compile_is,
+}
+
+
+def compile_condition(condition, action):
+  """Compile a permission condition into a predicate on instances.
+
+  Args:
+    condition: dict with 'condition' name and its 'terms'
+    action: action the condition is checked for
+
+  Returns:
+    function that takes an instance and checks the condition for it
+  """
+  name = str(condition['condition'])
+  terms = condition.get('terms', {})
+  if name in _CONDITION_COMPILERS:
+    return _CONDITION_COMPILERS[name](**terms)
+  return functools.partial(_CONDITIONS_MAP[name], _current_action=action,
+                           **terms)
+
+
+def get_context_id(instance):
+  """Get context id of an instance that may not be flushed yet.
+
+  We can't use instance.context_id, because it requires the object <->
+  context mapping to be created, which isn't the case when creating objects.
+  """
+  if hasattr(instance, 'context') and hasattr(instance.context, 'id'):
+    return instance.context.id
+  return None
+
+
+def preload_endpoints(properties):
+  """Load objects checked by relationship conditions in bulk.
+
+  Endpoints of the checked instances are loaded with one query per endpoint
+  type, together with their contexts, and set on the instances, so that the
+  conditions don't load them one instance at a time.
+
+  Args:
+    properties: iterable of (instance, property name) pairs, such as
+      (relationship, "source")
+  """
+  ids_by_type = collections.defaultdict(set)
+  pending = []
+  for instance, name in properties:
+    type_ = getattr(instance, name + '_type', None)
+    id_ = getattr(instance, name + '_id', None)
+    attr = '{0}_{1}'.format(type_, name)
+    state = sa.inspect(instance)
+    if type_ is None or not state.persistent or attr not in state.unloaded:
+      continue
+    ids_by_type[type_].add(id_)
+    pending.append((instance, attr, type_, id_))
+
+  loaded = {}
+  for type_, ids in ids_by_type.iteritems():
+    model = get_model(type_)
+    if model is None:
+      continue
+    query = model.query.filter(model.id.in_(ids))
+    if 'context' in sa.inspect(model).relationships:
+      query = query.options(orm.joinedload('context'))
+    loaded.update(((type_, obj.id), obj) for obj in query)
+
+  for instance, attr, type_, id_ in pending:
+    if get_model(type_) is not None:
+      set_committed_value(instance, attr, loaded.get((type_, id_)))
+
+
+class CompiledTypePermissions(object):
+  """Permissions of a single action on a single resource type.
+
+  Attributes:
+    resources: set of ids of objects the action is allowed on
+    contexts: set of context ids the action is allowed in
+    all_contexts: True if the action is allowed in all contexts
+    conditions: context id to the list of compiled conditions
+    global_conditions: compiled conditions applied in all contexts
+    relationship_properties: names of properties read by relationship
+      conditions
+  """
+  __slots__ = ('resources', 'contexts', 'all_contexts', 'conditions',
+               'global_conditions', 'relationship_properties')
+
+  def __init__(self, type_permissions, action):
+    self.resources = frozenset(type_permissions.get('resources', ()))
+    self.contexts = frozenset(type_permissions.get('contexts', ()))
+    self.all_contexts = None in self.contexts
+    self.conditions = {
+        context_id: [compile_condition(condition, action)
+                     for condition in conditions]
+        for context_id, conditions in
+        type_permissions.get('conditions', {}).iteritems()
+        if conditions
+    }
+    self.global_conditions = self.conditions.pop(None, [])
+    self.relationship_properties = {
+        name
+        for conditions in type_permissions.get('conditions', {}).itervalues()
+        for condition in conditions
+        if condition['condition'] == 'relationship'
+        for name in condition['terms']['property_name'].split(',')
+    }
+
+  def matches(self, resource_id, context_id):
+    """Check if the action is allowed on a resource in a context."""
+    return (self.all_contexts or resource_id in self.resources or
+            context_id in self.contexts)
+
+  def is_allowed_for(self, instance):
+    """Check if the action is allowed on the instance."""
+    if instance.id in self.resources:
+      return True
+    context_id = get_context_id(instance)
+    context_conditions = self.conditions.get(context_id)
+    if not self.global_conditions and not context_conditions:
+      return self.all_contexts or context_id in self.contexts
+    if any(check(instance) for check in self.global_conditions):
+      return True
+    return any(check(instance) for check in context_conditions or ())
+
+
+class CompiledPermissions(object):
+  """Permissions dict compiled into per (action, resource type) predicates.
+
+  Permissions of a resource type are compiled on first use, so that only
+  the checked types are compiled.
+
+  Attributes:
+    permissions: the compiled permissions dict
+    is_admin: True if the user has admin permission in all contexts
+    admin_contexts: set of contexts where the user has admin permission
+  """
+
+  def __init__(self, permissions):
+    self.permissions = permissions
+    self._compiled = {}
+    self._admin_conditions = {}
+    admin = permissions.get(ADMIN_ACTION, {}).get(ALL_RESOURCE_TYPES, {})
+    self.admin_contexts = frozenset(admin.get('contexts', ()))
+    self.is_admin = (None in self.admin_contexts or
+                     0 in self.admin_contexts or
+                     None in admin.get('resources', ()))
+
+  def get(self, action, resource_type):
+    """Get compiled permissions of an action on a resource type.
+
+    Returns:
+      CompiledTypePermissions or None if the action is not allowed on the
+      resource type at all.
+    """
+    key = (action, resource_type)
+    if key not in self._compiled:
+      type_permissions = self.permissions.get(action, {}).get(resource_type)
+      self._compiled[key] = (
+          CompiledTypePermissions(type_permissions, action)
+          if type_permissions else None
+      )
+    return self._compiled[key]
+
+  def match(self, permission):
+    """Check if the user has the given permission"""
+    action, resource_type, resource_id, context_id = permission
+    type_permissions = self.get(action, resource_type)
+    if type_permissions is not None and \
+       type_permissions.matches(resource_id, context_id):
+      return True
+    all_types = self.get(action, ALL_RESOURCE_TYPES)
+    return all_types is not None and context_id in all_types.contexts
+
+  def _get_admin_conditions(self, action):
+    if action not in self._admin_conditions:
+      conditions = self.permissions[ADMIN_ACTION][ALL_RESOURCE_TYPES]\
+          .get('conditions', {}).get(None, [])
+      self._admin_conditions[action] = [
+          compile_condition(condition, action) for condition in conditions]
+    return self._admin_conditions[action]
+
+  def preload(self, instances, action):
+    """Load objects read by conditions of the instances in bulk."""
+    if self.is_admin:
+      return
+    properties = []
+    for instance in instances:
+      type_permissions = self.get(action, instance._inflector.model_singular)
+      if type_permissions is None or instance.id in type_permissions.resources:
+        continue
+      properties.extend((instance, name)
+                        for name in type_permissions.relationship_properties)
+    preload_endpoints(properties)
+
+  def is_allowed_for(self, instance, action):
+    """Check if the action is allowed on the instance."""
+    if self.is_admin:
+      conditions = self._get_admin_conditions(action)
+      return not conditions or any(check(instance) for check in conditions)
+    type_permissions = self.get(action, instance._inflector.model_singular)
+    if type_permissions is None:
+      return False
+    return type_permissions.is_allowed_for(instance)
+
+
 class DefaultUserPermissions(UserPermissions):
   # super user, context_id 0 indicates all contexts
   ADMIN_PERMISSION = Permission(
-      '__GGRC_ADMIN__',
-      '__GGRC_ALL__',
+      ADMIN_ACTION,
+      ALL_RESOURCE_TYPES,
       None,
       0,
   )
@@ -186,106 +425,51 @@ class DefaultUserPermissions(UserPermissions):
         None,
         context_id)
 
-  def _permission_match(self, permission, permissions):
-    """Check if the user has the given permission"""
-
-    if None in \
-        permissions\
-            .get(permission.action, {})\
-            .get(permission.resource_type, {})\
-            .get('contexts', []):
-      return True
-    return \
-        permission.resource_id in permissions\
-        .get(permission.action, {})\
-        .get(permission.resource_type, {})\
-        .get('resources', [])\
-        or permission.context_id in \
-        permissions\
-        .get(permission.action, {})\
-        .get(permission.resource_type, {})\
-        .get('contexts', [])\
-        or permission.context_id in \
-        permissions\
-        .get(permission.action, {})\
-        .get(self.ADMIN_PERMISSION.resource_type, {})\
-        .get('contexts', [])
-
   @staticmethod
   def _permissions():
     """Returns request permission from the global scope"""
     return getattr(g, '_request_permissions', {})
 
-  def _is_allowed(self, permission):
+  @staticmethod
+  def _acl_permissions():
+    """Returns request permissions granted by access control list entries"""
+    return getattr(g, '_request_acl_permissions', {})
+
+  def _compiled_permissions(self):
+    """Get the permissions compiled once per request.
+
+    The compiled permissions are kept in the request globals and compiled
+    again only if the permissions dict is replaced.
+    """
     permissions = self._permissions()
+    compiled = getattr(g, '_compiled_permissions', None)
+    if compiled is None or compiled.permissions is not permissions:
+      compiled = CompiledPermissions(permissions)
+      setattr(g, '_compiled_permissions', compiled)
+    return compiled
+
+  def _is_allowed(self, permission):
+    compiled = self._compiled_permissions()
     if permission.resource_type != '/admin' \
        and permission.context_id \
        and self._is_allowed(permission._replace(context_id=None)):
       return True
-    if self._permission_match(permission, permissions):
+    if compiled.match(permission):
       return True
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
+    if compiled.is_admin:
       return True
-    return self._permission_match(
-        self._admin_permission_for_context(permission.context_id),
-        permissions)
-
-  @staticmethod
-  def _check_conditions(instance, action, conditions):
-    """Check if any condition is valid for the instance."""
-    for condition in conditions:
-      func = _CONDITIONS_MAP[str(condition['condition'])]
-      terms = condition.setdefault('terms', {})
-      if func(instance, _current_action=action, **terms):
-        return True
-    return False
+    return compiled.match(
+        self._admin_permission_for_context(permission.context_id))
 
   def _is_allowed_for(self, instance, action):
-    permissions = self._permissions()
-    # Check for admin permission
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
-      conditions = permissions[self.ADMIN_PERMISSION.action]\
-          .get(self.ADMIN_PERMISSION.resource_type)\
-          .get("conditions", {})\
-          .get(None, [])
-      if not conditions:
-        return True
-      return self._check_conditions(instance, action, conditions)
-    if (not permissions.get(action) or
-       not permissions[action].get(instance._inflector.model_singular)):
-      return False
-    resources = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('resources', [])
-    contexts = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('contexts', [])
-    # We can't use instance.context_id, because it requires the
-    # object <-> context mapping to be created,
-    # which isn't the case when creating objects
-    context_id = None
-    if hasattr(instance, 'context') and hasattr(instance.context, 'id'):
-      context_id = instance.context.id
-    if instance.id in resources:
-      return True
-    no_context_conditions = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('conditions', {})\
-        .setdefault(None, [])
-
-    context_conditions = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('conditions', {})\
-        .setdefault(context_id, [])
-    conditions = no_context_conditions + context_conditions
-    # Check any conditions applied per resource
-    if (None in contexts or context_id in contexts) and not conditions:
-      return True
-    return self._check_conditions(instance, action, conditions)
+    return self._compiled_permissions().is_allowed_for(instance, action)
+
+  def _is_allowed_for_many(self, instances, action):
+    compiled = self._compiled_permissions()
+    instances = list(instances)
+    compiled.preload(instances, action)
+    return [compiled.is_allowed_for(instance, action)
+            for instance in instances]
 
   def is_allowed_create(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to create a resource of the specified
@@ -307,6 +491,12 @@ class DefaultUserPermissions(UserPermissions):
     """Whether or not the user is allowed to read the given instance"""
     return self._is_allowed_for(instance, 'read')
 
+  def is_allowed_read_many(self, instances):
+    """Whether or not the user is allowed to read each of the instances.
+
+    Objects read by the conditions of all instances are loaded in bulk."""
+    return self._is_allowed_for_many(instances, 'read')
+
   def is_allowed_update(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to update a resource of the specified
     type in the context."""
@@ -330,10 +520,9 @@ class DefaultUserPermissions(UserPermissions):
   def _get_resources_for(self, action, resource_type):
     """Get resources resources (object ids) for a given action and
     resource_type"""
-    permissions = self._permissions()
-
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
+    if self._compiled_permissions().is_admin:
       return None
+    permissions = self._permissions()
 
     # Get the list of resources for a given resource type and any
     #   superclasses
@@ -351,10 +540,9 @@ class DefaultUserPermissions(UserPermissions):
   def _get_contexts_for(self, action, resource_type):
     # FIXME: (Security) When applicable, we should explicitly assert that no
     #   permissions are expected (e.g. that every user has ADMIN_PERMISSION).
-    permissions = self._permissions()
-
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
+    if self._compiled_permissions().is_admin:
       return None
+    permissions = self._permissions()
 
     # Get the list of contexts for a given resource type and any
     #   superclasses
@@ -376,6 +564,14 @@ class DefaultUserPermissions(UserPermissions):
       return None
     return ret
 
+  def materialized_resources_for(self, action, resource_type):
+    """Ids of resources granted by access control list entries, which are
+    stored in the person permissions table as well."""
+    return set(self._acl_permissions()
+               .get(action, {})
+               .get(resource_type, {})
+               .get('resources', ()))
+
   def create_contexts_for(self, resource_type):
     """All contexts in which the user has create permission."""
     return self._get_contexts_for('create', resource_type)
@@ -23,6 +23,21 @@ class UserPermissions(object):
     """
     raise NotImplementedError()
 
+  def is_allowed_read_many(self, instances):
+    """Whether or not the user is allowed to read each of the instances.
+
+    Returns a list of booleans in the order of ``instances``. Implementations
+    should check the whole batch at once instead of one instance at a time.
+    """
+    return [self.is_allowed_read_for(instance) for instance in instances]
+
+  def materialized_resources_for(self, action, resource_type):
+    """Ids of resources of the type that the person permissions table is
+    known to contain, they don't need to be listed in permission filters.
+    """
+    # pylint: disable=unused-argument
+    return set()
+
   def is_allowed_update(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to update a resource of the specified
     type in the context."""
@@ -6,6 +6,7 @@
 resources.
 """
 
+import base64
 import datetime
 import hashlib
 import itertools
@@ -18,24 +19,32 @@ from wsgiref.handlers import format_date_time
 from urllib import urlencode
 
 from flask import url_for, request, current_app, g, has_request_context
+from flask import stream_with_context
 from flask.views import View
 from flask.ext.sqlalchemy import Pagination
+import iso8601
 import sqlalchemy.orm.exc
 from sqlalchemy import and_, or_
+from sqlalchemy import inspect
+from sqlalchemy import orm
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql.expression import tuple_
 from werkzeug.exceptions import BadRequest, Forbidden
+from werkzeug.http import parse_date
 
 import ggrc.builder.json
 import ggrc.models
 from ggrc import db, utils
 from ggrc.utils import as_json, benchmark
+from ggrc.utils import collection_versions
+from ggrc.utils import pending_revisions
 from ggrc.fulltext import get_indexer
 from ggrc.login import get_current_user_id, get_current_user
 from ggrc.models.cache import Cache
 from ggrc.models.event import Event
 from ggrc.models.revision import Revision
 from ggrc.models.exceptions import ValidationError, translate_message
+from ggrc.models.reflection import AttributeInfo
 from ggrc.rbac import permissions, context_query_filter
 from ggrc.services.attribute_query import AttributeQueryBuilder
 from ggrc.services import signals
@@ -47,14 +56,16 @@ from ggrc import settings
 # pylint: disable=invalid-name
 logger = getLogger(__name__)
 
-
-CACHE_EXPIRY_COLLECTION = 60
+CONFLICT_MESSAGE = ("The resource could not be updated due to a conflict with "
+                    "the current state on the server. Please resolve the "
+                    "conflict by refreshing the resource.")
 
 
 def _get_cache_manager():
   from ggrc.cache import CacheManager, MemCache
   cache_manager = CacheManager()
-  cache_manager.initialize(MemCache())
+  cache_manager.initialize(
+      MemCache(tiered=getattr(settings, 'MEMCACHE_L1', False)))
   return cache_manager
 
 
@@ -87,29 +98,26 @@ def get_cache_class(obj):
   return obj.__class__.__name__
 
 
-def get_related_keys_for_expiration(context, o):
-  cls = get_cache_class(o)
-  keys = []
-  mappings = context.cache_manager.supported_mappings.get(cls, [])
-  if len(mappings) > 0:
-    for (cls, attr, polymorph) in mappings:
-      if polymorph:
-        key = get_cache_key(
-            None,
-            type=getattr(o, '{0}_type'.format(attr)),
-            id=getattr(o, '{0}_id'.format(attr)))
-        keys.append(key)
-      else:
-        obj = getattr(o, attr, None)
-        if obj:
-          if isinstance(obj, list):
-            for inner_o in obj:
-              key = get_cache_key(inner_o)
-              keys.append(key)
-          else:
-            key = get_cache_key(obj)
-            keys.append(key)
-  return keys
+def get_cache_namespaces(type_name):
+  """Get cache namespaces of a model and its polymorphic subclasses."""
+  model = ggrc.models.get_model(type_name)
+  if model is None:
+    return set()
+  return {'collection:' + mapper.class_._inflector.table_plural
+          for mapper in inspect(model).self_and_descendants}
+
+
+def get_related_namespaces(o):
+  """Get cache namespaces of all objects whose representation includes `o`.
+
+  Cached entries of a namespace are versioned by its generation, so
+  incrementing the generations of the returned namespaces expires the object
+  and everything that links to it.
+  """
+  namespaces = set()
+  for type_name in collection_versions.get_related_types(o):
+    namespaces.update(get_cache_namespaces(type_name))
+  return namespaces
 
 
 def set_ids_for_new_custom_attributes(parent_obj):
@@ -133,13 +141,13 @@ def set_ids_for_new_custom_attributes(parent_obj):
       obj.definition = parent_obj
 
 
-def memcache_mark_for_deletion(context, objects_to_mark):
+def memcache_mark_for_invalidation(context, objects_to_mark):
   """
-  Mark objects for deletion from memcache
+  Mark cache namespaces of objects for invalidation
 
   Args:
     context: application context
-    objects_to_mark: A list of objects to be deleted from memcache
+    objects_to_mark: A list of objects to be invalidated in memcache
 
   Returns:
     None
@@ -147,23 +155,20 @@ def memcache_mark_for_deletion(context, objects_to_mark):
   for o, _ in objects_to_mark:
     cls = get_cache_class(o)
     if cls in context.cache_manager.supported_classes:
-      key = get_cache_key(o)
-      context.cache_manager.marked_for_delete.append(key)
-      context.cache_manager.marked_for_delete.extend(
-          get_related_keys_for_expiration(context, o))
+      context.cache_manager.marked_for_invalidation.update(
+          get_related_namespaces(o))
 
 
-def update_memcache_before_commit(context, modified_objects, expiry_time):
+def update_memcache_before_commit(context, modified_objects):
   """
-  Preparing the memccache entries to be updated before DB commit
-  Also update the memcache to indicate the status cache operation
-  'InProgress' waiting for DB commit
-  Raises Exception on failures, cannot proceed with DB commit
+  Collect the memcache namespaces to be invalidated before DB commit
+
+  Namespaces are computed before the commit since the related objects of
+  deleted objects are not available afterwards.
 
   Args:
     context: POST/PUT/DELETE HTTP request or import Converter contextual object
     modified_objects:  objects in cache maintained prior to committing to DB
-    expiry_time: Expiry time specified for memcache ADD and DELETE
   Returns:
     None
 
@@ -174,37 +179,21 @@ def update_memcache_before_commit(context, modified_objects, expiry_time):
   context.cache_manager = _get_cache_manager()
 
   if modified_objects is not None:
-    if len(modified_objects.new) > 0:
-      memcache_mark_for_deletion(context, modified_objects.new.items())
-
-    if len(modified_objects.dirty) > 0:
-      memcache_mark_for_deletion(context, modified_objects.dirty.items())
-
-    if len(modified_objects.deleted) > 0:
-      memcache_mark_for_deletion(context, modified_objects.deleted.items())
-
-  status_entries = {}
-  for key in context.cache_manager.marked_for_delete:
-    build_cache_status(status_entries, 'DeleteOp:' + key,
-                       expiry_time, 'InProgress')
-  if len(status_entries) > 0:
-    logger.info("CACHE: status entries: %s", status_entries)
-    ret = context.cache_manager.bulk_add(status_entries, expiry_time)
-    if ret is not None and len(ret) == 0:
-      pass
-    else:
-      logger.error('CACHE: Unable to add status for newly created entries %s',
-                   ret)
+    memcache_mark_for_invalidation(context, modified_objects.new.items())
+    memcache_mark_for_invalidation(context, modified_objects.dirty.items())
+    memcache_mark_for_invalidation(context, modified_objects.deleted.items())
 
 
 def update_memcache_after_commit(context):
   """
-  The memccache entries is updated after DB commit
-  Logs error if there are errors in updating entries in cache
+  Invalidate the marked memcache namespaces after DB commit
+
+  The generation of every marked namespace is incremented with a single
+  memcache call, which makes all entries stored under the previous
+  generations unreachable. Logs error if the generations can not be updated.
 
   Args:
     context: POST/PUT/DELETE HTTP request or import Converter contextual object
-    modified_objects:  objects in cache maintained prior to committing to DB
   Returns:
     None
 
@@ -216,6 +205,7 @@ def update_memcache_after_commit(context):
     logger.error("CACHE: Error in initiaizing cache manager")
     return
 
+  from ggrc.cache import generations
   cache_manager = context.cache_manager
 
   related_objs = list()
@@ -223,46 +213,20 @@ def update_memcache_after_commit(context):
     obj_list = val.values()
     if obj_list:
       related_objs.append((obj_list[0], None))
-  memcache_mark_for_deletion(context, related_objs)
+  memcache_mark_for_invalidation(context, related_objs)
 
-  # TODO(dan): check for duplicates in marked_for_delete
-  if len(cache_manager.marked_for_delete) > 0:
-    delete_result = cache_manager.bulk_delete(
-        cache_manager.marked_for_delete, 0)
+  if cache_manager.marked_for_invalidation:
+    result = generations.increment(
+        cache_manager.cache_object.memcache_client,
+        cache_manager.marked_for_invalidation)
     # TODO(dan): handling failure including network errors,
     #            currently we log errors
-    if delete_result is not True:
-      logger.error("CACHE: Failed to remove collection from cache")
-
-  status_entries = []
-  for key in cache_manager.marked_for_delete:
-    status_entries.append('DeleteOp:' + str(key))
-  if len(status_entries) > 0:
-    delete_result = cache_manager.bulk_delete(status_entries, 0)
-    # TODO(dan): handling failure including network errors,
-    #            currently we log errors
-    if delete_result is not True:
-      logger.error("CACHE: Failed to remove status entries from cache")
+    if None in result.values():
+      logger.error("CACHE: Failed to invalidate collections in cache")
 
-  clear_permission_cache()
   cache_manager.clear_cache()
 
 
-def build_cache_status(data, key, expiry_timeout, status):
-  """
-  Build the dictionary for storing operational status of cache
-
-  Args:
-    data: dictionary to update
-    key: key to dictionary
-    expiry_timeout: timeout for expiry cache
-    status: Update status entry, e.g.InProgress
-  Returns:
-    None
-  """
-  data[key] = {'expiry': expiry_timeout, 'status': status}
-
-
 def inclusion_filter(obj):
   return permissions.is_allowed_read(obj.__class__.__name__,
                                      obj.id, obj.context_id)
@@ -306,46 +270,36 @@ def update_snapshot_index(session, cache):
   reindex_snapshots(reindex_snapshots_ids)
 
 
-def _revision_generator(user_id, action, objects):
-  for obj in objects:
-    yield Revision(obj, user_id, action, obj.log_json())
-
-
-def _get_log_revisions(current_user_id, obj=None, force_obj=False):
-  """Generate and return revisions for all cached objects."""
-  revisions = []
+def _get_log_changes(obj=None, force_obj=False):
+  """Get (action, object) pairs for all cached objects."""
+  changes = []
   cache = get_cache()
   if not cache:
-    return revisions
+    return changes
   owner_modified_objects = []
   folder_modified_objects = []
   all_edited_objects = itertools.chain(cache.new, cache.dirty, cache.deleted)
   for o in all_edited_objects:
     if o.type == "ObjectFolder" and o.folderable:
       folder_modified_objects.append(o.folderable)
-  revisions.extend(_revision_generator(
-      current_user_id, "created", cache.new
-  ))
-  revisions.extend(_revision_generator(
-      current_user_id, "modified", cache.dirty
-  ))
-  revisions.extend(_revision_generator(
-      current_user_id, "modified", owner_modified_objects
-  ))
-  revisions.extend(_revision_generator(
-      current_user_id, "modified", folder_modified_objects
-  ))
+  changes.extend(("created", o) for o in cache.new)
+  changes.extend(("modified", o) for o in cache.dirty)
+  changes.extend(("modified", o) for o in owner_modified_objects)
+  changes.extend(("modified", o) for o in folder_modified_objects)
   if force_obj and obj is not None and obj not in cache.dirty:
     # If the ``obj`` has been updated, but only its custom attributes have
     # been changed, then this object will not be added into
     # ``cache.dirty set``. So that its revision will not be created.
     # The ``force_obj`` flag solves the issue, but in a bit dirty way.
-    revision = Revision(obj, current_user_id, 'modified', obj.log_json())
-    revisions.append(revision)
-  revisions.extend(_revision_generator(
-      current_user_id, "deleted", cache.deleted
-  ))
-  return revisions
+    changes.append(("modified", obj))
+  changes.extend(("deleted", o) for o in cache.deleted)
+  return changes
+
+
+def _get_log_revisions(current_user_id, obj=None, force_obj=False):
+  """Generate and return revisions for all cached objects."""
+  return [Revision(o, current_user_id, action, o.log_json())
+          for action, o in _get_log_changes(obj=obj, force_obj=force_obj)]
 
 
 def log_event(session, obj=None, current_user_id=None, flush=True,
@@ -366,38 +320,92 @@ def log_event(session, obj=None, current_user_id=None, flush=True,
     session.flush()
   if current_user_id is None:
     current_user_id = get_current_user_id()
+  if pending_revisions.is_enabled():
+    return _log_pending_event(session, obj, current_user_id,
+                              _get_log_changes(obj=obj, force_obj=force_obj))
   revisions = _get_log_revisions(current_user_id, obj=obj, force_obj=force_obj)
-  if obj is None:
-    resource_id = 0
-    resource_type = None
-    action = 'BULK'
-    context_id = 0
-  else:
-    resource_id = obj.id
-    resource_type = str(obj.__class__.__name__)
-    action = request.method
-    context_id = obj.context_id
   if revisions:
-    event = Event(
-        modified_by_id=current_user_id,
-        action=action,
-        resource_id=resource_id,
-        resource_type=resource_type,
-        context_id=context_id)
+    event = _build_event(obj, current_user_id)
     event.revisions = revisions
     session.add(event)
   return event
 
 
-def clear_permission_cache():
-  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
-    return
-  cache = _get_cache_manager().cache_object.memcache_client
-  cached_keys_set = cache.get('permissions:list') or set()
-  cached_keys_set.add('permissions:list')
-  # We delete all the cached user permissions as well as
-  # the permissions:list value itself
-  cache.delete_multi(cached_keys_set)
+def log_bulk_event(session, obj=None, current_user_id=None, force_objs=()):
+  """Logs an event on object `obj` and writes revisions with one INSERT.
+
+  Same as `log_event`, but revisions of all cached objects are inserted with
+  a single executemany statement instead of being flushed one by one.
+
+  Args:
+    session: Current SQLAlchemy session (db.session)
+    obj: object on which some operation took place
+    current_user_id: ID of the user performing operation
+    force_objs: Objects that get a "modified" revision even if only their
+      custom attributes have been changed, see `log_event`
+  Returns:
+    Uncommitted models.Event instance
+  """
+  if current_user_id is None:
+    current_user_id = get_current_user_id()
+  changes = _get_log_changes()
+  cache = get_cache()
+  dirty = cache.dirty if cache else set()
+  changes.extend(("modified", o) for o in force_objs if o not in dirty)
+  if pending_revisions.is_enabled():
+    return _log_pending_event(session, obj, current_user_id, changes)
+  if not changes:
+    return None
+  event = _build_event(obj, current_user_id)
+  session.add(event)
+  session.flush()
+  _insert_revisions(session, event, current_user_id, changes)
+  return event
+
+
+def _log_pending_event(session, obj, current_user_id, changes):
+  """Logs an event with change records instead of revisions.
+
+  Revisions are written later from the change records.
+
+  Returns:
+    Uncommitted models.Event instance
+  """
+  if not changes:
+    return None
+  event = _build_event(obj, current_user_id)
+  session.add(event)
+  session.flush()
+  pending_revisions.capture(session, event, changes)
+  return event
+
+
+def _insert_revisions(session, event, current_user_id, changes):
+  """Insert revisions of a flushed event with a single INSERT."""
+  session.execute(
+      Revision.__table__.insert(),
+      [pending_revisions.get_revision_row(
+          Revision(o, current_user_id, action, o.log_json()), event.id)
+       for action, o in changes],
+  )
+  collection_versions.mark_modified("Revision")
+
+
+def _build_event(obj, current_user_id):
+  """Create an event for an operation on `obj`."""
+  if obj is None:
+    return Event(
+        modified_by_id=current_user_id,
+        action='BULK',
+        resource_id=0,
+        resource_type=None,
+        context_id=0)
+  return Event(
+      modified_by_id=current_user_id,
+      action=request.method,
+      resource_id=obj.id,
+      resource_type=str(obj.__class__.__name__),
+      context_id=obj.context_id)
 
 
 class ModelView(View):
@@ -406,6 +414,7 @@ class ModelView(View):
   # access to _sa_class_manager is needed for fetching the right mapper
   DEFAULT_PAGE_SIZE = 20
   MAX_PAGE_SIZE = 100
+  STREAM_CHUNK_SIZE = 1000
   pk = 'id'
   pk_type = 'int'
 
@@ -626,6 +635,37 @@ class ModelView(View):
       return self.modified_at(result)
     return datetime.datetime.now()
 
+  def collection_version_info(self):
+    """Get last modification time and etag of the collection from versions.
+
+    The etag depends on the versions of the model type and of the types that
+    affect permissions, on the current user and on the query string, so it
+    can be calculated without querying the collection table.
+
+    Returns:
+      (last_modified, etag) tuple, or (None, None) if the model type has no
+      recorded version yet.
+    """
+    type_names = (self.model.__name__,) + collection_versions.PERMISSION_TYPES
+    versions = collection_versions.get_versions(type_names)
+    if self.model.__name__ not in versions:
+      return None, None
+    last_modified = max(updated_at for _, updated_at in versions.values())
+    info = "{} {} {} {}".format(
+        self.model.__name__,
+        sorted((name, version) for name, (version, _) in versions.items()),
+        get_current_user_id(),
+        request.query_string,
+    )
+    return last_modified, etag(last_modified, info)
+
+  def is_not_modified_since(self, last_modified):
+    """Check the If-Modified-Since request header against a timestamp."""
+    since = parse_date(self.request.headers.get('If-Modified-Since'))
+    if since is None or last_modified is None:
+      return False
+    return parse_date(self.http_timestamp(last_modified)) <= since
+
   # Routing helpers
   @classmethod
   def endpoint_name(cls):
@@ -707,7 +747,10 @@ class Resource(ModelView):
             else:
               return self.collection_post()
           elif method == 'PUT':
-            return self.put(*args, **kwargs)
+            if self.pk in kwargs and kwargs[self.pk] is not None:
+              return self.put(*args, **kwargs)
+            else:
+              return self.collection_put()
           elif method == 'DELETE':
             return self.delete(*args, **kwargs)
           else:
@@ -753,18 +796,26 @@ class Resource(ModelView):
         raise Forbidden()
       if not permissions.is_allowed_read_for(obj):
         raise Forbidden()
+    last_modified = self.modified_at(obj)
+    obj_etag = etag(last_modified, get_info(obj))
+    # If-Modified-Since is ignored when If-None-Match is present, see
+    # RFC 7232 section 6.
+    if 'If-None-Match' in self.request.headers:
+      if self.request.headers['If-None-Match'] == obj_etag:
+        with benchmark("Make response"):
+          return current_app.make_response(
+              ('', 304, [('Etag', obj_etag)]))
+    elif self.is_not_modified_since(last_modified):
+      with benchmark("Make response"):
+        return current_app.make_response((
+            '', 304,
+            [('Last-Modified', self.http_timestamp(last_modified))]))
     with benchmark("Serialize object"):
       object_for_json = self.object_for_json(obj)
 
-    obj_etag = etag(self.modified_at(obj), get_info(obj))
-    if 'If-None-Match' in self.request.headers and \
-       self.request.headers['If-None-Match'] == obj_etag:
-      with benchmark("Make response"):
-        return current_app.make_response(
-            ('', 304, [('Etag', obj_etag)]))
     with benchmark("Make response"):
       return self.json_success_response(
-          object_for_json, self.modified_at(obj), obj_etag=obj_etag)
+          object_for_json, last_modified, obj_etag=obj_etag)
 
   def validate_headers_for_put_or_delete(self, obj):
     """rfc 6585 defines a new status code for missing required headers"""
@@ -785,11 +836,7 @@ class Resource(ModelView):
     if (request.headers["If-Match"] != object_etag or
             request.headers["If-Unmodified-Since"] != object_timestamp):
       return current_app.make_response((
-          json.dumps({
-              "message": "The resource could not be updated due to a conflict "
-                         "with the current state on the server. Please "
-                         "resolve the conflict by refreshing the resource.",
-          }),
+          json.dumps({"message": CONFLICT_MESSAGE}),
           409,
           [("Content-Type", "application/json")]
       ))
@@ -852,8 +899,7 @@ class Resource(ModelView):
     with benchmark("Log event"):
       event = log_event(db.session, obj, force_obj=True)
     with benchmark("Update memcache before commit for collection PUT"):
-      update_memcache_before_commit(
-          self.request, modified_objects, CACHE_EXPIRY_COLLECTION)
+      update_memcache_before_commit(self.request, modified_objects)
     with benchmark("Commit"):
       db.session.commit()
     with benchmark("Query for object"):
@@ -872,8 +918,7 @@ class Resource(ModelView):
       with benchmark("Get modified objects"):
         modified_objects = get_modified_objects(db.session)
       with benchmark("Update memcache before commit"):
-        update_memcache_before_commit(
-            self.request, modified_objects, CACHE_EXPIRY_COLLECTION)
+        update_memcache_before_commit(self.request, modified_objects)
       db.session.commit()
       with benchmark("Update memcache after commit"):
         update_memcache_after_commit(self.request)
@@ -886,6 +931,154 @@ class Resource(ModelView):
           object_for_json, self.modified_at(obj),
           obj_etag=etag(self.modified_at(obj), get_info(obj)))
 
+  def _unwrap_collection_put_body(self, body):
+    """Get a list of (id, etag, changes) tuples from a batch update body.
+
+    Raises:
+      BadRequest if any of the items is malformed.
+    """
+    if not isinstance(body, list) or not body:
+      raise BadRequest('Batch update requires a list of updates.')
+    items = []
+    for item in body:
+      try:
+        items.append((int(item["id"]), item["etag"], dict(item["changes"])))
+      except (KeyError, TypeError, ValueError):
+        raise BadRequest(
+            'Each update requires "id", "etag" and "changes" attributes.')
+    if len(set(obj_id for obj_id, _, _ in items)) != len(items):
+      raise BadRequest('Each object can be updated only once in a batch.')
+    return items
+
+  def _apply_batch_update(self, obj, obj_etag, changes, src):
+    """Apply a single item of a batch update.
+
+    The changes are applied on top of ``src``, the current representation of
+    the object, so only the changed attributes need to be sent.
+
+    Returns:
+      (error, src) tuple, where error is a (status, body) tuple or None if the
+      update succeeded and src is the applied object representation.
+    """
+    if obj is None:
+      return (404, self.not_found_message()), None
+    if obj_etag != etag(self.modified_at(obj), get_info(obj)):
+      return (409, CONFLICT_MESSAGE), None
+    src.update(changes)
+    try:
+      with benchmark("Deserialize object"):
+        self.json_update(obj, src)
+      obj.modified_by_id = get_current_user_id()
+      with benchmark("Query update permissions"):
+        self._check_put_permissions(obj, self.get_context_id_from_json(src))
+      with benchmark("Process actions"):
+        self.process_actions(obj)
+      with benchmark("Validate custom attributes"):
+        if hasattr(obj, "validate_custom_attributes"):
+          obj.validate_custom_attributes()
+    except (ValidationError, ValueError) as error:
+      return self._make_error_from_exception(error), None
+    except (BadRequest, Forbidden) as error:
+      return (error.code, error.description), None
+    with benchmark("Send PUT event"):
+      signals.Restful.model_put.send(
+          obj.__class__, obj=obj, src=src, service=self)
+    with benchmark("Update custom attribute values"):
+      set_ids_for_new_custom_attributes(obj)
+    return None, src
+
+  def collection_put(self):
+    """Update many objects of the collection in a single transaction.
+
+    The request body is a list of updates in the following format:
+
+      [{"id": 1, "etag": "<etag of the object>", "changes": {"title": "A"}}]
+
+    Either all updates are committed or none of them. The response contains
+    a (status, body) pair for every update in the request order.
+    """
+    if self.request.mimetype != 'application/json':
+      return current_app.make_response(
+          ('Content-Type must be application/json', 415, []))
+    items = self._unwrap_collection_put_body(self.request.json)
+    ids = [obj_id for obj_id, _, _ in items]
+    with benchmark("Query for objects"):
+      objects = {
+          obj.id: obj for obj in self.get_collection(
+              filter_by_contexts=False).filter(self.model.id.in_(ids))
+      }
+
+    with benchmark("Serialize objects"):
+      root_attribute = self.model._inflector.table_singular
+      found = objects.values()
+      representations = {
+          obj.id: obj_json[root_attribute]
+          for obj, obj_json in itertools.izip(
+              found, self.objects_for_json(found))
+      }
+
+    with benchmark("Apply updates: {}".format(len(items))):
+      res, sources = zip(*[
+          self._apply_batch_update(objects.get(obj_id), obj_etag, changes,
+                                   representations.get(obj_id))
+          for obj_id, obj_etag, changes in items
+      ])
+    errors = [result for result in res if result is not None]
+    if errors:
+      db.session.rollback()
+      res = [result or (424, "Not updated due to errors in other updates.")
+             for result in res]
+      return current_app.make_response((self.as_json(res), errors[0][0], {
+          "Content-Type": "application/json",
+          "X-Flash-Error": " || ".join(error for _, error in errors),
+      }))
+
+    updated = [objects[obj_id] for obj_id in ids]
+    with benchmark("Get modified objects"):
+      modified_objects = get_modified_objects(db.session)
+    with benchmark("Log event for all objects"):
+      event = log_bulk_event(db.session, force_objs=updated)
+    with benchmark("Update memcache before commit for batch PUT"):
+      update_memcache_before_commit(self.request, modified_objects)
+    with benchmark("Commit"):
+      db.session.commit()
+    with benchmark("Update index"):
+      update_snapshot_index(db.session, modified_objects)
+    with benchmark("Update memcache after commit for batch PUT"):
+      update_memcache_after_commit(self.request)
+    with benchmark("Send PUT - after commit event"):
+      for obj, src in itertools.izip(updated, sources):
+        signals.Restful.model_put_after_commit.send(
+            obj.__class__, obj=obj, src=src, service=self, event=event)
+      with benchmark("Get modified objects"):
+        modified_objects = get_modified_objects(db.session)
+      with benchmark("Update memcache before commit"):
+        update_memcache_before_commit(self.request, modified_objects)
+      db.session.commit()
+      with benchmark("Update memcache after commit"):
+        update_memcache_after_commit(self.request)
+      if self.has_cache():
+        for obj in updated:
+          self.invalidate_cache_to(obj)
+    if event:
+      with benchmark("Send event job"):
+        send_event_job(event)
+    with benchmark("Query for objects"):
+      # Committed objects are expired, reload them with the eager options
+      # of the collection instead of loading them one by one.
+      objects = {
+          obj.id: obj for obj in self.get_collection(
+              filter_by_contexts=False).filter(self.model.id.in_(ids))
+      }
+      updated = [objects.get(obj_id, obj)
+                 for obj_id, obj in itertools.izip(ids, updated)]
+    with benchmark("Serialize objects"):
+      res = [(200, object_for_json)
+             for object_for_json in self.objects_for_json(updated)]
+    with benchmark("Make response"):
+      return current_app.make_response((
+          self.as_json(res), 200, {"Content-Type": "application/json"}))
+
   def delete(self, id):
     if 'X-Appengine-Taskname' not in request.headers:
       task = create_task(request.method, request.full_path)
@@ -921,8 +1114,7 @@ class Resource(ModelView):
       with benchmark("Log event"):
         event = log_event(db.session, obj)
       with benchmark("Update memcache before commit for collection DELETE"):
-        update_memcache_before_commit(
-            self.request, modified_objects, CACHE_EXPIRY_COLLECTION)
+        update_memcache_before_commit(self.request, modified_objects)
       with benchmark("Commit"):
         db.session.commit()
       with benchmark("Update index"):
@@ -971,10 +1163,122 @@ class Resource(ModelView):
     }
     return matches, collection_extras
 
+  def cursor_attr_names(self):
+    """Names of the attributes that define the cursor paging order.
+
+    The collection is walked in descending order of these attributes, the
+    last one must be unique.
+    """
+    if hasattr(self.model, self.modified_attr_name):
+      return (self.modified_attr_name, 'id')
+    return ('id',)
+
+  def _encode_cursor(self, direction, match):
+    """Build an opaque cursor token pointing at `match` row."""
+    values = []
+    for name in self.cursor_attr_names():
+      value = getattr(match, name)
+      if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+      values.append(value)
+    return base64.urlsafe_b64encode(json.dumps([direction, values]))
+
+  def _decode_cursor(self, token):
+    """Get direction and attribute values from a cursor token."""
+    try:
+      direction, values = json.loads(base64.urlsafe_b64decode(str(token)))
+      names = self.cursor_attr_names()
+      if direction not in ('next', 'prev') or len(values) != len(names):
+        raise ValueError()
+      for index, name in enumerate(names):
+        column = getattr(self.model, name).property.columns[0]
+        if isinstance(column.type, sqlalchemy.DateTime):
+          values[index] = iso8601.parse_date(values[index]).replace(
+              tzinfo=None)
+    except (TypeError, ValueError, iso8601.ParseError):
+      raise BadRequest('Invalid __cursor value.')
+    return direction, values
+
+  def apply_cursor_paging(self, matches_query):
+    """Get a single page of matches using keyset pagination.
+
+    Instead of LIMIT/OFFSET the page is selected with a condition on the
+    `cursor_attr_names` columns of the last row of the previous page, so deep
+    pages cost the same as the first one and no COUNT(*) is needed. The
+    `__cursor` argument holds an opaque token taken from the `next` or `prev`
+    paging links; an empty value requests the first page. The number of rows
+    before the current page is returned only when `__skipped` is requested.
+    """
+    if '__sort' in request.args:
+      raise BadRequest('__cursor paging can not be combined with __sort.')
+    page_size = min(
+        int(request.args.get('__page_size', self.DEFAULT_PAGE_SIZE)),
+        self.MAX_PAGE_SIZE)
+    columns = [getattr(self.model, name) for name in self.cursor_attr_names()]
+    token = request.args['__cursor']
+    if token:
+      direction, values = self._decode_cursor(token)
+    else:
+      direction, values = 'next', None
+    forward = direction == 'next'
+
+    query = matches_query.order_by(None)
+    if values is not None:
+      query = query.filter(_keyset_filter(columns, values, forward))
+    if forward:
+      query = query.order_by(*[column.desc() for column in columns])
+    else:
+      query = query.order_by(*[column.asc() for column in columns])
+    matches = query.limit(page_size + 1).all()
+    has_more = len(matches) > page_size
+    matches = matches[:page_size]
+    if not forward:
+      matches.reverse()
+
+    has_next = has_more if forward else values is not None
+    has_prev = values is not None if forward else has_more
+    paging = {}
+    if matches:
+      if has_next:
+        paging['next'] = self._cursor_page_url(
+            self._encode_cursor('next', matches[-1]), page_size)
+      if has_prev:
+        paging['prev'] = self._cursor_page_url(
+            self._encode_cursor('prev', matches[0]), page_size)
+      if '__skipped' in request.args:
+        first_values = [getattr(matches[0], name)
+                        for name in self.cursor_attr_names()]
+        paging['skipped'] = matches_query.order_by(None).filter(
+            _keyset_filter(columns, first_values, False)).count()
+    paging['first'] = self._cursor_page_url('', page_size)
+    return matches, {'paging': paging}
+
+  def _cursor_page_url(self, token, page_size):
+    """Build collection url with current arguments and the given cursor."""
+    args = dict([(k, unicode(v)) for k, v in request.args.items()])
+    args['__cursor'] = token
+    if '__page_size' in args:
+      args['__page_size'] = page_size
+    return self.url_for() + '?' + urlencode(utils.encoded_dict(args))
+
+  def read_cache_generations(self):
+    """Read generations of the cached collection before loading any data.
+
+    Generations are read before the data of the request, so that entries
+    built from data read before a concurrent commit are added to an expired
+    generation, see `generations.get_snapshot_generations`.
+    """
+    from ggrc.cache import generations
+    self.request.cache_manager = _get_cache_manager()
+    memcache_client = self.request.cache_manager.cache_object.memcache_client
+    self.request.cache_generations = generations.get_snapshot_generations(
+        memcache_client, get_cache_namespaces(self.model.__name__)) or {}
+
   def get_matched_resources(self, matches):
     cache_objs = {}
     if self.has_cache():
-      self.request.cache_manager = _get_cache_manager()
+      if not hasattr(self.request, "cache_generations"):
+        self.read_cache_generations()
       with benchmark("Query cache for resources"):
         cache_objs = self.get_resources_from_cache(matches)
       database_matches = [m for m in matches if m not in cache_objs]
@@ -1000,6 +1304,20 @@ class Resource(ModelView):
         return current_app.make_response((
             'application/json', 406, [('Content-Type', 'text/plain')]))
 
+    with benchmark("dispatch_request > collection_get > Check version"):
+      last_modified, version_etag = self.collection_version_info()
+      if 'If-None-Match' in self.request.headers:
+        not_modified = self.request.headers['If-None-Match'] == version_etag
+      else:
+        not_modified = self.is_not_modified_since(last_modified)
+      if version_etag and not_modified:
+        return current_app.make_response((
+            '', 304, [('Etag', version_etag)]))
+
+    if self.has_cache():
+      with benchmark("dispatch_request > collection_get > Read generations"):
+        self.read_cache_generations()
+
     with benchmark("dispatch_request > collection_get > Collection matches"):
       # We skip querying by contexts for Creator role and relationship objects,
       # because it will filter out objects that the Creator can access.
@@ -1010,8 +1328,15 @@ class Resource(ModelView):
       )
       matches_query = self.get_collection_matches(
           self.model, filter_by_contexts)
+    paging = '__page' in request.args or '__page_only' in request.args
+    cursor_paging = '__cursor' in request.args
+    if '__stream' in request.args and not (paging or cursor_paging):
+      return self.collection_stream_response(matches_query)
     with benchmark("dispatch_request > collection_get > Query Data"):
-      if '__page' in request.args or '__page_only' in request.args:
+      if cursor_paging:
+        with benchmark("Query matches with cursor paging"):
+          matches, extras = self.apply_cursor_paging(matches_query)
+      elif paging:
         with benchmark("Query matches with paging"):
           matches, extras = self.apply_paging(matches_query)
       else:
@@ -1019,45 +1344,108 @@ class Resource(ModelView):
           matches = matches_query.all()
           extras = {}
     with benchmark("dispatch_request > collection_get > Matched resources"):
-      cache_op = None
-      if '__stubs_only' in request.args:
-        objs = [{
-            'id': m[0],
-            'type': m[1],
-            'href': utils.url_for(m[1], id=m[0]),
-            'context_id': m[2]
-        } for m in matches]
-
-      else:
-        cache_objs, database_objs = self.get_matched_resources(matches)
-        objs = {}
-        objs.update(cache_objs)
-        objs.update(database_objs)
-
-        objs = [objs[m] for m in matches if m in objs]
-        with benchmark("Filter resources based on permissions"):
-          objs = filter_resource(objs)
-
-        cache_op = 'Hit' if len(cache_objs) > 0 else 'Miss'
+      objs, cache_op = self.get_collection_objects(matches)
     with benchmark("dispatch_request > collection_get > Create Response"):
-      # Return custom fields specified via `__fields=id,title,description` etc.
-      # TODO this can be optimized by filter_resource() not retrieving
-      # the other fields to being with
-      if '__fields' in request.args:
-        custom_fields = request.args['__fields'].split(',')
-        objs = [{f: o[f] for f in custom_fields if f in o} for o in objs]
       with benchmark("Serialize collection"):
         collection = self.build_collection_representation(
             objs, extras=extras)
 
-      if 'If-None-Match' in self.request.headers and \
-         self.request.headers['If-None-Match'] == etag(collection):
-        return current_app.make_response((
-            '', 304, [('Etag', etag(collection))]))
+      if version_etag is None:
+        if 'If-None-Match' in self.request.headers and \
+           self.request.headers['If-None-Match'] == etag(collection):
+          return current_app.make_response((
+              '', 304, [('Etag', etag(collection))]))
+        last_modified = self.collection_last_modified()
 
       with benchmark("Make response"):
         return self.json_success_response(
-            collection, self.collection_last_modified(), cache_op=cache_op)
+            collection, last_modified, cache_op=cache_op,
+            obj_etag=version_etag)
+
+  def get_collection_objects(self, matches):
+    """Get representations of matched collection members.
+
+    Args:
+      matches: list of rows returned by the collection matches query.
+
+    Returns:
+      tuple of the list of readable object representations in the order of
+      `matches` and the cache operation status ('Hit', 'Miss' or None).
+    """
+    cache_op = None
+    sparse_fields = self.get_sparse_fields()
+    if '__stubs_only' in request.args:
+      objs = [{
+          'id': m[0],
+          'type': m[1],
+          'href': utils.url_for(m[1], id=m[0]),
+          'context_id': m[2]
+      } for m in matches]
+
+    elif sparse_fields:
+      objs = self.get_sparse_resources(matches, sparse_fields)
+      objs = [objs[m] for m in matches if m in objs]
+      with benchmark("Filter resources based on permissions"):
+        objs = filter_resource(objs)
+
+    else:
+      cache_objs, database_objs = self.get_matched_resources(matches)
+      objs = {}
+      objs.update(cache_objs)
+      objs.update(database_objs)
+
+      objs = [objs[m] for m in matches if m in objs]
+      with benchmark("Filter resources based on permissions"):
+        objs = filter_resource(objs)
+
+      cache_op = 'Hit' if len(cache_objs) > 0 else 'Miss'
+    # Return custom fields specified via `__fields=id,title,description` etc.
+    if '__fields' in request.args:
+      custom_fields = request.args['__fields'].split(',')
+      objs = [{f: o[f] for f in custom_fields if f in o} for o in objs]
+    return objs, cache_op
+
+  def iter_match_chunks(self, matches_query):
+    """Generate lists of at most STREAM_CHUNK_SIZE rows of `matches_query`."""
+    matches = iter(matches_query.yield_per(self.STREAM_CHUNK_SIZE))
+    while True:
+      chunk = list(itertools.islice(matches, self.STREAM_CHUNK_SIZE))
+      if not chunk:
+        return
+      yield chunk
+
+  def collection_stream_response(self, matches_query):
+    """Stream the collection representation to the client.
+
+    Collection members are fetched, published and written to the socket one
+    chunk at a time, so the memory used by the worker does not depend on the
+    size of the collection. The body is equivalent to the one built by
+    build_collection_representation. Streamed responses carry no Etag since
+    the body is not known before it is sent.
+    """
+    table_plural = self.model._inflector.table_plural
+    head = '{{"{0}_collection": {{"selfLink": {1}, "{0}": ['.format(
+        table_plural, self.as_json(self.url_for_preserving_querystring()))
+
+    def generate():
+      """Yield the collection JSON piece by piece."""
+      yield head
+      separator = ''
+      for matches in self.iter_match_chunks(matches_query):
+        with benchmark("collection_get > stream > Matched resources"):
+          objs, _ = self.get_collection_objects(matches)
+        if objs:
+          yield separator + ','.join(self.as_json(obj) for obj in objs)
+          separator = ','
+      yield ']}}'
+
+    headers = [
+        ('Last-Modified',
+         self.http_timestamp(self.collection_last_modified())),
+        ('Content-Type', 'application/json'),
+    ]
+    return current_app.response_class(
+        stream_with_context(generate()), 200, headers)
 
   def get_resources_from_cache(self, matches):
     """Get resources from cache for specified matches"""
@@ -1068,25 +1456,39 @@ class Resource(ModelView):
     if self.model.__name__ == 'BackgroundTask':
       return resources
     # Skip right to memcache
+    from ggrc.cache import generations
     memcache_client = self.request.cache_manager.cache_object.memcache_client
-    for match in matches:
-      key = get_cache_key(None, id=match[0], type=match[1])
-      val = memcache_client.get(key) or {}
-      if "selfLink" in val:
-        resources[match] = val
+    keys = {get_cache_key(None, id=match[0], type=match[1]): match
+            for match in matches}
+    versioned_keys = {}
+    for key, match in keys.iteritems():
+      generation = self.request.cache_generations.get(
+          generations.get_namespace(key))
+      if generation is not None:
+        versioned_keys[generations.versioned_key(key, generation)] = match
+    values = memcache_client.get_multi(versioned_keys.keys()) or {}
+    for key, val in values.iteritems():
+      if "selfLink" in (val or {}):
+        resources[versioned_keys[key]] = val
     return resources
 
   def add_resources_to_cache(self, match_obj_pairs):
-    """Add resources to cache if they are not blocked by DeleteOp entries"""
+    """Add resources to cache in the generations they were read in"""
     # Skip right to memcache
+    from ggrc.cache import generations
     memcache_client = self.request.cache_manager.cache_object.memcache_client
+    cache_generations = getattr(self.request, "cache_generations", {})
     for match, obj in match_obj_pairs.items():
-      memcache_client.add(get_cache_key(None, id=match[0], type=match[1]), obj)
+      key = get_cache_key(None, id=match[0], type=match[1])
+      generation = cache_generations.get(generations.get_namespace(key))
+      if generation is not None:
+        memcache_client.add(generations.versioned_key(key, generation), obj)
 
   def invalidate_cache_to(self, obj):
     """Invalidate api cache for sent object."""
+    from ggrc.cache import generations
     memcache_client = self.request.cache_manager.cache_object.memcache_client
-    memcache_client.delete(get_cache_key(None, id=obj.id, type=obj.type))
+    generations.increment(memcache_client, get_cache_namespaces(obj.type))
 
   def json_create(self, obj, src):
     ggrc.builder.json.create(obj, src)
@@ -1230,7 +1632,21 @@ class Resource(ModelView):
             obj.id: obj for obj in class_.query.filter(class_.id.in_(ids))
         }
 
-  def collection_post_loop(self, body, res, no_result, running_async):
+  def can_post_in_bulk(self):
+    """Check if posted objects can be handled in bulk.
+
+    Bulk mode does not send the per-object `model_posted` and
+    `model_posted_after_commit` signals, so it is only allowed for models
+    that have no receivers for them.
+    """
+    return not (
+        signals.Restful.model_posted.has_receivers_for(self.model) or
+        signals.Restful.model_posted_after_commit.has_receivers_for(
+            self.model)
+    )
+
+  def collection_post_loop(self, body, res, no_result, running_async,
+                           bulk=False):
     """Handle all posted objects.
 
     Args:
@@ -1238,23 +1654,34 @@ class Resource(ModelView):
       res: List that will get responses appended to it.
       no_result: Flag for suppressing results.
       running_async: Flag for async jobs.
+      bulk: Flag for handling the objects as a single batch. All sources are
+        validated before any object is created, only the collection level
+        signals are sent and revisions are written with a single INSERT.
     """
 
+    if bulk:
+      with benchmark("Validate posted sources"):
+        body_sources = [self._unwrap_collection_post_src(wrapped_src)
+                        for wrapped_src in body]
+    else:
+      body_sources = (self._unwrap_collection_post_src(wrapped_src)
+                      for wrapped_src in body)
     with benchmark("Generate objects"):
       objects = []
       sources = []
-      for wrapped_src in body:
-        src = self._unwrap_collection_post_src(wrapped_src)
+      current_user = get_current_user()
+      for src in body_sources:
         obj = self._get_model_instance(src, body)
         with benchmark("Deserialize object"):
           self.json_create(obj, src)
-        with benchmark("Send model POSTed event"):
-          signals.Restful.model_posted.send(
-              obj.__class__, obj=obj, src=src, service=self)
+        if not bulk:
+          with benchmark("Send model POSTed event"):
+            signals.Restful.model_posted.send(
+                obj.__class__, obj=obj, src=src, service=self)
         with benchmark("Update custom attribute values"):
           set_ids_for_new_custom_attributes(obj)
 
-        obj.modified_by = get_current_user()
+        obj.modified_by = current_user
         objects.append(obj)
         sources.append(src)
 
@@ -1272,14 +1699,18 @@ class Resource(ModelView):
     with benchmark("Get modified objects"):
       modified_objects = get_modified_objects(db.session)
     with benchmark("Log event for all objects"):
-      event = log_event(db.session, obj, flush=False)
+      if bulk:
+        event = log_bulk_event(db.session, obj)
+      else:
+        event = log_event(db.session, obj, flush=False)
     with benchmark("Update memcache before commit for collection POST"):
-      update_memcache_before_commit(
-          self.request, modified_objects, CACHE_EXPIRY_COLLECTION)
+      update_memcache_before_commit(self.request, modified_objects)
     with benchmark("Serialize objects"):
-      for obj in objects:
-        object_for_json = {} if no_result else self.object_for_json(obj)
-        res.append((201, object_for_json))
+      if no_result:
+        res.extend((201, {}) for _ in objects)
+      else:
+        res.extend((201, object_for_json)
+                   for object_for_json in self.objects_for_json(objects))
     with benchmark("Commit collection"):
       db.session.commit()
     with benchmark("Update index"):
@@ -1287,13 +1718,14 @@ class Resource(ModelView):
     with benchmark("Update memcache after commit for collection POST"):
       update_memcache_after_commit(self.request)
 
-    with benchmark("Send model POSTed - after commit event"):
-      for obj, src in itertools.izip(objects, sources):
-        signals.Restful.model_posted_after_commit.send(
-            obj.__class__, obj=obj, src=src, service=self, event=event)
-        # Note: In model_posted_after_commit necessary mapping and
-        # relationships are set, so need to commit the changes
-      db.session.commit()
+    if not bulk:
+      with benchmark("Send model POSTed - after commit event"):
+        for obj, src in itertools.izip(objects, sources):
+          signals.Restful.model_posted_after_commit.send(
+              obj.__class__, obj=obj, src=src, service=self, event=event)
+          # Note: In model_posted_after_commit necessary mapping and
+          # relationships are set, so need to commit the changes
+        db.session.commit()
     with benchmark("Send event job"):
       send_event_job(event)
 
@@ -1334,11 +1766,13 @@ class Resource(ModelView):
       if wrap:
         body = [body]
       res = []
+      bulk = '__bulk' in request.args and self.can_post_in_bulk()
       with benchmark("collection post > body loop: {}".format(len(body))):
         with benchmark("Build stub query cache"):
           self._build_request_stub_cache(body)
         try:
-          self.collection_post_loop(body, res, no_result, running_async)
+          self.collection_post_loop(body, res, no_result, running_async,
+                                    bulk=bulk)
         except (IntegrityError, ValidationError, ValueError) as error:
           res.append(self._make_error_from_exception(error))
           db.session.rollback()
@@ -1400,6 +1834,11 @@ class Resource(ModelView):
         '{url}/<{type}:{pk}>'.format(url=url, type=cls.pk_type, pk=cls.pk),
         view_func=view_func,
         methods=['GET', 'PUT', 'DELETE'])
+    app.add_url_rule(
+        url + '/batch',
+        defaults={cls.pk: None},
+        view_func=view_func,
+        methods=['PUT'])
 
   # Response helpers
   @classmethod
@@ -1468,6 +1907,58 @@ class Resource(ModelView):
       ggrc.builder.json.publish_representation(resources)
     return resources
 
+  def get_sparse_fields(self):
+    """Get `__fields` that can be loaded without building full objects.
+
+    Returns:
+      list of requested field names if all of them are published plain
+      columns of the model, otherwise None.
+    """
+    if '__fields' not in request.args:
+      return None
+    if self.model.__name__ in ("Relationship", "Revision"):
+      # Permissions of these objects are checked on their full representation
+      return None
+    fields = [f for f in request.args['__fields'].split(',') if f]
+    columns = {prop.key for prop in inspect(self.model).column_attrs}
+    custom_publish = getattr(self.model, "_custom_publish", {})
+    sparse_fields = {
+        name for name in AttributeInfo.gather_publish_attrs(self.model)
+        if name in columns and name not in custom_publish
+    }
+    sparse_fields.add('type')
+    if not fields or not sparse_fields.issuperset(fields):
+      return None
+    return fields
+
+  def get_sparse_resources(self, matches, fields):
+    """Get representations that contain only the given column fields.
+
+    Only the requested columns are selected and no relationships are loaded.
+    `type` and `context_id` are taken from the matches, so that the result
+    can be filtered by permissions.
+
+    Returns:
+      dict of match to the object representation.
+    """
+    ids = {m[0]: m for m in matches}
+    columns = [f for f in fields if f not in ('id', 'type')]
+    with benchmark("Query database for sparse matches"):
+      query = self.model.query.options(
+          orm.lazyload('*'),
+          orm.load_only('id', *columns),
+      )
+      objs = query.filter(self.model.id.in_(ids.keys())).all()
+    with benchmark("Publish sparse objects"):
+      resources = {}
+      for obj in objs:
+        match = ids[obj.id]
+        resource = {'id': obj.id, 'type': match[1], 'context_id': match[2]}
+        for column in columns:
+          resource[column] = getattr(obj, column)
+        resources[match] = resource
+    return resources
+
   def build_collection_representation(self, objs, extras=None):
     table_plural = self.model._inflector.table_plural
     collection_name = '{0}_collection'.format(table_plural)
@@ -1482,13 +1973,23 @@ class Resource(ModelView):
     return resource
 
   def object_for_json(self, obj, model_name=None, properties_to_include=None):
+    return self.objects_for_json(
+        [obj], model_name, properties_to_include)[0]
+
+  def objects_for_json(self, objs, model_name=None,
+                       properties_to_include=None):
+    """Get representations of all objs with stubs resolved in one query."""
     model_name = model_name or self.model._inflector.table_singular
-    json_obj = ggrc.builder.json.publish(
-        obj, properties_to_include or [], inclusion_filter)
-    ggrc.builder.json.publish_representation(json_obj)
-    if hasattr(obj, "_json_extras"):
-      json_obj["extras"] = obj._json_extras
-    return {model_name: json_obj}
+    json_objs = [
+        ggrc.builder.json.publish(
+            obj, properties_to_include or [], inclusion_filter)
+        for obj in objs
+    ]
+    ggrc.builder.json.publish_representation(json_objs)
+    for obj, json_obj in itertools.izip(objs, json_objs):
+      if hasattr(obj, "_json_extras"):
+        json_obj["extras"] = obj._json_extras
+    return [{model_name: json_obj} for json_obj in json_objs]
 
   def build_resource_representation(self, obj, extras=None):
     table_singular = self.model._inflector.table_singular
@@ -1550,8 +2051,41 @@ class ReadOnlyResource(Resource):
       raise NotImplementedError()
 
 
-def filter_resource(resource, depth=0, user_permissions=None):  # noqa
+def _get_readable_revision_objects(resources, user_permissions):
+  """Check read permission on objects of revisions in bulk.
+
+  Objects of all revisions are loaded with one query per type and checked
+  with a single `is_allowed_read_many` call.
+
+  Returns:
+    set of (type, id) of revision objects the user can read
+  """
+  ids_by_type = defaultdict(set)
+  for resource in resources:
+    if isinstance(resource, dict) and resource.get('type') == "Revision":
+      ids_by_type[resource['resource_type']].add(resource['resource_id'])
+  keys, instances = [], []
+  for type_name, ids in ids_by_type.iteritems():
+    # there are no permissions for old objects
+    model = getattr(ggrc.models.all_models, type_name, None)
+    if model is None:
+      continue
+    for instance in model.query.filter(model.id.in_(ids)):
+      keys.append((type_name, instance.id))
+      instances.append(instance)
+  if not instances:
+    return set()
+  allowed = user_permissions.is_allowed_read_many(instances)
+  return {key for key, is_allowed in zip(keys, allowed) if is_allowed}
+
+
+def filter_resource(resource, depth=0, user_permissions=None,  # noqa
+                    readable_revisions=None):
   """
+  Args:
+    readable_revisions: set of (type, id) of readable revision objects, it is
+      computed for the whole list when a list of resources is filtered.
+
   Returns:
      The subset of resources which are readable based on user_permissions
   """
@@ -1560,10 +2094,14 @@ def filter_resource(resource, depth=0, user_permissions=None):  # noqa
     user_permissions = permissions.permissions_for(get_current_user())
 
   if isinstance(resource, (list, tuple)):
+    if readable_revisions is None and _is_creator():
+      readable_revisions = _get_readable_revision_objects(
+          resource, user_permissions)
     filtered = []
     for sub_resource in resource:
       filtered_sub_resource = filter_resource(
-          sub_resource, depth=depth + 1, user_permissions=user_permissions)
+          sub_resource, depth=depth + 1, user_permissions=user_permissions,
+          readable_revisions=readable_revisions)
       if filtered_sub_resource is not None:
         filtered.append(filtered_sub_resource)
     return filtered
@@ -1606,13 +2144,11 @@ def filter_resource(resource, depth=0, user_permissions=None):  # noqa
         return None
     elif resource['type'] == "Revision" and _is_creator():
       # Make a check for revision objects that are a special case
-      if not hasattr(ggrc.models.all_models, resource['resource_type']):
-        # there are no permissions for old objects
-        return None
-      res_model = getattr(ggrc.models.all_models, resource['resource_type'])
-      instance = res_model.query.get(resource['resource_id'])
-      if instance is None or\
-         not user_permissions.is_allowed_read_for(instance):
+      if readable_revisions is None:
+        readable_revisions = _get_readable_revision_objects(
+            [resource], user_permissions)
+      key = (resource['resource_type'], resource['resource_id'])
+      if key not in readable_revisions:
         return None
     else:
       if not user_permissions.is_allowed_read(resource['type'],
@@ -1634,6 +2170,24 @@ def filter_resource(resource, depth=0, user_permissions=None):  # noqa
     assert False, "Non-object passed to filter_resource"
 
 
+def _keyset_filter(columns, values, after):
+  """Filter rows that come after or before `values` in descending order.
+
+  For columns (a, b) and values (x, y) the rows after the key are
+  `a < x OR (a = x AND b < y)`. The expanded form is used instead of a row
+  value comparison so that MySQL can use the index on the leading column.
+  """
+  clauses = []
+  for index, column in enumerate(columns):
+    equal = [columns[i] == values[i] for i in range(index)]
+    if after:
+      bound = column < values[index]
+    else:
+      bound = column > values[index]
+    clauses.append(and_(*(equal + [bound])))
+  return or_(*clauses)
+
+
 def _is_creator():
   current_user = get_current_user()
   return hasattr(current_user, 'system_wide_role') \
@@ -1663,6 +2217,9 @@ def etag(last_modified, info=''):
 
 def send_event_job(event):
   """Create bacground job for handling new revisions."""
-  revision_ids = [revision.id for revision in event.revisions]
   from ggrc import views
+  if pending_revisions.is_enabled():
+    views.start_write_revisions()
+    return
+  revision_ids = [revision.id for revision in event.revisions]
   views.start_compute_attributes(revision_ids)
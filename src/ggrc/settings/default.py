@@ -70,6 +70,55 @@ SECRET_KEY = os.environ.get('GGRC_SECRET_KEY', 'Replace-with-something-secret')
 
 MEMCACHE_MECHANISM = True
 
+# Keep hot collection entries in an instance local tier in front of memcache.
+# Invalidations from other instances are noticed when the stamps of resources
+# are checked, at most once per MEMCACHE_L1_SYNC_INTERVAL seconds. Entries
+# stored under generation versioned keys are served without the check.
+MEMCACHE_L1 = False
+MEMCACHE_L1_MAX_ENTRIES = 5000
+MEMCACHE_L1_MAX_BYTES = 16 * 1024 * 1024
+MEMCACHE_L1_TTL = 60
+MEMCACHE_L1_SYNC_INTERVAL = 0
+
+# Limits of the instance local cache, 0 disables a limit. Limits of single
+# resources can be overridden in LOCAL_CACHE_RESOURCE_LIMITS, e.g.
+# {"people": {"max_entries": 50000, "ttl": 600}}
+LOCAL_CACHE_MAX_ENTRIES = 10000
+LOCAL_CACHE_MAX_BYTES = 32 * 1024 * 1024
+LOCAL_CACHE_TTL = 3600
+LOCAL_CACHE_RESOURCE_LIMITS = {}
+
+# Write revisions from a background task instead of the request transaction.
+# The task commits after every ASYNC_REVISIONS_BATCH_SIZE change records.
+ASYNC_REVISIONS = bool(os.environ.get('GGRC_ASYNC_REVISIONS', ''))
+ASYNC_REVISIONS_BATCH_SIZE = 1000
+
+# Filter search and query API by the materialized person permissions table
+# instead of listing ids of objects granted by access control list entries.
+# The table must be rebuilt with /admin/rebuild_person_permissions after the
+# option is turned on.
+MATERIALIZED_PERMISSIONS = bool(
+    os.environ.get('GGRC_MATERIALIZED_PERMISSIONS', ''))
+
+# Update fulltext index records of changed objects by comparing them with the
+# stored records and writing only the rows that differ, instead of deleting
+# and inserting all records of the objects.
+FULLTEXT_INCREMENTAL_UPDATE = bool(
+    os.environ.get('GGRC_FULLTEXT_INCREMENTAL_UPDATE', ''))
+
+# Number of processes reindexing the full text index in parallel outside of
+# App Engine, and the number of objects reindexed as a single checkpoint.
+REINDEX_WORKERS = int(os.environ.get('GGRC_REINDEX_WORKERS', '1'))
+REINDEX_CHUNK_SIZE = int(os.environ.get('GGRC_REINDEX_CHUNK_SIZE', '1000'))
+
+# Queue changed objects at commit time and update their full text records
+# from a background task. Commits reindex objects that have been queued for
+# longer than DEFERRED_INDEXING_STALENESS seconds themselves.
+DEFERRED_INDEXING = bool(os.environ.get('GGRC_DEFERRED_INDEXING', ''))
+DEFERRED_INDEXING_STALENESS = int(
+    os.environ.get('GGRC_DEFERRED_INDEXING_STALENESS', '300'))
+DEFERRED_INDEXING_BATCH_SIZE = 1000
+
 # AppEngine Email
 APPENGINE_EMAIL = os.environ.get('APPENGINE_EMAIL', '')
 
@@ -17,6 +17,7 @@ from ggrc import db
 from ggrc import models
 from ggrc.login import get_current_user_id
 from ggrc.utils import benchmark
+from ggrc.utils import collection_versions
 
 from ggrc.snapshotter.datastructures import Attr
 from ggrc.snapshotter.datastructures import Pair
@@ -236,6 +237,7 @@ class SnapshotGenerator(object):
             models.Snapshot.id == bindparam("_id")).values(
             revision_id=bindparam("_revision_id"),
             modified_by_id=bindparam("_modified_by_id"))
+        collection_versions.mark_modified("Snapshot")
         self._execute(update_sql, data_payload_update)
 
       with benchmark("Snapshot._update.retrieve inserted snapshots"):
@@ -250,6 +252,7 @@ class SnapshotGenerator(object):
           revision_payload += [data]
 
       with benchmark("Insert Snapshot entries into Revision"):
+        collection_versions.mark_modified("Revision")
         self._execute(models.Revision.__table__.insert(), revision_payload)
       return OperationResponse("update", True, for_update, response_data)
 
@@ -394,6 +397,7 @@ class SnapshotGenerator(object):
             "found no revisions: %s", missed_keys)
 
       with benchmark("Snapshot._create.write to database"):
+        collection_versions.mark_modified("Snapshot")
         self._execute(
             models.Snapshot.__table__.insert(),
             data_payload)
@@ -410,6 +414,7 @@ class SnapshotGenerator(object):
           relationship_payload += [relationship]
 
       with benchmark("Snapshot._create.write relationships to database"):
+        collection_versions.mark_modified("Relationship")
         self._execute(models.Relationship.__table__.insert(),
                       relationship_payload)
 
@@ -438,6 +443,7 @@ class SnapshotGenerator(object):
             revision_payload += [data]
 
       with benchmark("Snapshot._create.write revisions to database"):
+        collection_versions.mark_modified("Revision")
         self._execute(models.Revision.__table__.insert(), revision_payload)
       return OperationResponse("create", True, for_create, response_data)
 
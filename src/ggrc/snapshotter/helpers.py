@@ -13,10 +13,17 @@ from ggrc import models
 from ggrc.snapshotter.datastructures import Stub
 from ggrc.snapshotter.datastructures import Pair
 from ggrc.utils import benchmark
+from ggrc.utils import pending_revisions
 
 logger = getLogger(__name__)  # pylint: disable=invalid-name
 
 
+def _flush_pending_revisions(stubs):
+  """Write pending revisions of objects before their revisions are read."""
+  if pending_revisions.is_enabled():
+    pending_revisions.flush_pending_revisions(stubs=stubs)
+
+
 def get_revisions(pairs, revisions, filters=None):
   """Retrieve revision ids for pairs
 
@@ -40,6 +47,8 @@ def get_revisions(pairs, revisions, filters=None):
           for parent, child in pairs:
             parents_cache[child].add(parent)
 
+      _flush_pending_revisions(child_stubs)
+
       with benchmark("get_revisions.retrieve revisions"):
         query = db.session.query(
             models.Revision.id,
@@ -318,7 +318,8 @@ def reindex_pairs(pairs):
           "id",
           "resource_type",
           "resource_id",
-          "_content",
+          "_raw_content",
+          "content_format",
       ),
       orm.load_only(
           "id",
@@ -363,3 +364,5 @@ def reindex_pairs(pairs):
       )
   delete_records(snapshots.keys())
   insert_records(search_payload)
+  get_indexer().records_updated("Snapshot", snapshots.keys())
+  db.session.commit()
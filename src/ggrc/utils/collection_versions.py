@@ -0,0 +1,245 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Per-type collection version counters.
+
+Every commit that creates, changes or deletes objects increments the version
+of the object types and of the types that publish links to those objects.
+Versions are stored in the `collection_versions` table and cached in
+memcache, so a collection service can validate a cached representation with
+a single cache lookup, without querying the object tables.
+
+Cached versions are only published by committing writers. A reader that
+misses the cache must not store the version it read: its transaction can
+predate a commit whose version is already published, and an older cached
+version would validate outdated representations. Writers replace a cached
+version only with a newer one, using compare-and-set.
+
+Writes that bypass the ORM session (bulk inserts and updates) must report the
+modified types with `mark_modified` so that they are bumped on the next
+commit.
+"""
+
+from logging import getLogger
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.properties import RelationshipProperty
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models.collection_version import CollectionVersion
+
+
+# pylint: disable=invalid-name
+logger = getLogger(__name__)
+
+CACHE_EXPIRY_VERSION = 60
+
+# Attempts to publish a version that concurrent writers keep replacing
+CAS_RETRIES = 5
+
+# Types that affect the result of permission loading. Versions of these types
+# must be part of any cached representation that was filtered by permissions.
+PERMISSION_TYPES = (
+    "AccessControlList",
+    "Context",
+    "ContextImplication",
+    "Person",
+    "Relationship",
+    "RelationshipAttr",
+    "Role",
+    "UserRole",
+    "Workflow",
+)
+
+BUMP_VERSIONS_SQL = sa.text("""
+    INSERT INTO collection_versions (resource_type, version, updated_at)
+    VALUES (:resource_type, 1, NOW())
+    ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW()
+""")
+
+
+def _get_memcache_client():
+  """Get memcache client or None if memcache is disabled."""
+  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
+    return None
+  from google.appengine.api import memcache
+  return memcache.Client()
+
+
+def get_cache_key(type_name):
+  return 'collection_version:{}'.format(type_name)
+
+
+def get_versions(type_names):
+  """Get current versions of the given types.
+
+  Args:
+    type_names: iterable of model names.
+
+  Returns:
+    dict of model name to a (version, updated_at) tuple. Types that were never
+    modified are missing in the result.
+  """
+  type_names = set(type_names)
+  versions = {}
+  client = _get_memcache_client()
+  if client:
+    cached = client.get_multi([get_cache_key(name) for name in type_names])
+    for name in type_names:
+      if get_cache_key(name) in cached:
+        versions[name] = cached[get_cache_key(name)]
+  missing = type_names.difference(versions)
+  if missing:
+    # Versions read here are not cached, see the module docstring.
+    versions.update(_load_versions(db.session, missing))
+  return versions
+
+
+def _load_versions(session, type_names):
+  """Load versions of types from the database."""
+  rows = session.query(
+      CollectionVersion.resource_type,
+      CollectionVersion.version,
+      CollectionVersion.updated_at,
+  ).filter(CollectionVersion.resource_type.in_(type_names))
+  return {name: (version, updated_at) for name, version, updated_at in rows}
+
+
+def _publish_version(client, type_name, value):
+  """Cache a version unless a newer one is already cached."""
+  key = get_cache_key(type_name)
+  for _ in range(CAS_RETRIES):
+    cached = client.gets(key)
+    if cached is None:
+      if client.add(key, value, CACHE_EXPIRY_VERSION):
+        return
+    elif cached[0] >= value[0]:
+      return
+    elif client.cas(key, value, CACHE_EXPIRY_VERSION):
+      return
+  # Don't leave an older version in the cache if publishing failed.
+  if not client.delete(key):
+    logger.error("CACHE: Failed to remove collection version %s", type_name)
+
+
+def mark_modified(*type_names):
+  """Bump versions of the given types on the next commit.
+
+  Used for changes that are not made through ORM objects, for instance bulk
+  inserts with the Core API.
+  """
+  _get_modified_types(db.session).update(type_names)
+  get_marked_types(db.session).update(type_names)
+
+
+def _get_modified_types(session):
+  """Get the set of types modified in the current transaction."""
+  if not hasattr(session, "collection_version_types"):
+    session.collection_version_types = set()
+  return session.collection_version_types
+
+
+def _get_bumped_versions(session):
+  """Get versions bumped in the current transaction by type."""
+  if not hasattr(session, "collection_bumped_versions"):
+    session.collection_bumped_versions = {}
+  return session.collection_bumped_versions
+
+
+def has_changes(session):
+  """Check if the transaction of the session has uncommitted changes."""
+  return bool(session.new or session.dirty or session.deleted or
+              _get_modified_types(session))
+
+
+def get_marked_types(session):
+  """Get the set of types reported with mark_modified in the transaction."""
+  if not hasattr(session, "collection_version_marked_types"):
+    session.collection_version_marked_types = set()
+  return session.collection_version_marked_types
+
+
+def get_related_types(obj):
+  """Get names of types whose representation depends on `obj`.
+
+  This includes the object type with its mapped parent types and the types
+  linked through the cache mapping entries of the object type.
+  """
+  mapper = sa.inspect(obj).mapper
+  types = {m.class_.__name__ for m in mapper.iterate_to_root()}
+  for entry in _get_mapping_entries().get(type(obj).__name__, []):
+    if entry.polymorph:
+      related_type = getattr(obj, '{}_type'.format(entry.attr), None)
+      if related_type:
+        types.add(related_type)
+    else:
+      attr = getattr(type(obj), entry.attr, None)
+      prop = getattr(attr, "property", None)
+      if isinstance(prop, RelationshipProperty):
+        types.add(prop.mapper.class_.__name__)
+  return types
+
+
+def _get_mapping_entries(_cache={}):  # pylint: disable=dangerous-default-value
+  """Get cache mapping entries grouped by class name."""
+  if not _cache:
+    # ggrc.cache imports App Engine modules, so it is imported lazily here.
+    from ggrc.cache.cache import all_mapping_entries
+    for entry in all_mapping_entries():
+      _cache.setdefault(entry.class_name, []).append(entry)
+  return _cache
+
+
+def collect_modified_types(session, flush_context):
+  """Remember types of all objects in the flush."""
+  # pylint: disable=unused-argument
+  types = _get_modified_types(session)
+  dirty = set(obj for obj in session.dirty if session.is_modified(obj))
+  for obj in session.new | dirty | session.deleted:
+    types.update(get_related_types(obj))
+
+
+def bump_versions(session):
+  """Increment versions of all types modified in the transaction.
+
+  The session is flushed first so that pending changes are included. Types
+  are sorted so that concurrent transactions lock the version rows in the
+  same order.
+  """
+  session.flush()
+  types = _get_modified_types(session)
+  if types:
+    session.execute(BUMP_VERSIONS_SQL, [
+        {"resource_type": type_name} for type_name in sorted(types)
+    ])
+    if _get_memcache_client():
+      # The rows stay locked until the commit, so the loaded versions are
+      # the ones this transaction commits.
+      _get_bumped_versions(session).update(_load_versions(session, types))
+
+
+def publish_versions(session):
+  """Cache versions of all types bumped in the transaction."""
+  versions = _get_bumped_versions(session)
+  client = _get_memcache_client()
+  if versions and client:
+    for type_name, value in versions.iteritems():
+      _publish_version(client, type_name, value)
+  clear_modified_types(session)
+
+
+def clear_modified_types(session):
+  _get_modified_types(session).clear()
+  get_marked_types(session).clear()
+  _get_bumped_versions(session).clear()
+
+
+def register_collection_version_listeners():
+  """Register session listeners that maintain collection versions."""
+  event.listen(Session, 'after_flush', collect_modified_types)
+  event.listen(Session, 'before_commit', bump_versions)
+  event.listen(Session, 'after_commit', publish_versions)
+  event.listen(Session, 'after_rollback', clear_modified_types)
@@ -0,0 +1,173 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Deferred writing of revisions.
+
+When ASYNC_REVISIONS is enabled, requests store a change record with the
+serialized state of every created, modified or deleted object instead of
+inserting a revision. The records are turned into revisions by
+`flush_pending_revisions`, which is run in batches by a background task
+after the commit, or directly by code that needs the revisions of some
+objects right away (snapshotter, import).
+
+Every record keeps the content of the object at the time of its change, so
+a revision written from it is the same as the one that would have been
+written by the request. Records are processed in the order they were
+created, which keeps the order of revisions of every object.
+"""
+
+import datetime
+
+from sqlalchemy import select
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models.pending_revision import PendingRevision
+from ggrc.models.revision import Revision
+from ggrc.utils import benchmark
+from ggrc.utils import collection_versions
+
+
+def is_enabled():
+  """Check if writing of revisions is deferred."""
+  return getattr(settings, "ASYNC_REVISIONS", False)
+
+
+def get_batch_size():
+  return getattr(settings, "ASYNC_REVISIONS_BATCH_SIZE", 1000)
+
+
+def get_revision_row(revision, event_id):
+  """Get column values of a not persisted revision for a Core INSERT."""
+  return {
+      "resource_id": revision.resource_id,
+      "resource_type": revision.resource_type,
+      "resource_slug": revision.resource_slug,
+      "event_id": event_id,
+      "action": revision.action,
+      "content": revision._content,  # pylint: disable=protected-access
+      "context_id": revision.context_id,
+      "modified_by_id": revision.modified_by_id,
+      "source_type": revision.source_type,
+      "source_id": revision.source_id,
+      "destination_type": revision.destination_type,
+      "destination_id": revision.destination_id,
+  }
+
+
+def capture(session, event, changes):
+  """Store change records of a flushed event.
+
+  Args:
+    session: Current SQLAlchemy session (db.session)
+    event: flushed models.Event instance the changes belong to
+    changes: list of (action, obj) pairs, where action is "created",
+      "modified" or "deleted"
+  """
+  if not changes:
+    return
+  now = datetime.datetime.utcnow()
+  rows = []
+  for action, obj in changes:
+    revision = Revision(obj, event.modified_by_id, action, obj.log_json())
+    rows.append({
+        "event_id": event.id,
+        "resource_type": revision.resource_type,
+        "resource_id": revision.resource_id,
+        "action": action,
+        "content": revision._content,  # pylint: disable=protected-access
+        "modified_by_id": event.modified_by_id,
+        "created_at": now,
+    })
+  session.execute(PendingRevision.__table__.insert(), rows)
+
+
+def _get_record_revision_row(record):
+  """Get column values of the revision of a pending record."""
+  content = record.content
+  return {
+      "resource_id": record.resource_id,
+      "resource_type": record.resource_type,
+      "resource_slug": content.get("slug"),
+      "event_id": record.event_id,
+      "action": record.action,
+      "content": content,
+      "context_id": None,
+      "modified_by_id": record.modified_by_id,
+      "source_type": content.get("source_type"),
+      "source_id": content.get("source_id"),
+      "destination_type": content.get("destination_type"),
+      "destination_id": content.get("destination_id"),
+      "created_at": record.created_at,
+      "updated_at": record.created_at,
+  }
+
+
+def _get_pending_query(stubs, event, limit):
+  """Get locking query for pending records of the given objects."""
+  table = PendingRevision.__table__
+  query = table.select().order_by(table.c.id).with_for_update()
+  stub_columns = tuple_(table.c.resource_type, table.c.resource_id)
+  if stubs is not None:
+    query = query.where(stub_columns.in_(stubs))
+  if event is not None:
+    query = query.where(stub_columns.in_(
+        select([table.c.resource_type, table.c.resource_id]).where(
+            table.c.event_id == event.id)
+    ))
+  if limit is not None:
+    query = query.limit(limit)
+  return query
+
+
+def flush_pending_revisions(stubs=None, event=None, limit=None):
+  """Write revisions for pending change records.
+
+  Records are processed in creation order and deleted once their revisions
+  are written. The caller is responsible for committing the session.
+
+  Args:
+    stubs: iterable of (type, id) pairs. If set, only records of these
+      objects are flushed.
+    event: models.Event instance. If set, only records of the objects
+      changed in this event are flushed.
+    limit: maximum number of records flushed.
+
+  Returns:
+    list of ids of all revisions of the flushed events.
+  """
+  if stubs is not None:
+    stubs = list(set(stubs))
+    if not stubs:
+      return []
+  with benchmark("Flush pending revisions"):
+    records = db.session.execute(
+        _get_pending_query(stubs, event, limit)).fetchall()
+    if not records:
+      return []
+    db.session.execute(Revision.__table__.insert(),
+                       [_get_record_revision_row(record)
+                        for record in records])
+    collection_versions.mark_modified("Revision")
+    table = PendingRevision.__table__
+    db.session.execute(table.delete().where(
+        table.c.id.in_([record.id for record in records])))
+    event_ids = {record.event_id for record in records}
+    return [revision_id for revision_id, in db.session.query(
+        Revision.id).filter(Revision.event_id.in_(event_ids))]
+
+
+def drain():
+  """Write revisions of all pending records, committing after every batch.
+
+  Returns:
+    set of ids of all revisions of the flushed events.
+  """
+  revision_ids = set()
+  while True:
+    batch_ids = flush_pending_revisions(limit=get_batch_size())
+    if not batch_ids:
+      return revision_ids
+    db.session.commit()
+    revision_ids.update(batch_ids)
@@ -0,0 +1,216 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Materialized object permissions of people.
+
+With MATERIALIZED_PERMISSIONS enabled, the `person_permissions` table holds a
+row for every action a person is allowed to do on an object through access
+control list entries. Permission filters of search and query API then use a
+subquery on the indexed table instead of listing the ids of all objects in
+the query, which makes MySQL choose bad plans for people with thousands of
+access control list entries.
+
+Rows of the access control list entries and roles changed in a transaction
+are recomputed before the transaction is committed. Writes that bypass the
+ORM session must report changed entries with
+`collection_versions.mark_modified("AccessControlList")`, which rebuilds the
+whole table on commit.
+
+The table must be rebuilt with `rebuild` when the option is turned on, and
+`check` reports rows that differ from the access control list.
+"""
+
+from logging import getLogger
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import db
+from ggrc import settings
+from ggrc.access_control.list import AccessControlList
+from ggrc.access_control.role import AccessControlRole
+from ggrc.models.person_permission import PersonPermission
+from ggrc.utils import collection_versions
+
+
+# pylint: disable=invalid-name
+logger = getLogger(__name__)
+
+COLUMNS = ("person_id", "object_type", "object_id", "action")
+
+CHUNK_SIZE = 500
+
+# Types whose bulk changes require a rebuild of the whole table
+BULK_TYPES = ("AccessControlList", "AccessControlRole")
+
+
+def is_enabled():
+  return getattr(settings, "MATERIALIZED_PERMISSIONS", False)
+
+
+def objects_query(person_id, object_type, action):
+  """Select ids of objects of a type the person can do the action on."""
+  table = PersonPermission.__table__
+  return sa.select([table.c.object_id]).where(sa.and_(
+      table.c.person_id == person_id,
+      table.c.object_type == object_type,
+      table.c.action == action,
+  ))
+
+
+def granted_query(keys=None):
+  """Select rows granted by access control list entries.
+
+  Args:
+    keys: list of (person_id, object_type, object_id) tuples the rows are
+      selected for, or None to select rows of all entries
+  """
+  acl = AccessControlList.__table__
+  acr = AccessControlRole.__table__
+  selects = []
+  for action in ("read", "update", "delete"):
+    select = sa.select([
+        acl.c.person_id,
+        acl.c.object_type,
+        acl.c.object_id,
+        sa.literal(action).label("action"),
+    ]).select_from(
+        acl.join(acr, acl.c.ac_role_id == acr.c.id)
+    ).where(acr.c[action] == sa.true())
+    if keys is not None:
+      select = select.where(tuple_(
+          acl.c.person_id, acl.c.object_type, acl.c.object_id).in_(keys))
+    selects.append(select)
+  return sa.union(*selects)
+
+
+def refresh(session, keys):
+  """Recompute rows of the given people and objects.
+
+  Args:
+    session: session the statements are executed in
+    keys: iterable of (person_id, object_type, object_id) tuples
+  """
+  table = PersonPermission.__table__
+  keys = sorted(keys)
+  for start in range(0, len(keys), CHUNK_SIZE):
+    chunk = keys[start:start + CHUNK_SIZE]
+    session.execute(table.delete().where(tuple_(
+        table.c.person_id, table.c.object_type, table.c.object_id
+    ).in_(chunk)))
+    session.execute(table.insert().from_select(COLUMNS, granted_query(chunk)))
+
+
+def rebuild(session=None):
+  """Recompute the whole table from the access control list."""
+  if session is None:
+    session = db.session
+  table = PersonPermission.__table__
+  session.execute(table.delete())
+  session.execute(table.insert().from_select(COLUMNS, granted_query()))
+
+
+def check():
+  """Compare the table with the access control list.
+
+  Returns:
+    dict with the number of "missing" rows, granted by access control list
+    entries but missing in the table, and of "extra" rows, present in the
+    table but not granted.
+  """
+  table = PersonPermission.__table__
+  granted = granted_query().alias("granted")
+
+  def count_difference(left, right):
+    return db.session.query(sa.func.count()).select_from(
+        left.outerjoin(right, sa.and_(*[
+            left.c[name] == right.c[name] for name in COLUMNS
+        ]))
+    ).filter(right.c.person_id.is_(None)).scalar()
+
+  return {
+      "missing": count_difference(granted, table),
+      "extra": count_difference(table, granted),
+  }
+
+
+def _get_keys(session):
+  """Get the set of keys modified in the current transaction."""
+  if not hasattr(session, "person_permission_keys"):
+    session.person_permission_keys = set()
+  return session.person_permission_keys
+
+
+def _get_roles(session):
+  """Get the set of ids of roles with flags modified in the transaction."""
+  if not hasattr(session, "person_permission_roles"):
+    session.person_permission_roles = set()
+  return session.person_permission_roles
+
+
+def _get_keys_of(obj):
+  """Get current and previous keys of a flushed access control list entry."""
+  state = sa.inspect(obj)
+  current = tuple(getattr(obj, name) for name in COLUMNS[:3])
+  previous = tuple(
+      (state.attrs[name].history.deleted or [getattr(obj, name)])[0]
+      for name in COLUMNS[:3]
+  )
+  return {key for key in (current, previous) if None not in key}
+
+
+def _flags_changed(obj):
+  state = sa.inspect(obj)
+  return any(state.attrs[action].history.has_changes()
+             for action in ("read", "update", "delete"))
+
+
+def collect_changes(session, flush_context):
+  """Remember access control list entries and roles in the flush."""
+  # pylint: disable=unused-argument
+  if not is_enabled():
+    return
+  keys = _get_keys(session)
+  roles = _get_roles(session)
+  for obj in session.new | session.dirty | session.deleted:
+    if isinstance(obj, AccessControlList):
+      keys.update(_get_keys_of(obj))
+    elif isinstance(obj, AccessControlRole) and obj in session.dirty:
+      if _flags_changed(obj):
+        roles.add(obj.id)
+
+
+def update_person_permissions(session):
+  """Recompute rows of all entries and roles changed in the transaction."""
+  if not is_enabled():
+    return
+  session.flush()
+  keys = _get_keys(session)
+  roles = _get_roles(session)
+  if set(BULK_TYPES) & collection_versions.get_marked_types(session):
+    logger.info("Rebuilding person permissions after a bulk change")
+    rebuild(session)
+  else:
+    if roles:
+      acl = AccessControlList
+      keys.update(tuple(row) for row in session.query(
+          acl.person_id, acl.object_type, acl.object_id,
+      ).filter(acl.ac_role_id.in_(roles)))
+    if keys:
+      refresh(session, keys)
+  clear_changes(session)
+
+
+def clear_changes(session):
+  _get_keys(session).clear()
+  _get_roles(session).clear()
+
+
+def register_person_permissions_listeners():
+  """Register session listeners that maintain the person permissions."""
+  event.listen(Session, 'after_flush', collect_changes)
+  event.listen(Session, 'before_commit', update_person_permissions)
+  event.listen(Session, 'after_commit', clear_changes)
+  event.listen(Session, 'after_rollback', clear_changes)
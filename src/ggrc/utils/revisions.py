@@ -13,6 +13,7 @@ from ggrc import db
 from ggrc.utils import benchmark
 from ggrc.login import get_current_user_id
 from ggrc.models import all_models
+from ggrc.models.types import CompressedJsonType
 from ggrc.snapshotter.rules import Types
 
 logger = getLogger(__name__)  # pylint: disable=invalid-name
@@ -97,7 +98,8 @@ def _update_existing_revisions(objects, revisions_table, obj_rev_map):
     db.session.execute(
         revisions_table.update()
         .where(revisions_table.c.id == rev_id)
-        .values(content=obj.log_json())
+        .values(content=obj.log_json(),
+                content_format=CompressedJsonType.ZLIB)
     )
 
 
@@ -175,17 +177,19 @@ def set_resource_slugs():
     rows = db.session.execute(select([
         revisions_table.c.id,
         revisions_table.c.content,
+        revisions_table.c.content_format,
     ]).where(
         revisions_table.c.resource_type.in_(Types.all)
     ).where(
         revisions_table.c.resource_slug.is_(None)
     ))
     for row in rows:
-      if row.content.get("slug"):
+      content = CompressedJsonType.decode(row.content, row.content_format)
+      if content.get("slug"):
         db.session.execute(
             revisions_table.update()
             .where(revisions_table.c.id == row.id)
-            .values(resource_slug=row.content.get("slug"))
+            .values(resource_slug=content.get("slug"))
         )
     db.session.commit()
 
@@ -25,7 +25,8 @@ from ggrc.builder.json import publish
 from ggrc.builder.json import publish_representation
 from ggrc.converters import get_importables, get_exportables
 from ggrc.extensions import get_extension_modules
-from ggrc.fulltext import get_indexer, mixin
+from ggrc.fulltext import deferred as deferred_indexing
+from ggrc.fulltext import reindex as fulltext_reindex
 from ggrc.login import get_current_user
 from ggrc.login import login_required
 from ggrc.models import all_models
@@ -33,19 +34,20 @@ from ggrc.models.background_task import create_task
 from ggrc.models.background_task import make_task_response
 from ggrc.models.background_task import queued_task
 from ggrc.models.reflection import AttributeInfo
+from ggrc.rbac import metrics as rbac_metrics
 from ggrc.rbac import permissions
 from ggrc.services.common import as_json
 from ggrc.services.common import inclusion_filter
 from ggrc.query import views as query_views
 from ggrc.snapshotter import rules
-from ggrc.snapshotter.indexer import reindex as reindex_snapshots
 from ggrc.views import converters
 from ggrc.views import cron
 from ggrc.views import filters
 from ggrc.views import notifications
 from ggrc.views.registry import object_view
 from ggrc.utils import benchmark
-from ggrc.utils import generate_query_chunks
+from ggrc.utils import pending_revisions
+from ggrc.utils import person_permissions
 from ggrc.utils import revisions
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -62,9 +64,9 @@ def refresh_revisions(_):
 
 @app.route("/_background_tasks/reindex", methods=["POST"])
 @queued_task
-def reindex(_):
+def reindex(task):
   """Web hook to update the full text search index."""
-  do_reindex()
+  do_reindex(task)
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
@@ -94,34 +96,68 @@ def start_compute_attributes(revision_ids):
   task.start()
 
 
-def do_reindex():
-  """Update the full text search index."""
+@app.route("/_background_tasks/write_revisions", methods=["POST"])
+@queued_task
+def write_revisions(_):
+  """Web hook to write revisions of pending change records."""
+  with benchmark("Run write_revisions background task"):
+    revision_ids = pending_revisions.drain()
+    if revision_ids:
+      start_compute_attributes(sorted(revision_ids))
+    return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
-  indexer = get_indexer()
-  indexed_models = {
-      m.__name__: m for m in all_models.all_models
-      if issubclass(m, mixin.Indexed) and m.REQUIRED_GLOBAL_REINDEX
-  }
-  people_query = db.session.query(all_models.Person.id,
-                                  all_models.Person.name,
-                                  all_models.Person.email)
-  indexer.cache["people_map"] = {p.id: (p.name, p.email) for p in people_query}
-  indexer.cache["ac_role_map"] = dict(db.session.query(
-      all_models.AccessControlRole.id,
-      all_models.AccessControlRole.name,
-  ))
-  for model_name in sorted(indexed_models.keys()):
-    logger.info("Updating index for: %s", model_name)
-    with benchmark("Create records for %s" % model_name):
-      model = indexed_models[model_name]
-      for query_chunk in generate_query_chunks(db.session.query(model.id)):
-        model.bulk_record_update_for([i.id for i in query_chunk])
-        db.session.commit()
-
-  logger.info("Updating index for: %s", "Snapshot")
-  with benchmark("Create records for %s" % "Snapshot"):
-    reindex_snapshots()
-  indexer.invalidate_cache()
+
+def start_write_revisions():
+  """Start a background task for writing pending revisions."""
+  task = create_task(
+      name="write_revisions",
+      url=url_for(write_revisions.__name__),
+      method=u"POST",
+      queued_callback=write_revisions
+  )
+  task.start()
+
+
+@app.route("/_background_tasks/drain_reindex_queue", methods=["POST"])
+@queued_task
+def drain_reindex_queue(_):
+  """Web hook to reindex objects queued by deferred indexing."""
+  with benchmark("Run drain_reindex_queue background task"):
+    deferred_indexing.drain()
+    return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+@app.after_request
+def start_drain_reindex_queue(response):
+  """Start a background task for objects queued by the request."""
+  if getattr(db.session, "reindex_queued", False):
+    db.session.reindex_queued = False
+    create_task(
+        name="drain_reindex_queue",
+        url=url_for(drain_reindex_queue.__name__),
+        method=u"POST",
+        queued_callback=drain_reindex_queue
+    )
+  return response
+
+
+@app.route("/_background_tasks/rebuild_person_permissions", methods=["POST"])
+@queued_task
+def rebuild_person_permissions(_):
+  """Web hook to rebuild the materialized person permissions."""
+  with benchmark("Run rebuild_person_permissions background task"):
+    person_permissions.rebuild()
+    db.session.commit()
+    return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+def do_reindex(task=None):
+  """Update the full text search index.
+
+  Args:
+    task: background task that receives the progress of the reindex
+  """
+  fulltext_reindex.reindex(task)
 
 
 def get_permissions_json():
@@ -349,6 +385,43 @@ def admin_reindex():
                          [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/rebuild_person_permissions", methods=["POST"])
+@login_required
+def admin_rebuild_person_permissions():
+  """Calls a webhook that rebuilds the materialized person permissions."""
+  if not permissions.is_allowed_read("/admin", None, 1):
+    raise Forbidden()
+  task_queue = create_task(
+      name="rebuild_person_permissions",
+      url=url_for(rebuild_person_permissions.__name__),
+      queued_callback=rebuild_person_permissions
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/check_person_permissions", methods=["GET"])
+@login_required
+def admin_check_person_permissions():
+  """Report rows of the materialized person permissions that differ from the
+  access control list."""
+  if not permissions.is_allowed_read("/admin", None, 1):
+    raise Forbidden()
+  return app.make_response((json.dumps(person_permissions.check()), 200,
+                            [("Content-Type", "application/json")]))
+
+
+@app.route("/admin/permissions_metrics", methods=["GET"])
+@login_required
+def admin_permissions_metrics():
+  """Report counters and histograms of permission loading in this instance."""
+  if not permissions.is_allowed_read("/admin", None, 1):
+    raise Forbidden()
+  return app.make_response((json.dumps(rbac_metrics.METRICS.as_dict()), 200,
+                            [("Content-Type", "application/json")]))
+
+
 @app.route("/admin/refresh_revisions", methods=["POST"])
 @login_required
 def admin_refresh_revisions():
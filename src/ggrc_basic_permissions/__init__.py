@@ -3,12 +3,16 @@
 
 """Initialize RBAC"""
 
+import collections
+import contextlib
 import datetime
+import functools
 import itertools
+import time
 
-import sqlalchemy.orm
 from sqlalchemy import and_
 from sqlalchemy import case
+from sqlalchemy import func
 from sqlalchemy import literal
 from sqlalchemy import or_
 from sqlalchemy.orm import aliased
@@ -22,14 +26,16 @@ from ggrc.login import get_current_user
 from ggrc.models import all_models
 from ggrc.models.audit import Audit
 from ggrc.models.program import Program
+from ggrc.rbac import metrics
 from ggrc.rbac import permissions as rbac_permissions
 from ggrc.rbac.permissions_provider import DefaultUserPermissions
-from ggrc.services.common import _get_cache_manager
 from ggrc.services import signals
 from ggrc.services.registry import service
 from ggrc.utils import benchmark
+from ggrc.utils import collection_versions
 from ggrc_basic_permissions import basic_roles
-from ggrc_basic_permissions.contributed_roles import lookup_role_implications
+from ggrc_basic_permissions import context_implications
+from ggrc_basic_permissions import permissions_cache
 from ggrc_basic_permissions.contributed_roles import BasicRoleDeclarations
 from ggrc_basic_permissions.contributed_roles import BasicRoleImplications
 from ggrc_basic_permissions.converters.handlers import COLUMN_HANDLERS
@@ -47,7 +53,27 @@ blueprint = Blueprint(
     static_url_path='/static/ggrc_basic_permissions',
 )
 
-PERMISSION_CACHE_TIMEOUT = 3600  # 60 minutes
+# Cached sections of user permissions in loading order
+PERMISSION_SECTIONS = (
+    "user_roles",
+    "implied_roles",
+    "context_relationships",
+    "assignee_relationships",
+    "personal_context",
+    "access_control_list",
+    "backlog_workflows",
+)
+
+# Kinds of permission rows needed to reload a section. Implied roles are
+# resolved with the context implication index, see context_implications.
+SECTION_ROW_KINDS = {
+    "user_roles": ("role", "user_role"),
+    "implied_roles": ("role",),
+    "assignee_relationships": ("assignee",),
+    "personal_context": ("personal_context",),
+    "access_control_list": ("acl",),
+    "backlog_workflows": ("backlog",),
+}
 
 
 def get_public_config(_):
@@ -279,12 +305,16 @@ class BasicUserPermissions(DefaultUserPermissions):
 
   def __init__(self, user):
     self.user = user
+    self.acl_permissions = {}
     with benchmark('BasicUserPermissions > load permissions for user'):
-      self.permissions = load_permissions_for(user)
+      self.permissions = load_permissions_for(user, self.acl_permissions)
 
   def _permissions(self):
     return self.permissions
 
+  def _acl_permissions(self):
+    return self.acl_permissions
+
 
 class UserPermissions(DefaultUserPermissions):
   """User permissions cached in the global session object"""
@@ -314,11 +344,14 @@ class UserPermissions(DefaultUserPermissions):
     email = self.get_email_for(user)
     self._request_permissions = {}
     self._request_permissions['__user'] = email
+    acl_permissions = {}
     if user is None or user.is_anonymous():
       self._request_permissions = {}
     else:
       with benchmark('load_permissions'):
-        self._request_permissions = load_permissions_for(user)
+        self._request_permissions = load_permissions_for(
+            user, acl_permissions)
+    setattr(g, '_request_acl_permissions', acl_permissions)
 
 
 def collect_permissions(src_permissions, context_id, permissions):
@@ -350,37 +383,6 @@ def collect_permissions(src_permissions, context_id, permissions):
             })
 
 
-def query_memcache(key):
-  """Check if cached permissions are available
-
-  Args:
-      key (string): key of the stored permissions
-  Returns:
-      cache (memcache_client): memcache client or None if caching
-                               is not available
-      permissions_cache (dict): dict with all permissions or None if there
-                                was a cache miss
-  """
-  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
-    return None, None
-
-  cache = _get_cache_manager().cache_object.memcache_client
-  cached_keys_set = cache.get('permissions:list') or set()
-  if key not in cached_keys_set:
-    # We set the permissions:list variable so that we are able to batch
-    # remove all permissions related keys from memcache
-    cached_keys_set.add(key)
-    cache.set('permissions:list', cached_keys_set, PERMISSION_CACHE_TIMEOUT)
-    return cache, None
-
-  permissions_cache = cache.get(key)
-  if permissions_cache:
-    # If the key is both in permissions:list and in memcache itself
-    # it is safe to return the cached permissions
-    return cache, permissions_cache
-  return cache, None
-
-
 def load_default_permissions(permissions):
   """Load default permissions for all users
 
@@ -457,104 +459,158 @@ def load_bootstrap_admin(user, permissions):
         permissions)
 
 
-def load_user_roles(user, permissions):
-  """Load all user roles for user
+def _role_rows(_):
+  return db.session.query(
+      literal("role"), Role.name, Role.id, literal(None),
+      Role.permissions_json)
+
+
+def _user_role_rows(user_id):
+  return db.session.query(
+      literal("user_role"), Role.name, UserRole.id, UserRole.context_id,
+      literal(None),
+  ).select_from(UserRole).join(Role, UserRole.role_id == Role.id).filter(
+      UserRole.person_id == user_id)
+
+
+def _acl_rows(user_id):
+  """Access control list entries with the allowed actions as RUD flags"""
+  acl = all_models.AccessControlList
+  acr = all_models.AccessControlRole
+  return db.session.query(
+      literal("acl"), acl.object_type, acl.object_id, literal(None),
+      func.concat(case([(acr.read, "R")], else_=""),
+                  case([(acr.update, "U")], else_=""),
+                  case([(acr.delete, "D")], else_="")),
+  ).select_from(acl).join(acr, acl.ac_role_id == acr.id).filter(
+      acl.person_id == user_id)
+
+
+def _assignee_rows(user_id):
+  id_, type_, role_name = objects_via_assignable_query(
+      user_id, False).subquery().c
+  return db.session.query(
+      literal("assignee"), type_, id_, literal(None), role_name)
+
+
+def _personal_context_rows(user_id):
+  context = all_models.Context
+  return db.session.query(
+      literal("personal_context"), literal(None), context.id, literal(None),
+      literal(None),
+  ).filter(context.related_object_type == "Person",
+           context.related_object_id == user_id)
+
+
+def _backlog_rows(_):
+  id_, _, context_id = backlog_workflows().subquery().c
+  return db.session.query(
+      literal("backlog"), literal("Workflow"), id_, context_id, literal(None))
+
+
+PERMISSION_ROW_QUERIES = {
+    "role": _role_rows,
+    "user_role": _user_role_rows,
+    "acl": _acl_rows,
+    "assignee": _assignee_rows,
+    "personal_context": _personal_context_rows,
+    "backlog": _backlog_rows,
+}
+
+
+def permission_rows_query(user_id, kinds):
+  """Creates a single query that returns permission rows of all given kinds.
+
+    Args:
+        user_id (int): id of the user
+        kinds (iterable): keys of PERMISSION_ROW_QUERIES
+
+    Returns:
+        db.session.query object that selects the following columns:
+            | kind | type | id | context_id | value |
+        or None if no kinds are given.
+  """
+  queries = [PERMISSION_ROW_QUERIES[kind](user_id) for kind in sorted(kinds)]
+  if not queries:
+    return None
+  return queries[0].union_all(*queries[1:])
+
+
+def load_permission_rows(user_id, kinds):
+  """Load permission rows of the given kinds with a single query
 
   Args:
-      user (Person): Person object
-      permissions (dict): dict where the permissions will be stored
+      user_id (int): id of the user
+      kinds (iterable): keys of PERMISSION_ROW_QUERIES
   Returns:
-      source_contexts_to_rolenames (dict): Role names for contexts
+      rows (dict): kind to a list of (type, id, context_id, value) tuples
   """
-  # Add permissions from all DB-managed roles
-  user_roles = db.session.query(UserRole)\
-      .options(
-          sqlalchemy.orm.undefer_group('UserRole_complete'),
-          sqlalchemy.orm.undefer_group('Role_complete'),
-          sqlalchemy.orm.joinedload('role'))\
-      .filter(UserRole.person_id == user.id)\
-      .order_by(UserRole.updated_at.desc())\
-      .all()
+  rows = collections.defaultdict(list)
+  query = permission_rows_query(user_id, kinds)
+  if query is not None:
+    for kind, type_, id_, context_id, value in query:
+      rows[kind].append((type_, id_, context_id, value))
+  return rows
 
-  source_contexts_to_rolenames = {}
-  for user_role in user_roles:
-    source_contexts_to_rolenames.setdefault(
-        user_role.context_id, list()).append(user_role.role.name)
-    if isinstance(user_role.role.permissions, dict):
-      collect_permissions(
-          user_role.role.permissions, user_role.context_id, permissions)
-  return source_contexts_to_rolenames
+
+def get_role_permissions(rows):
+  """Get permissions of all roles
+
+  Args:
+      rows (list): role rows
+  Returns:
+      roles (dict): role name to its permissions
+  """
+  return {
+      name: Role(name=name, permissions_json=permissions_json).permissions
+      for name, _, _, permissions_json in rows
+  }
 
 
-def load_all_context_implications(source_contexts_to_rolenames):
-  """Load context implications based on rolenames
+def load_user_roles(rows, roles, permissions):
+  """Load all user roles for user
 
   Args:
-      source_contexts_to_rolenames (dict): Role names for contexts
+      rows (list): user role rows
+      roles (dict): role name to its permissions
+      permissions (dict): dict where the permissions will be stored
   Returns:
-      all_context_implications (list): List of possible context implications
+      source_contexts_to_rolenames (dict): Role names for contexts
   """
-  # apply role implications per context implication
-  all_context_implications = db.session.query(ContextImplication)
-  keys = [k for k in source_contexts_to_rolenames.keys() if k is not None]
-  if keys and None in source_contexts_to_rolenames:
-    all_context_implications = all_context_implications.filter(
-        or_(
-            ContextImplication.source_context_id.is_(None),
-            ContextImplication.source_context_id.in_(keys),
-        )).all()
-  elif keys:
-    all_context_implications = all_context_implications.filter(
-        ContextImplication.source_context_id.in_(keys)).all()
-  elif None in source_contexts_to_rolenames:
-    all_context_implications = all_context_implications.filter(
-        ContextImplication.source_context_id.is_(None)).all()
-  else:
-    all_context_implications = []
-  return all_context_implications
+  # Add permissions from all DB-managed roles
+  source_contexts_to_rolenames = {}
+  for role_name, _, context_id, _ in rows:
+    source_contexts_to_rolenames.setdefault(
+        context_id, list()).append(role_name)
+    if isinstance(roles.get(role_name), dict):
+      collect_permissions(roles[role_name], context_id, permissions)
+  return source_contexts_to_rolenames
 
 
 def load_implied_roles(permissions, source_contexts_to_rolenames,
-                       all_context_implications):
+                       implication_index, roles):
   """Load roles from implied contexts
 
   Args:
       permissions (dict): dict where the permissions will be stored
       source_contexts_to_rolenames (dict): Role names for contexts
-      all_context_implications (list): List of possible context implications
+      implication_index (ContextImplicationIndex): index of context
+          implications
+      roles (dict): role name to its permissions
   Returns:
       None
   """
   # Gather all roles required by context implications
-  implied_context_to_implied_roles = {}
-  all_implied_roles_set = set()
-  for context_implication in all_context_implications:
-    for rolename in source_contexts_to_rolenames.get(
-            context_implication.source_context_id, []):
-      implied_role_names_list = implied_context_to_implied_roles.setdefault(
-          context_implication.context_id, list())
-      implied_role_names = lookup_role_implications(
-          rolename, context_implication)
-      all_implied_roles_set.update(implied_role_names)
-      implied_role_names_list.extend(implied_role_names)
-  # If some roles are required, query for them in bulk
-  all_implied_roles_by_name = {}
-  if implied_context_to_implied_roles and all_implied_roles_set:
-    implied_roles = db.session.query(Role)\
-        .filter(Role.name.in_(all_implied_roles_set))\
-        .options(sqlalchemy.orm.undefer_group('Role_complete'))\
-        .all()
-    for implied_role in implied_roles:
-      all_implied_roles_by_name[implied_role.name] = implied_role
+  implied_context_to_implied_roles = implication_index.resolve(
+      source_contexts_to_rolenames)
   # Now aggregate permissions resulting from these roles
   for implied_context_id, implied_rolenames \
           in implied_context_to_implied_roles.items():
     if implied_context_id is None:
       continue
     for implied_rolename in implied_rolenames:
-      implied_role = all_implied_roles_by_name[implied_rolename]
       collect_permissions(
-          implied_role.permissions, implied_context_id, permissions)
+          roles[implied_rolename], implied_context_id, permissions)
 
 
 def context_relationship_query(contexts):
@@ -592,14 +648,14 @@ def context_relationship_query(contexts):
   ))).all()
 
 
-def load_context_relationships(permissions):
-  """Load context relationship permissions
+def get_program_contexts(permissions):
+  """Get program contexts with read and write permissions
 
   Args:
-      user (Person): Person object
-      permissions (dict): dict where the permissions will be stored
+      permissions (dict): dict with the loaded permissions
   Returns:
-      None
+      read_only_contexts (set): ids of contexts with read only permissions
+      write_contexts (set): ids of contexts with update permissions
   """
   read_contexts = set(
       permissions.get('read', {}).
@@ -609,8 +665,20 @@ def load_context_relationships(permissions):
       permissions.get('update', {}).
       get('Program', {}).
       get('contexts', []))
-  read_only_contexts = read_contexts - write_contexts
+  return read_contexts - write_contexts, write_contexts
+
+
+def load_context_relationships(permissions, read_only_contexts,
+                               write_contexts):
+  """Load context relationship permissions
 
+  Args:
+      permissions (dict): dict where the permissions will be stored
+      read_only_contexts (set): program contexts with read permissions
+      write_contexts (set): program contexts with update permissions
+  Returns:
+      None
+  """
   read_objects = context_relationship_query(read_only_contexts)
   for res in read_objects:
     id_, type_, _ = res
@@ -632,16 +700,16 @@ def load_context_relationships(permissions):
           .append(id_)
 
 
-def load_assignee_relationships(user, permissions):
+def load_assignee_relationships(rows, permissions):
   """Load assignee relationship permissions
 
   Args:
-      user (Person): Person object
+      rows (list): assignee rows
       permissions (dict): dict where the permissions will be stored
   Returns:
       None
   """
-  for id_, type_, role_name in objects_via_assignable_query(user.id, False):
+  for type_, id_, _, role_name in rows:
     actions = ["read", "view_object_page"]
     if role_name == "RUD":
       actions += ["update", "delete"]
@@ -652,36 +720,40 @@ def load_assignee_relationships(user, permissions):
           .append(id_)
 
 
-def load_personal_context(user, permissions):
+def load_personal_context(user, rows, permissions):
   """Load personal context for user
 
   Args:
       user (Person): Person object
+      rows (list): personal context rows, the context is created if empty
       permissions (dict): dict where the permissions will be stored
   Returns:
       None
   """
-  personal_context = _get_or_create_personal_context(user)
+  if rows:
+    personal_context_id = min(id_ for _, id_, _, _ in rows)
+  else:
+    personal_context_id = _get_or_create_personal_context(user).id
 
   permissions.setdefault('__GGRC_ADMIN__', {})\
       .setdefault('__GGRC_ALL__', dict())\
       .setdefault('contexts', list())\
-      .append(personal_context.id)
+      .append(personal_context_id)
 
 
-def load_access_control_list(user, permissions):
-  """Load permissions from access_control_list"""
-  acl = all_models.AccessControlList
-  acr = all_models.AccessControlRole
-  access_control_list = db.session.query(
-      acl.object_type, acl.object_id, acr.read, acr.update, acr.delete
-  ).filter(and_(all_models.AccessControlList.person_id == user.id,
-                all_models.AccessControlList.ac_role_id == acr.id)).all()
-
-  for object_type, object_id, read, update, delete in access_control_list:
-    actions = (("read", read), ("update", update), ("delete", delete))
-    for action, allowed in actions:
-      if not allowed:
+def load_access_control_list(rows, permissions):
+  """Load permissions from access_control_list
+
+  Args:
+      rows (list): access control list rows
+      permissions (dict): dict where the permissions will be stored
+  Returns:
+      None
+  """
+  for object_type, object_id, _, flags in rows:
+    actions = (("read", "R"), ("update", "U"), ("delete", "D"))
+    for action, flag in actions:
+      if flag not in flags:
         continue
       permissions.setdefault(action, {})\
           .setdefault(object_type, {})\
@@ -689,10 +761,11 @@ def load_access_control_list(user, permissions):
           .append(object_id)
 
 
-def load_backlog_workflows(permissions):
+def load_backlog_workflows(rows, permissions):
   """Load permissions for backlog workflows
 
   Args:
+      rows (list): backlog workflow rows
       permissions (dict): dict where the permissions will be stored
   Returns:
       None
@@ -701,7 +774,7 @@ def load_backlog_workflows(permissions):
   actions = ["read", "edit", "update"]
   _types = ["Workflow", "Cycle", "CycleTaskGroup",
             "CycleTaskGroupObjectTask", "TaskGroup", "CycleTaskEntry"]
-  for _, _, wf_context_id in backlog_workflows().all():
+  for _, _, wf_context_id, _ in rows:
     for _type in _types:
       if _type == "CycleTaskGroupObjectTask":
         actions += ["delete"]
@@ -714,29 +787,7 @@ def load_backlog_workflows(permissions):
             .append(wf_context_id)
 
 
-def store_results_into_memcache(permissions, cache, key):
-  """Load personal context for user
-
-  Args:
-      permissions (dict): dict where the permissions will be stored
-      cache (cache_manager): Cache manager that should be used for storing
-                             permissions
-      key (string): key of under which permissions should be stored
-  Returns:
-      None
-  """
-  if cache is None:
-    return
-
-  cached_keys_set = cache.get('permissions:list') or set()
-  if key in cached_keys_set:
-    # We only add the permissions to the cache if the
-    # key still exists in the permissions:list after
-    # the query has executed.
-    cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
-
-
-def load_permissions_for(user):
+def load_permissions_for(user, acl_permissions=None):
   """Permissions is dictionary that can be exported to json to share with
   clients. Structure is:
   ..
@@ -753,50 +804,184 @@ def load_permissions_for(user):
     keys.
   'condition' is the string name of a conditional operator, such as 'contains'.
   'terms' are the arguments to the 'condition'.
-  """
-  permissions = {}
-  key = 'permissions:{}'.format(user.id)
 
-  with benchmark("load_permissions > query memcache"):
-    cache, result = query_memcache(key)
-    if result:
-      return result
+  Permissions other than the default and bootstrap admin ones are loaded
+  in sections, which are cached separately and reloaded only when the
+  objects they depend on change, see permissions_cache. Rows of all sections
+  that need to be reloaded are fetched with a single query, only context
+  relationships need a second query as they depend on the loaded roles.
 
-  with benchmark("load_permissions > load default permissions"):
+  Permissions granted by access control list entries are merged into
+  `acl_permissions` as well if it is given.
+  """
+  permissions = {}
+  start = time.time()
+
+  with _load_stage("query memcache"):
+    namespaces = get_section_namespaces(user.id)
+    sections = permissions_cache.SectionCache(
+        permissions_cache.get_memcache_client(), user.id, PERMISSION_SECTIONS,
+        set().union(*namespaces.values()))
+    if sections.is_valid("user_roles", namespaces["user_roles"]):
+      namespaces["implied_roles"] = get_implied_roles_namespaces(
+          namespaces["user_roles"], sections.sections["user_roles"][1][1])
+
+  with _load_stage("load permission rows"):
+    rows = load_permission_rows(user.id, {
+        kind
+        for name, kinds in SECTION_ROW_KINDS.iteritems()
+        if not sections.is_valid(name, namespaces.get(name, ()))
+        for kind in kinds
+    })
+
+  with _load_stage("load default permissions"):
     load_default_permissions(permissions)
 
-  with benchmark("load_permissions > load bootstrap admins"):
+  with _load_stage("load bootstrap admins"):
     load_bootstrap_admin(user, permissions)
 
-  with benchmark("load_permissions > load user roles"):
-    source_contexts_to_rolenames = load_user_roles(user, permissions)
+  with _load_stage("load user roles"):
+    role_permissions, source_contexts_to_rolenames = sections.get(
+        "user_roles", namespaces["user_roles"],
+        lambda: _load_user_roles_section(rows))
+    permissions_cache.merge_permissions(permissions, role_permissions)
+
+  with _load_stage("load implied roles"):
+    implied_namespaces = get_implied_roles_namespaces(
+        namespaces["user_roles"], source_contexts_to_rolenames)
+    permissions_cache.merge_permissions(permissions, sections.get(
+        "implied_roles", implied_namespaces,
+        lambda: _load_implied_roles_section(
+            rows, source_contexts_to_rolenames)))
+
+  with _load_stage("load context relationships"):
+    read_only_contexts, write_contexts = get_program_contexts(permissions)
+    relationship_namespaces = implied_namespaces.union(
+        permissions_cache.context_namespace(context_id)
+        for context_id in read_only_contexts | write_contexts)
+    relationship_namespaces.update((
+        permissions_cache.type_namespace("Context"),
+        permissions_cache.type_namespace("Relationship"),
+    ))
+    permissions_cache.merge_permissions(permissions, sections.get(
+        "context_relationships", relationship_namespaces,
+        lambda: _load_section(lambda section: load_context_relationships(
+            section, read_only_contexts, write_contexts))))
+
+  with _load_stage("load assignee relationships"):
+    permissions_cache.merge_permissions(permissions, sections.get(
+        "assignee_relationships", namespaces["assignee_relationships"],
+        lambda: _load_section(functools.partial(
+            load_assignee_relationships, rows["assignee"]))))
+
+  with _load_stage("load personal context"):
+    permissions_cache.merge_permissions(permissions, sections.get(
+        "personal_context", namespaces["personal_context"],
+        lambda: _load_section(functools.partial(
+            load_personal_context, user, rows["personal_context"]))))
+
+  with _load_stage("load access control list"):
+    acl_section = sections.get(
+        "access_control_list", namespaces["access_control_list"],
+        lambda: _load_section(functools.partial(
+            load_access_control_list, rows["acl"])))
+    permissions_cache.merge_permissions(permissions, acl_section)
+    if acl_permissions is not None:
+      permissions_cache.merge_permissions(acl_permissions, acl_section)
+
+  with _load_stage("load backlog workflows"):
+    permissions_cache.merge_permissions(permissions, sections.get(
+        "backlog_workflows", namespaces["backlog_workflows"],
+        lambda: _load_section(functools.partial(
+            load_backlog_workflows, rows["backlog"]))))
+
+  metrics.METRICS.observe_time("load_permissions", time.time() - start)
+  metrics.METRICS.observe_size("permissions", permissions)
+  return permissions
 
-  with benchmark("load_permissions > load context implications"):
-    all_context_implications = load_all_context_implications(
-        source_contexts_to_rolenames)
 
-  with benchmark("load_permissions > load implied roles"):
-    load_implied_roles(permissions, source_contexts_to_rolenames,
-                       all_context_implications)
+@contextlib.contextmanager
+def _load_stage(stage):
+  """Benchmark a stage of load_permissions_for and record its duration."""
+  message = "load_permissions > " + stage
+  with benchmark(message, func_name="load_permissions_for"):
+    with metrics.timed(message):
+      yield
 
-  with benchmark("load_permissions > load context relationships"):
-    load_context_relationships(permissions)
 
-  with benchmark("load_permissions > load assignee relationships"):
-    load_assignee_relationships(user, permissions)
+def get_section_namespaces(user_id):
+  """Get cache namespaces of permission sections that do not depend on data
 
-  with benchmark("load_permissions > load personal context"):
-    load_personal_context(user, permissions)
+  Args:
+      user_id (int): id of the user
+  Returns:
+      namespaces (dict): section name to a set of its namespaces
+  """
+  return {
+      "user_roles": {
+          permissions_cache.user_roles_namespace(user_id),
+          permissions_cache.type_namespace("UserRole"),
+          permissions_cache.type_namespace("Role"),
+      },
+      "assignee_relationships": {
+          permissions_cache.ASSIGNEES_NAMESPACE,
+          permissions_cache.type_namespace("Relationship"),
+          permissions_cache.type_namespace("RelationshipAttr"),
+      },
+      "personal_context": set(),
+      "access_control_list": {
+          permissions_cache.acl_namespace(user_id),
+          permissions_cache.type_namespace("AccessControlList"),
+          permissions_cache.type_namespace("AccessControlRole"),
+      },
+      "backlog_workflows": {permissions_cache.type_namespace("Workflow")},
+  }
 
-  with benchmark("load_permissions > load access control list"):
-    load_access_control_list(user, permissions)
 
-  with benchmark("load_permissions > load backlog workflows"):
-    load_backlog_workflows(permissions)
+def get_implied_roles_namespaces(role_namespaces,
+                                 source_contexts_to_rolenames):
+  """Get cache namespaces of the implied roles section
 
-  with benchmark("load_permissions > store results into memcache"):
-    store_results_into_memcache(permissions, cache, key)
+  Args:
+      role_namespaces (set): namespaces of the user roles section
+      source_contexts_to_rolenames (dict): Role names for contexts
+  Returns:
+      namespaces (set): namespaces of the implied roles section
+  """
+  namespaces = role_namespaces.union(
+      permissions_cache.context_namespace(context_id)
+      for context_id in source_contexts_to_rolenames)
+  namespaces.add(permissions_cache.type_namespace("ContextImplication"))
+  return namespaces
 
+
+def _load_section(loader):
+  """Load a section of permissions
+
+  Args:
+      loader (function): function storing permissions into the given dict
+  Returns:
+      permissions (dict): permissions loaded by the loader
+  """
+  permissions = {}
+  loader(permissions)
+  return permissions
+
+
+def _load_user_roles_section(rows):
+  """Load permissions of user roles together with their role names."""
+  permissions = {}
+  source_contexts_to_rolenames = load_user_roles(
+      rows["user_role"], get_role_permissions(rows["role"]), permissions)
+  return permissions, source_contexts_to_rolenames
+
+
+def _load_implied_roles_section(rows, source_contexts_to_rolenames):
+  """Load permissions of roles implied through context implications."""
+  permissions = {}
+  load_implied_roles(permissions, source_contexts_to_rolenames,
+                     context_implications.get_index(),
+                     get_role_permissions(rows["role"]))
   return permissions
 
 
@@ -945,6 +1130,7 @@ def handle_resource_deleted(sender, obj=None, service=None):
             or_(ContextImplication.context_id == obj.context_id,
                 ContextImplication.source_context_id == obj.context_id))\
         .delete()
+    collection_versions.mark_modified("UserRole", "ContextImplication")
     # Deleting the context itself is problematic, because unattached objects
     #   may still exist and cause a database error.  Instead of implicitly
     #   cascading to delete those, just leave the `Context` object in place.
@@ -976,6 +1162,8 @@ def contributed_column_handlers():
   return COLUMN_HANDLERS
 
 
+permissions_cache.register_permissions_cache_listeners()
+
 ROLE_DECLARATIONS = BasicRoleDeclarations()
 ROLE_IMPLICATIONS = BasicRoleImplications()
 
@@ -0,0 +1,123 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""In-process index of the context implication graph.
+
+Implied roles of a user depend only on the roles the user has in source
+contexts and on the context implication graph, which is small and rarely
+changes. The graph is loaded once per process and the roles implied by a
+role in a source context are resolved once and memoized, so loading implied
+roles of a user is a dictionary lookup per user role instead of a join of
+all implications with user roles.
+
+Implied roles are not transitive: a role gained through an implication is
+never used as the source of further implications. The resolved entries are
+therefore the closure of a single implication step, and cycles in the graph
+have no effect on the result.
+
+The index is reloaded when the version of the graph changes. The version
+consists of the number of implications, their highest id and their latest
+update, so inserts and deletes made with bulk queries are detected as well.
+"""
+
+import collections
+
+from sqlalchemy import func
+
+from ggrc import db
+from ggrc_basic_permissions.contributed_roles import lookup_role_implications
+from ggrc_basic_permissions.models import ContextImplication
+
+
+ContextImplicationRow = collections.namedtuple(
+    "ContextImplicationRow",
+    ["source_context_id", "context_id", "source_context_scope",
+     "context_scope"],
+)
+
+
+class ContextImplicationIndex(object):
+  """Context implications grouped by their source context.
+
+  Attributes:
+    version: version of the graph the index was loaded for
+    implications: source context id to a list of ContextImplicationRow
+  """
+
+  def __init__(self, version, rows):
+    self.version = version
+    self.implications = collections.defaultdict(list)
+    for row in rows:
+      self.implications[row.source_context_id].append(row)
+    self._resolved = {}
+
+  def implied_roles(self, source_context_id, rolename):
+    """Get roles implied by a role in a source context.
+
+    Returns:
+      list of (context_id, implied role names) tuples
+    """
+    key = (source_context_id, rolename)
+    resolved = self._resolved.get(key)
+    if resolved is None:
+      resolved = [
+          (implication.context_id,
+           lookup_role_implications(rolename, implication))
+          for implication in self.implications.get(source_context_id, ())
+      ]
+      self._resolved[key] = resolved
+    return resolved
+
+  def resolve(self, source_contexts_to_rolenames):
+    """Get roles implied by roles in source contexts.
+
+    Args:
+      source_contexts_to_rolenames (dict): context id to role names
+    Returns:
+      dict of implied context id to a list of implied role names
+    """
+    implied = {}
+    for source_context_id, rolenames in source_contexts_to_rolenames.items():
+      for rolename in rolenames:
+        for context_id, implied_rolenames in self.implied_roles(
+                source_context_id, rolename):
+          implied.setdefault(context_id, []).extend(implied_rolenames)
+    return implied
+
+
+def get_version():
+  """Get version of the context implication graph with a single query."""
+  return tuple(db.session.query(
+      func.count(ContextImplication.id),
+      func.max(ContextImplication.id),
+      func.max(ContextImplication.updated_at),
+  ).one())
+
+
+def load_index(version):
+  """Load all context implications into a new index."""
+  rows = db.session.query(
+      ContextImplication.source_context_id,
+      ContextImplication.context_id,
+      ContextImplication.source_context_scope,
+      ContextImplication.context_scope,
+  )
+  return ContextImplicationIndex(
+      version, (ContextImplicationRow(*row) for row in rows))
+
+
+_INDEX = {"index": None}
+
+
+def get_index():
+  """Get index of the current context implication graph.
+
+  The version is read before the rows, so an index loaded during a
+  concurrent change is reloaded by the next call.
+  """
+  version = get_version()
+  index = _INDEX["index"]
+  if index is None or index.version != version:
+    index = load_index(version)
+    _INDEX["index"] = index
+  return index
@@ -10,6 +10,7 @@ from ggrc.converters import errors
 from ggrc.converters.handlers.handlers import UserColumnHandler
 from ggrc.login import get_current_user
 from ggrc.models import Context
+from ggrc.utils import collection_versions
 from ggrc_basic_permissions.models import Role
 from ggrc_basic_permissions.models import UserRole
 
@@ -49,6 +50,7 @@ class ObjectRoleColumnHandler(UserColumnHandler):
         role=self.role,
         context_id=self.row_converter.obj.context_id)\
         .delete(synchronize_session='fetch')
+    collection_versions.mark_modified("UserRole")
 
   def insert_object(self):
     if self.dry_run or not self.value:
@@ -175,6 +177,7 @@ class UserRoleColumnHandler(UserColumnHandler):
         UserRole.role_id.in_(allowed_role_ids),
         UserRole.person_id == self.row_converter.obj.id)
     ).delete(synchronize_session="fetch")
+    collection_versions.mark_modified("UserRole")
 
   def insert_object(self):
     if self.dry_run or not self.value:
@@ -0,0 +1,284 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Sectioned memcache storage of user permissions.
+
+Permissions of a user are cached as independent sections, such as user roles,
+implied roles or access control list entries. Every section is stored with
+the generations of the namespaces it depends on, for example
+"permissions:user_roles:<person_id>" or "permissions:context:<context_id>".
+Commits increment the generations of the namespaces touched by the modified
+objects, so only the affected sections of the affected users are reloaded.
+
+Changes made with bulk queries are reported with
+`collection_versions.mark_modified` and increment type namespaces
+("permissions:type:<model>") which every section reading the type depends on.
+"""
+
+import time
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import settings
+from ggrc.models import all_models
+from ggrc.rbac.metrics import METRICS
+from ggrc.services.common import _get_cache_manager
+from ggrc.utils import collection_versions
+
+
+PERMISSION_CACHE_TIMEOUT = 3600  # 60 minutes
+
+ASSIGNEES_NAMESPACE = "permissions:assignees"
+
+# Sections that do not depend on the user and are shared by all users.
+SHARED_SECTIONS = ("backlog_workflows",)
+
+# Types whose changes invalidate the sections reading them for all users.
+GLOBAL_TYPES = ("AccessControlRole", "Role", "Workflow")
+
+
+def user_roles_namespace(person_id):
+  return "permissions:user_roles:{}".format(person_id)
+
+
+def acl_namespace(person_id):
+  return "permissions:acl:{}".format(person_id)
+
+
+def context_namespace(context_id):
+  return "permissions:context:{}".format(context_id)
+
+
+def type_namespace(type_name):
+  return "permissions:type:{}".format(type_name)
+
+
+def get_memcache_client():
+  """Get memcache client or None if memcache is disabled."""
+  if not getattr(settings, 'MEMCACHE_MECHANISM', False):
+    return None
+  return _get_cache_manager().cache_object.memcache_client
+
+
+def merge_permissions(permissions, section):
+  """Merge permissions loaded by a section into the permissions dict.
+
+  Dictionaries are merged recursively and lists are concatenated, values of
+  the section are never shared with the result.
+  """
+  for key, value in section.iteritems():
+    if isinstance(value, dict):
+      merge_permissions(permissions.setdefault(key, {}), value)
+    elif isinstance(value, list):
+      permissions.setdefault(key, []).extend(value)
+    else:
+      permissions[key] = value
+
+
+class SectionCache(object):
+  """Permission sections of a single user.
+
+  All cached sections and the generations they were stored with are read
+  with two memcache calls when the object is created. Sections are then
+  requested in loading order, so that namespaces of a section can be built
+  from the data of the sections before it.
+
+  Generations are read before the data they cover, each read starts a new
+  database snapshot, see `generations.get_snapshot_generations`. Sections
+  are not cached if the transaction has changes and can't be ended.
+
+  Attributes:
+    client: memcache client or None if caching is disabled
+    user_id: id of the user whose permissions are loaded
+    sections: section name to a (generations, data) tuple read from memcache
+    generations: current generations of namespaces of the cached sections
+    cacheable: whether reloaded sections can be stored in memcache
+    reloaded: names of sections that were loaded from the database
+  """
+
+  def __init__(self, client, user_id, names, namespaces=()):
+    self.client = client
+    self.user_id = user_id
+    self.sections = {}
+    self.generations = {}
+    self.cacheable = client is not None
+    self.reloaded = []
+    if client is None:
+      return
+    keys = {self.get_key(name): name for name in names}
+    cached = client.get_multi(keys.keys()) or {}
+    self.sections = {keys[key]: value for key, value in cached.iteritems()}
+    namespaces = set(namespaces)
+    for stamps, _ in self.sections.itervalues():
+      namespaces.update(stamps)
+    self._read_generations(namespaces)
+
+  def _read_generations(self, namespaces):
+    """Read generations of namespaces before any data they cover."""
+    from ggrc.cache import generations
+    result = generations.get_snapshot_generations(self.client, namespaces)
+    if result is None:
+      self.cacheable = False
+      result = generations.get_generations(self.client, namespaces)
+    self.generations.update(result)
+
+  def get_key(self, name):
+    if name in SHARED_SECTIONS:
+      return "permissions:{}".format(name)
+    return "permissions:{}:{}".format(self.user_id, name)
+
+  def is_valid(self, name, namespaces):
+    """Check if the cached section has been stored for current namespaces."""
+    if name not in self.sections:
+      return False
+    stamps, _ = self.sections[name]
+    return set(stamps) == namespaces and all(
+        stamps[namespace] is not None and
+        stamps[namespace] == self.generations.get(namespace)
+        for namespace in namespaces)
+
+  def get(self, name, namespaces, loader):
+    """Get data of a section, reloading it if its namespaces have changed.
+
+    Args:
+      name: name of the section
+      namespaces: namespaces the section depends on
+      loader: function without arguments that loads the section data
+
+    Returns:
+      data of the section
+    """
+    namespaces = set(namespaces)
+    if self.is_valid(name, namespaces):
+      METRICS.increment("section_hit:" + name)
+      return self.sections[name][1]
+    METRICS.increment("section_miss:" + name)
+    self.reloaded.append(name)
+    if not self.cacheable:
+      return self._load(name, loader)
+    # Namespaces built from loaded data are read now, the loader queries
+    # the data they cover in the snapshot started after the read.
+    missing = namespaces.difference(self.generations)
+    if missing:
+      self._read_generations(missing)
+    stamps = {namespace: self.generations.get(namespace)
+              for namespace in namespaces}
+    data = self._load(name, loader)
+    if self.cacheable and None not in stamps.values():
+      self.client.set(self.get_key(name), (stamps, data),
+                      PERMISSION_CACHE_TIMEOUT)
+    return data
+
+  @staticmethod
+  def _load(name, loader):
+    """Load data of a section and record its loading time and size."""
+    start = time.time()
+    data = loader()
+    METRICS.observe_time("section:" + name, time.time() - start)
+    METRICS.observe_size("section:" + name, data)
+    return data
+
+
+def _get_values(obj, attr):
+  """Get current and previous values of an attribute of a flushed object."""
+  history = sa.inspect(obj).attrs[attr].history
+  values = set(history.added) | set(history.unchanged) | set(history.deleted)
+  values.add(getattr(obj, attr))
+  return values
+
+
+def get_object_namespaces(obj):
+  """Get permission namespaces affected by a change of the object."""
+  type_name = obj.__class__.__name__
+  if type_name in GLOBAL_TYPES:
+    return {type_namespace(type_name)}
+  if type_name == "UserRole":
+    return {user_roles_namespace(person_id)
+            for person_id in _get_values(obj, "person_id")
+            if person_id is not None}
+  if type_name == "AccessControlList":
+    return {acl_namespace(person_id)
+            for person_id in _get_values(obj, "person_id")
+            if person_id is not None}
+  if type_name == "ContextImplication":
+    return {context_namespace(context_id)
+            for context_id in _get_values(obj, "source_context_id")}
+  if type_name == "Context":
+    return {context_namespace(obj.id)}
+  if type_name in ("Relationship", "RelationshipAttr"):
+    return {ASSIGNEES_NAMESPACE}
+  return set()
+
+
+def _get_namespaces(session):
+  """Get the set of namespaces modified in the current transaction."""
+  if not hasattr(session, "permission_namespaces"):
+    session.permission_namespaces = set()
+  return session.permission_namespaces
+
+
+def _get_endpoints(session):
+  """Get the set of relationship endpoints modified in the transaction."""
+  if not hasattr(session, "permission_endpoints"):
+    session.permission_endpoints = set()
+  return session.permission_endpoints
+
+
+def collect_namespaces(session, flush_context):
+  """Remember namespaces of all objects in the flush."""
+  # pylint: disable=unused-argument
+  namespaces = _get_namespaces(session)
+  endpoints = _get_endpoints(session)
+  dirty = set(obj for obj in session.dirty if session.is_modified(obj))
+  for obj in session.new | dirty | session.deleted:
+    namespaces.update(get_object_namespaces(obj))
+    if isinstance(obj, all_models.Relationship):
+      endpoints.add((obj.source_type, obj.source_id))
+      endpoints.add((obj.destination_type, obj.destination_id))
+
+
+def resolve_namespaces(session):
+  """Add namespaces of bulk changes and of contexts of mapped objects.
+
+  Permissions gained through context relationships depend on the mappings
+  of the object a context belongs to, so contexts of relationship endpoints
+  are looked up with a single query.
+  """
+  session.flush()
+  namespaces = _get_namespaces(session)
+  endpoints = _get_endpoints(session)
+  if endpoints:
+    context = all_models.Context
+    context_ids = session.query(context.id).filter(
+        tuple_(context.related_object_type,
+               context.related_object_id).in_(list(endpoints)))
+    namespaces.update(context_namespace(id_) for id_, in context_ids)
+    endpoints.clear()
+  namespaces.update(type_namespace(type_name) for type_name in
+                    collection_versions.get_marked_types(session))
+
+
+def invalidate_sections(session):
+  """Increment generations of all namespaces modified in the transaction."""
+  namespaces = _get_namespaces(session)
+  client = get_memcache_client()
+  if namespaces and client:
+    from ggrc.cache import generations
+    generations.increment(client, namespaces)
+  clear_namespaces(session)
+
+
+def clear_namespaces(session):
+  _get_namespaces(session).clear()
+  _get_endpoints(session).clear()
+
+
+def register_permissions_cache_listeners():
+  """Register session listeners that invalidate cached permissions."""
+  event.listen(Session, 'after_flush', collect_namespaces)
+  event.listen(Session, 'before_commit', resolve_namespaces)
+  event.listen(Session, 'after_commit', invalidate_sections)
+  event.listen(Session, 'after_rollback', clear_namespaces)
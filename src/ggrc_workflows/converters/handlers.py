@@ -12,6 +12,7 @@ from ggrc.converters import errors
 from ggrc.converters.handlers import boolean
 from ggrc.converters.handlers import handlers
 from ggrc.converters.handlers import multi_object
+from ggrc.utils import collection_versions
 from ggrc_basic_permissions import models as bp_models
 from ggrc_workflows import models as wf_models
 
@@ -187,6 +188,7 @@ class WorkflowPersonColumnHandler(handlers.UserColumnHandler):
   def remove_current_people(self):
     wf_models.WorkflowPerson.query.filter_by(
         workflow_id=self.row_converter.obj.id).delete()
+    collection_versions.mark_modified("WorkflowPerson")
 
   def insert_object(self):
     if self.dry_run or not self.value:
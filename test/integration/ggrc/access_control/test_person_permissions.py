@@ -0,0 +1,89 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the materialized person permissions table."""
+
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models.person_permission import PersonPermission
+from ggrc.utils import person_permissions
+
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.generator import ObjectGenerator
+from integration.ggrc.models import factories
+
+
+@mock.patch.object(settings, "MATERIALIZED_PERMISSIONS", True)
+class TestPersonPermissions(TestCase):
+  """Rows follow access control list entries and their roles."""
+
+  def setUp(self):
+    super(TestPersonPermissions, self).setUp()
+    self.control = factories.ControlFactory()
+    self.person = factories.PersonFactory()
+    self.role = factories.AccessControlRoleFactory(
+        object_type="Control", read=True, update=True, delete=False)
+
+  def _get_rows(self):
+    return sorted(db.session.query(
+        PersonPermission.object_id, PersonPermission.action,
+    ).filter(PersonPermission.person_id == self.person.id))
+
+  def _add_acl(self):
+    return factories.AccessControlListFactory(
+        object=self.control, ac_role_id=self.role.id, person=self.person)
+
+  def test_acl_changes(self):
+    """Rows are added and removed with access control list entries."""
+    acl = self._add_acl()
+    self.assertEqual(
+        [(self.control.id, u"read"), (self.control.id, u"update")],
+        self._get_rows())
+
+    db.session.delete(acl)
+    db.session.commit()
+    self.assertEqual([], self._get_rows())
+
+  def test_role_changes(self):
+    """Rows follow the flags of roles."""
+    self._add_acl()
+    self.role.update = False
+    self.role.delete = True
+    db.session.commit()
+
+    self.assertEqual(
+        [(self.control.id, u"delete"), (self.control.id, u"read")],
+        self._get_rows())
+    self.assertEqual({"missing": 0, "extra": 0}, person_permissions.check())
+
+  def test_rebuild(self):
+    """Rebuild restores rows reported by the checker."""
+    self._add_acl()
+    db.session.query(PersonPermission).delete()
+    db.session.commit()
+    self.assertEqual({"missing": 2, "extra": 0}, person_permissions.check())
+
+    person_permissions.rebuild()
+    db.session.commit()
+    self.assertEqual({"missing": 0, "extra": 0}, person_permissions.check())
+
+  def test_query_api(self):
+    """Objects granted by the table are returned by the query API."""
+    _, creator = ObjectGenerator().generate_person(user_role="Creator")
+    factories.AccessControlListFactory(
+        object=self.control, ac_role_id=self.role.id, person=creator)
+    factories.ControlFactory()
+    api = Api()
+    api.set_user(creator)
+
+    response = api.send_request(api.client.post, api_link="/query", data=[{
+        "object_name": "Control",
+        "filters": {"expression": {}},
+        "type": "ids",
+    }])
+
+    self.assert200(response)
+    self.assertEqual([self.control.id], response.json[0]["ids"])
@@ -0,0 +1,34 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for resolving lazy stubs in published representations."""
+
+import mock
+
+from ggrc.builder import json
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+
+
+class TestPublishRepresentation(TestCase):
+  """Tests for publish_representation."""
+
+  def test_collection_stubs_resolved_once(self):
+    """Stubs of a whole collection are deduplicated and queried together."""
+    person = all_models.Person.query.first()
+    resource = [
+        {"contact": json.LazyStubRepresentation("Person", person.id),
+         "modified_by": [json.LazyStubRepresentation("Person", person.id)]}
+        for _ in range(3)
+    ]
+    with mock.patch("ggrc.builder.json.build_stub_union_query",
+                    wraps=json.build_stub_union_query) as build_query:
+      json.publish_representation(resource)
+
+    self.assertEqual(1, build_query.call_count)
+    (queries,), _ = build_query.call_args
+    self.assertEqual([("Person", {"id": person.id})], list(queries))
+    for obj in resource:
+      for stub in (obj["contact"], obj["modified_by"][0]):
+        self.assertDictContainsSubset(
+            {"type": "Person", "id": person.id}, stub)
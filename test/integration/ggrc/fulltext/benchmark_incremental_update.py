@@ -0,0 +1,124 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+ Benchmark for updates of fulltext index records after an edit
+
+ Creates a market with num_attributes custom attribute values and changes
+ its title num_edits times. After every edit the index records of the market
+ are updated once with the full update, which deletes and inserts all
+ records of the object, and once with the incremental update, which writes
+ only the changed records. Reports for both modes:
+
+ - the number of index rows written per edit,
+ - the time of the index update per edit.
+
+ The created objects are removed at the end.
+
+ Run with the same settings as the integration tests:
+
+   GGRC_SETTINGS_MODULE="development" python benchmark_incremental_update.py
+"""
+
+import time
+
+from sqlalchemy import event
+
+from ggrc import db
+from ggrc import settings
+from ggrc.app import app
+from ggrc.models import all_models
+
+num_attributes = 50
+num_edits = 20
+
+TABLE_NAME = "fulltext_record_properties"
+
+
+class RowCounter(object):
+  """Count rows written to the fulltext index table."""
+
+  def __init__(self):
+    self.count = 0
+
+  def __call__(self, conn, cursor, statement, *args):
+    # pylint: disable=unused-argument
+    writes = ("INSERT", "UPDATE", "DELETE")
+    if statement.startswith(writes) and TABLE_NAME in statement:
+      self.count += cursor.rowcount
+
+  def __enter__(self):
+    event.listen(db.engine, "after_cursor_execute", self)
+    return self
+
+  def __exit__(self, *args):
+    event.remove(db.engine, "after_cursor_execute", self)
+
+
+def create_market():
+  """Create a market with custom attribute values and index it."""
+  market = all_models.Market(title="Benchmark market",
+                             slug="BENCHMARK-MARKET")
+  db.session.add(market)
+  for i in range(num_attributes):
+    definition = all_models.CustomAttributeDefinition(
+        title="Benchmark attribute {}".format(i),
+        definition_type="market",
+        attribute_type="Text",
+    )
+    db.session.add(definition)
+    db.session.add(all_models.CustomAttributeValue(
+        custom_attribute=definition,
+        attributable=market,
+        attribute_value="Value {}".format(i),
+    ))
+  db.session.commit()
+  return market.id
+
+
+def delete_market(market_id):
+  cad = all_models.CustomAttributeDefinition
+  cav = all_models.CustomAttributeValue
+  cav.query.filter(cav.attributable_type == "Market",
+                   cav.attributable_id == market_id).delete()
+  cad.query.filter(cad.title.startswith("Benchmark attribute")).delete(
+      synchronize_session=False)
+  all_models.Market.query.filter_by(id=market_id).delete()
+  db.session.execute(all_models.Market.get_delete_query_for([market_id]))
+  db.session.commit()
+
+
+def update_records(market_id, incremental):
+  """Edit the market and update its records in the given mode.
+
+  Returns:
+    tuple of the number of rows written and the duration of the update
+  """
+  settings.FULLTEXT_INCREMENTAL_UPDATE = incremental
+  durations = []
+  with RowCounter() as counter:
+    for i in range(num_edits):
+      db.session.execute(all_models.Market.__table__.update().where(
+          all_models.Market.id == market_id
+      ).values(title="Benchmark market {}".format(i)))
+      start = time.time()
+      all_models.Market.bulk_record_update_for([market_id])
+      db.session.commit()
+      durations.append(time.time() - start)
+  return counter.count, sum(durations)
+
+
+def run_benchmark():
+  with app.app_context():
+    market_id = create_market()
+    try:
+      for name, incremental in (("full", False), ("incremental", True)):
+        rows, duration = update_records(market_id, incremental)
+        print "{}: {:.1f} rows written, {:.4f}s per edit".format(
+            name, float(rows) / num_edits, duration / num_edits)
+    finally:
+      delete_market(market_id)
+
+
+if __name__ == '__main__':
+  run_benchmark()
@@ -0,0 +1,103 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+ Benchmark for full text search with and without the trigram index
+
+ Fills the full text index with num_objects objects of a fake type with
+ num_properties searchable records of random words each, and builds their
+ trigrams. Then searches for every term in search_terms with the filter of
+ MysqlIndexer, which scans records with LIKE, and with the filter of
+ TrigramIndexer, which looks up candidates in the trigram index. Reports
+ for every term:
+
+ - the number of matched objects, which must be equal for both indexers,
+ - the time of the search with both indexers.
+
+ The created records are removed at the end.
+
+ Run with the same settings as the integration tests:
+
+   GGRC_SETTINGS_MODULE="development" python benchmark_trigram_search.py
+"""
+
+import random
+import time
+
+from ggrc import db
+from ggrc import settings
+from ggrc.app import app
+from ggrc.fulltext import mysql
+from ggrc.fulltext import mysql_trigram
+
+num_objects = 1000000
+num_properties = 3
+batch_size = 1000
+
+search_terms = [u"lorem", u"ipsum dol", u"consectetur adip", u"qui", u"zz",
+                u"nonexistent"]
+
+OBJECT_TYPE = "BenchmarkObject"
+
+WORDS = (u"lorem ipsum dolor sit amet consectetur adipiscing elit sed do "
+         u"eiusmod tempor incididunt ut labore et dolore magna aliqua ut "
+         u"enim ad minim veniam quis nostrud exercitation ullamco laboris "
+         u"nisi aliquip ex ea commodo consequat").split()
+
+PROPERTIES = mysql.SEARCHABLE_PROPERTIES[:num_properties]
+
+
+def random_text():
+  return u" ".join(random.sample(WORDS, 5)) + u" {}".format(
+      random.randint(0, 10 ** 6))
+
+
+def create_records(indexer):
+  """Insert records of fake objects and build their trigrams."""
+  table = indexer.record_type.__table__
+  for start in range(0, num_objects, batch_size):
+    keys = range(start, min(start + batch_size, num_objects))
+    db.session.execute(table.insert(), [{
+        "key": key,
+        "type": OBJECT_TYPE,
+        "context_id": None,
+        "tags": u"",
+        "property": prop,
+        "subproperty": u"",
+        "content": random_text(),
+    } for key in keys for prop in PROPERTIES])
+    indexer.records_updated(OBJECT_TYPE, keys)
+    db.session.commit()
+
+
+def delete_records(indexer):
+  indexer.delete_records_by_type(OBJECT_TYPE)
+
+
+def search(filter_query):
+  """Return the number of matched objects and the search duration."""
+  record = mysql.MysqlRecordProperty
+  start = time.time()
+  count = db.session.query(record.key).filter(
+      record.type == OBJECT_TYPE, filter_query).distinct().count()
+  return count, time.time() - start
+
+
+def run_benchmark():
+  with app.app_context():
+    indexer = mysql_trigram.TrigramIndexer(settings)
+    create_records(indexer)
+    try:
+      for terms in search_terms:
+        like_count, like_time = search(
+            mysql.MysqlIndexer._get_filter_query(terms))
+        trigram_count, trigram_time = search(
+            indexer._get_filter_query(terms))
+        print u"{!r}: {} / {} objects, LIKE {:.4f}s, trigrams {:.4f}s".format(
+            terms, like_count, trigram_count, like_time, trigram_time)
+    finally:
+      delete_records(indexer)
+
+
+if __name__ == '__main__':
+  run_benchmark()
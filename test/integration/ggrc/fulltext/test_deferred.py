@@ -0,0 +1,74 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for deferred updates of the full text index."""
+
+import datetime
+
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc.fulltext import deferred
+from ggrc.fulltext.mysql import MysqlRecordProperty
+from ggrc.models import all_models
+from ggrc.models.pending_reindex import PendingReindex
+
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+@mock.patch.object(settings, "DEFERRED_INDEXING", True)
+class TestDeferredIndexing(TestCase):
+  """Commits queue objects that are reindexed later."""
+
+  @staticmethod
+  def _is_indexed(obj):
+    return db.session.query(MysqlRecordProperty.query.filter(
+        MysqlRecordProperty.type == obj.type,
+        MysqlRecordProperty.key == obj.id,
+    ).exists()).scalar()
+
+  @staticmethod
+  def _queued(obj):
+    return PendingReindex.query.filter_by(type=obj.type, key=obj.id).count()
+
+  def test_drain(self):
+    """Objects queued by many commits are reindexed once."""
+    market = factories.MarketFactory()
+    market.title = "New title"
+    db.session.commit()
+    self.assertFalse(self._is_indexed(market))
+    self.assertEqual(2, self._queued(market))
+    self.assertEqual(2, PendingReindex.query.count())
+
+    self.assertEqual(1, deferred.flush_pending_reindex(limit=1))
+    db.session.commit()
+    self.assertTrue(self._is_indexed(market))
+    self.assertEqual(0, self._queued(market))
+
+  @mock.patch.object(settings, "DEFERRED_INDEXING_STALENESS", 60)
+  def test_stale_entries(self):
+    """Commits reindex objects queued longer than the staleness bound."""
+    market = factories.MarketFactory()
+    PendingReindex.query.update({
+        "created_at": datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    })
+    db.session.commit()
+    self.assertFalse(self._is_indexed(market))
+
+    person = factories.PersonFactory()
+    self.assertTrue(self._is_indexed(market))
+    self.assertFalse(self._is_indexed(person))
+
+  def test_request(self):
+    """Objects queued by a request are reindexed after it."""
+    response = Api().post(all_models.Market, {"market": {
+        "title": "Market", "context": None,
+    }})
+    self.assertEqual(201, response.status_code)
+
+    market = all_models.Market.query.one()
+    self.assertTrue(self._is_indexed(market))
+    self.assertEqual(0, PendingReindex.query.count())
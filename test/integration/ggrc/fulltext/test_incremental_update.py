@@ -0,0 +1,62 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for incremental updates of fulltext index records."""
+
+from ggrc import db
+from ggrc.fulltext.mysql import MysqlRecordProperty
+from ggrc.models import all_models
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestIncrementalUpdate(TestCase):
+  """Only changed index records are written."""
+
+  def setUp(self):
+    super(TestIncrementalUpdate, self).setUp()
+    self.market = factories.MarketFactory(title="Market title")
+    self.market_id = self.market.id
+
+  def _records(self):
+    return MysqlRecordProperty.query.filter(
+        MysqlRecordProperty.type == "Market",
+        MysqlRecordProperty.key == self.market_id,
+    )
+
+  def _record(self, prop):
+    return self._records().filter(MysqlRecordProperty.property == prop)
+
+  def test_unchanged(self):
+    """Nothing is written for objects with up to date records."""
+    self.assertEqual(
+        ([], [], []),
+        all_models.Market.get_record_changes_for([self.market_id]))
+
+  def test_changes(self):
+    """Stale, missing and obsolete records are written."""
+    self._record("title").update({"content": "Stale title"},
+                                 synchronize_session=False)
+    self._record("slug").delete(synchronize_session=False)
+    db.session.add(MysqlRecordProperty(
+        key=self.market_id, type="Market", property="obsolete",
+        subproperty="", content="obsolete"))
+    db.session.commit()
+
+    to_delete, to_insert, to_update = all_models.Market.get_record_changes_for(
+        [self.market_id])
+    self.assertEqual(["obsolete"], [row["property"] for row in to_delete])
+    self.assertEqual(["slug"], [row["property"] for row in to_insert])
+    self.assertEqual(["title"], [row["property"] for row in to_update])
+
+    all_models.Market.incremental_record_update_for([self.market_id])
+    db.session.commit()
+
+    expected = all_models.Market.get_record_values_for([self.market_id])
+    self.assertEqual(
+        sorted((row["property"], row["subproperty"], row["content"])
+               for row in expected),
+        sorted((record.property, record.subproperty, record.content)
+               for record in self._records()))
+    self.assertEqual(u"Market title", self._record("title").one().content)
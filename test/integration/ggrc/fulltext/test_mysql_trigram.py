@@ -0,0 +1,83 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the full text indexer with a trigram index."""
+
+import ddt
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc.fulltext import mysql
+from ggrc.fulltext import mysql_trigram
+from ggrc.models import all_models
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@ddt.ddt
+class TestTrigramIndexer(TestCase):
+  """Trigram indexer finds the same records as the Mysql indexer."""
+
+  def setUp(self):
+    super(TestTrigramIndexer, self).setUp()
+    self.indexer = mysql_trigram.TrigramIndexer(settings)
+    patcher = mock.patch("ggrc.fulltext.get_indexer",
+                         return_value=self.indexer)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    with factories.single_commit():
+      for title in (u"Market One", u"Market Two", u"Mark_1 50%",
+                    u"Élan vital"):
+        factories.MarketFactory(title=title, description=u"Shared text")
+
+  @staticmethod
+  def _search(filter_query):
+    record = mysql.MysqlRecordProperty
+    return {key for key, in db.session.query(record.key).filter(
+        record.type == "Market", filter_query).distinct()}
+
+  def _trigram_count(self, obj):
+    return self.indexer.trigram_type.query.filter_by(
+        type=obj.type, key=obj.id).count()
+
+  @ddt.data(u"market", u"MARKET o", u"ket tw", u"one", u"mark_1",
+            u"50%", u"k%o", u"shared t", u"elan", u"élan", u"ma",
+            u"missing", u"")
+  def test_search(self, terms):
+    """Search for {0!r} matches the search of Mysql indexer."""
+    self.assertEqual(
+        self._search(mysql.MysqlIndexer._get_filter_query(terms)),
+        self._search(self.indexer._get_filter_query(terms)),
+    )
+
+  def test_update(self):
+    """Trigrams are rebuilt when records of an object change."""
+    market = all_models.Market.query.filter_by(title=u"Market One").one()
+    market.title = u"Renamed"
+    db.session.commit()
+
+    self.assertEqual({market.id},
+                     self._search(self.indexer._get_filter_query(u"rename")))
+    self.assertEqual(set(),
+                     self._search(self.indexer._get_filter_query(u"one")))
+
+    self.indexer.delete_record(market.id, market.type)
+    self.assertEqual(0, self._trigram_count(market))
+
+  def test_unchanged_trigrams_kept(self):
+    """Only trigrams that differ from the stored ones are written."""
+    market = all_models.Market.query.filter_by(title=u"Market One").one()
+    trigram_type = self.indexer.trigram_type
+    kept_id = trigram_type.query.filter_by(
+        type=market.type, key=market.id, trigram=u"mar").one().id
+    market.title = u"Market Three"
+    db.session.commit()
+
+    trigrams = trigram_type.query.filter_by(type=market.type, key=market.id)
+    self.assertIn(kept_id, {trigram.id for trigram in trigrams})
+    values = [trigram.trigram for trigram in trigrams]
+    self.assertEqual(len(set(values)), len(values))
+    self.assertIn(u"thr", values)
+    self.assertNotIn(u"one", values)
@@ -0,0 +1,93 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for records built from prefetched data."""
+
+from ggrc import db
+from ggrc import fulltext
+from ggrc.models import all_models
+from ggrc.utils import QueryCounter
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestRecordPrefetch(TestCase):
+  """Prefetched records are the same as records built object by object."""
+
+  def setUp(self):
+    super(TestRecordPrefetch, self).setUp()
+    self.indexer = fulltext.get_indexer()
+    self.builder = self.indexer.get_builder(all_models.Market)
+    with factories.single_commit():
+      person = factories.PersonFactory(name="Person")
+      role = factories.AccessControlRoleFactory(object_type="Market",
+                                                name="Role")
+      text_cad = factories.CustomAttributeDefinitionFactory(
+          title="Text", definition_type="market")
+      person_cad = factories.CustomAttributeDefinitionFactory(
+          title="Person", definition_type="market",
+          attribute_type="Map:Person")
+      factories.CustomAttributeDefinitionFactory(
+          title="Empty person", definition_type="market",
+          attribute_type="Map:Person")
+      self.markets = [factories.MarketFactory() for _ in range(3)]
+      for market in self.markets:
+        factories.CustomAttributeValueFactory(
+            custom_attribute=text_cad, attributable=market,
+            attribute_value="Text of {}".format(market.title))
+        factories.CustomAttributeValueFactory(
+            custom_attribute=person_cad, attributable=market,
+            attribute_value="Person", attribute_object_id=person.id)
+        factories.AccessControlListFactory(
+            object=market, ac_role_id=role.id, person=person)
+    self.market_ids = [market.id for market in self.markets]
+    self.person_id = person.id
+    self.role_id = role.id
+    self.indexer.invalidate_cache()
+
+  def _get_properties(self, markets):
+    return {m.id: self.builder.as_record(m).properties for m in markets}
+
+  def test_properties(self):
+    """Prefetch doesn't change properties of records."""
+    db.session.expire_all()
+    markets = all_models.Market.query.filter(
+        all_models.Market.id.in_(self.market_ids)).all()
+    expected = self._get_properties(markets)
+
+    self.indexer.invalidate_cache()
+    db.session.expire_all()
+    markets = all_models.Market.indexed_query().filter(
+        all_models.Market.id.in_(self.market_ids)).all()
+    self.builder.prefetch(markets)
+    with QueryCounter() as counter:
+      self.assertEqual(expected, self._get_properties(markets))
+      self.assertEqual(0, counter.get)
+    self.builder.clear_prefetched()
+
+  def test_query_count(self):
+    """Records of more objects are built with the same queries."""
+    def count_queries(ids):
+      self.indexer.invalidate_cache()
+      db.session.expire_all()
+      with QueryCounter() as counter:
+        all_models.Market.get_record_values_for(ids)
+        return counter.get
+
+    self.assertEqual(count_queries(self.market_ids[:1]),
+                     count_queries(self.market_ids))
+
+  def test_renamed(self):
+    """Records use current names of people and roles."""
+    all_models.Market.get_record_values_for(self.market_ids)
+    self.assertEqual({}, self.indexer.cache["people_map"])
+    self.assertEqual({}, self.indexer.cache["ac_role_map"])
+
+    all_models.Person.query.get(self.person_id).name = "Renamed person"
+    all_models.AccessControlRole.query.get(self.role_id).name = "Renamed"
+    db.session.commit()
+    values = all_models.Market.get_record_values_for(self.market_ids[:1])
+    contents = {(v["property"], v["content"]) for v in values}
+    self.assertIn((u"Renamed", u"Renamed person"), contents)
+    self.assertIn((u"Person", u"Renamed person"), contents)
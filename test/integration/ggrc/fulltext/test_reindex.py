@@ -0,0 +1,95 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the resumable full reindex."""
+
+import json
+
+import mock
+
+from ggrc import db
+from ggrc import settings
+from ggrc.fulltext import reindex
+from ggrc.fulltext.mysql import MysqlRecordProperty
+from ggrc.models import all_models
+from ggrc.models.reindex_chunk import ReindexChunk
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@mock.patch.object(settings, "REINDEX_CHUNK_SIZE", 1)
+class TestReindex(TestCase):
+  """Reindex is split into chunks that are checkpointed."""
+
+  def setUp(self):
+    super(TestReindex, self).setUp()
+    with factories.single_commit():
+      self.market_ids = [factories.MarketFactory().id for _ in range(3)]
+    MysqlRecordProperty.query.delete()
+    db.session.commit()
+
+  def _indexed_market_ids(self):
+    return {key for key, in db.session.query(MysqlRecordProperty.key).filter(
+        MysqlRecordProperty.type == "Market").distinct()}
+
+  def test_resume(self):
+    """An interrupted reindex continues with chunks that are not done."""
+    reindex_chunk = reindex.reindex_chunk
+    processed = []
+
+    def fail_second_market(chunk_id):
+      chunk = ReindexChunk.query.get(chunk_id)
+      if chunk.type == "Market":
+        processed.append(chunk.start_id)
+        if len(processed) == 2:
+          raise Exception("Interrupted")
+      reindex_chunk(chunk_id)
+
+    with mock.patch.object(reindex, "reindex_chunk",
+                           side_effect=fail_second_market):
+      with self.assertRaises(Exception):
+        reindex.reindex()
+    self.assertEqual({processed[0]}, self._indexed_market_ids())
+    self.assertTrue(ReindexChunk.query.count())
+
+    first_market = processed[0]
+    with mock.patch.object(reindex, "reindex_chunk",
+                           side_effect=fail_second_market):
+      reindex.reindex()
+    self.assertEqual(set(self.market_ids), self._indexed_market_ids())
+    self.assertEqual(1, processed.count(first_market))
+    self.assertEqual(0, ReindexChunk.query.count())
+
+  def test_progress(self):
+    """Progress is stored as the result of the background task."""
+    task = all_models.BackgroundTask(name="reindex")
+    db.session.add(task)
+    db.session.commit()
+
+    reindex.reindex(task)
+
+    progress = json.loads(
+        all_models.BackgroundTask.query.get(task.id).result["content"])
+    self.assertEqual(progress["total"], progress["done"])
+    self.assertGreaterEqual(progress["total"], len(self.market_ids))
+
+  def test_running_reindex(self):
+    """A reindex started while another one runs does nothing."""
+    with reindex.reindex_lock() as acquired:
+      self.assertTrue(acquired)
+      self.assertFalse(reindex.reindex())
+    self.assertEqual(set(), self._indexed_market_ids())
+    self.assertEqual(0, ReindexChunk.query.count())
+
+    self.assertTrue(reindex.reindex())
+    self.assertEqual(set(self.market_ids), self._indexed_market_ids())
+
+  def test_removed_chunk(self):
+    """Chunks removed while they wait for reindex are skipped."""
+    reindex.create_chunks(reindex.get_chunk_size())
+    chunk_id = reindex.get_pending_chunk_ids()[0]
+    ReindexChunk.query.delete()
+    db.session.commit()
+
+    reindex.reindex_chunk(chunk_id)
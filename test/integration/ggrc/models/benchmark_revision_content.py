@@ -0,0 +1,88 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+ Benchmark for the storage format of revision content
+
+ Reads the stored content of the latest num_revisions revisions and reports:
+
+ - the size of the content as plain serialized json and compressed,
+ - the time to decode the content in both formats,
+ - the time to load the revisions through the ORM with and without reading
+   their content, which shows the cost that lazy decoding saves when the
+   content is not needed.
+
+ Run with the same settings as the integration tests on a database with
+ revisions:
+
+   GGRC_SETTINGS_MODULE="development" python benchmark_revision_content.py
+"""
+
+import time
+import zlib
+
+from ggrc import db
+from ggrc.app import app
+from ggrc.models import all_models
+from ggrc.models.types import CompressedJsonType
+
+num_revisions = 5000
+
+
+def timed(func, *args):
+  start = time.time()
+  func(*args)
+  return time.time() - start
+
+
+def get_stored_content():
+  table = all_models.Revision.__table__
+  rows = db.session.execute(
+      table.select().with_only_columns([table.c.content,
+                                        table.c.content_format])
+      .order_by(table.c.id.desc()).limit(num_revisions)
+  )
+  plain = []
+  for stored, content_format in rows:
+    if content_format == CompressedJsonType.ZLIB:
+      stored = zlib.decompress(stored)
+    plain.append(stored)
+  return plain, [zlib.compress(value) for value in plain]
+
+
+def decode_all(values, value_format):
+  for value in values:
+    CompressedJsonType.decode(value, value_format)
+
+
+def load_revisions(read_content):
+  db.session.expunge_all()
+  revisions = all_models.Revision.query.order_by(
+      all_models.Revision.id.desc()).limit(num_revisions).all()
+  for revision in revisions:
+    if read_content:
+      revision.content  # pylint: disable=pointless-statement
+    else:
+      revision.resource_type  # pylint: disable=pointless-statement
+
+
+def run_benchmark():
+  with app.app_context():
+    plain, compressed = get_stored_content()
+    if not plain:
+      print "No revisions found"
+      return
+    plain_size = sum(len(value) for value in plain)
+    compressed_size = sum(len(value) for value in compressed)
+    print "{} revisions: plain {} bytes, compressed {} bytes, " \
+          "ratio {:.2f}".format(len(plain), plain_size, compressed_size,
+                                float(plain_size) / compressed_size)
+    print "Decode plain {:.3f}s, compressed {:.3f}s".format(
+        timed(decode_all, plain, CompressedJsonType.PLAIN),
+        timed(decode_all, compressed, CompressedJsonType.ZLIB))
+    print "Load revisions {:.3f}s, with content {:.3f}s".format(
+        timed(load_revisions, False), timed(load_revisions, True))
+
+
+if __name__ == '__main__':
+  run_benchmark()
@@ -0,0 +1,114 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for deferred writing of revisions."""
+
+import mock
+
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.models.pending_revision import PendingRevision
+from ggrc.utils import pending_revisions
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+
+
+@mock.patch("ggrc.settings.ASYNC_REVISIONS", True, create=True)
+@mock.patch("ggrc.views.start_write_revisions")
+class TestPendingRevisions(TestCase):
+  """Tests for revisions written from pending change records."""
+
+  def setUp(self):
+    super(TestPendingRevisions, self).setUp()
+    self.api = Api()
+
+  @staticmethod
+  def _get_actions(obj_type, obj_id):
+    """Get actions of all revisions of an object in the order of writing."""
+    revisions = all_models.Revision.query.filter_by(
+        resource_type=obj_type,
+        resource_id=obj_id,
+    ).order_by(all_models.Revision.id)
+    return [revision.action for revision in revisions]
+
+  def _create_market(self):
+    response = self.api.post(all_models.Market, {
+        "market": {"title": "market", "context": None},
+    })
+    self.assert201(response)
+    return all_models.Market.query.get(response.json["market"]["id"])
+
+  def test_deferred_revisions(self, start_write_revisions):
+    """Revisions are written in order of changes when flushed."""
+    market = self._create_market()
+    self.api.modify_object(market, {"title": "new title"})
+    market_id = market.id
+
+    self.assertEqual(2, start_write_revisions.call_count)
+    self.assertEqual([], self._get_actions("Market", market_id))
+    self.assertEqual(2, PendingRevision.query.count())
+
+    pending_revisions.flush_pending_revisions()
+    db.session.commit()
+
+    self.assertEqual(["created", "modified"],
+                     self._get_actions("Market", market_id))
+    self.assertEqual(0, PendingRevision.query.count())
+    revision = all_models.Revision.query.filter_by(
+        resource_type="Market", resource_id=market_id, action="modified",
+    ).one()
+    self.assertEqual("new title", revision.content["title"])
+
+  def test_content_of_every_change(self, _start_write_revisions):
+    """Every revision gets the content of the object after its change."""
+    market = self._create_market()
+    market_id = market.id
+    self.api.modify_object(market, {"title": "second title"})
+    market = all_models.Market.query.get(market_id)
+    self.api.modify_object(market, {"title": "third title"})
+
+    pending_revisions.flush_pending_revisions()
+    db.session.commit()
+
+    revisions = all_models.Revision.query.filter_by(
+        resource_type="Market", resource_id=market_id,
+    ).order_by(all_models.Revision.id)
+    self.assertEqual(["market", "second title", "third title"],
+                     [revision.content["title"] for revision in revisions])
+
+  def test_deleted_revisions(self, _start_write_revisions):
+    """Deleted objects get their revision from the change record."""
+    market = self._create_market()
+    market_id = market.id
+
+    self.assert200(self.api.delete(market))
+    self.assertEqual([], self._get_actions("Market", market_id))
+
+    pending_revisions.flush_pending_revisions()
+    db.session.commit()
+
+    self.assertEqual(["created", "deleted"],
+                     self._get_actions("Market", market_id))
+    revision = all_models.Revision.query.filter_by(
+        resource_type="Market", resource_id=market_id, action="deleted",
+    ).one()
+    self.assertEqual("market", revision.content["title"])
+
+  @mock.patch("ggrc.settings.ASYNC_REVISIONS_BATCH_SIZE", 1, create=True)
+  def test_drain(self, _start_write_revisions):
+    """Pending records are written in batches, one commit per batch."""
+    market = self._create_market()
+    self.api.modify_object(market, {"title": "new title"})
+    market_id = market.id
+
+    with mock.patch.object(db.session, "commit",
+                           wraps=db.session.commit) as commit:
+      revision_ids = pending_revisions.drain()
+
+    self.assertEqual(2, commit.call_count)
+    self.assertEqual(0, PendingRevision.query.count())
+    self.assertEqual(
+        {revision.id for revision in all_models.Revision.query.filter_by(
+            resource_type="Market", resource_id=market_id)},
+        revision_ids,
+    )
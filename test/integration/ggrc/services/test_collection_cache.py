@@ -0,0 +1,180 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests that cached collection entries are never served stale."""
+
+import mock
+
+from ggrc import db
+from ggrc.cache import generations
+from ggrc.models import all_models
+
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+from appengine import base
+
+
+@base.with_memcache
+class TestCollectionCache(TestCase):
+  """Writes through the REST API expire cached collection entries."""
+
+  NAMESPACE = "collection:markets"
+
+  def setUp(self):
+    super(TestCollectionCache, self).setUp()
+    self.client.get("/login")
+    self.api = Api()
+    self.market_id = factories.MarketFactory(title="Market").id
+    self.control_id = factories.ControlFactory().id
+
+  def _get_market(self):
+    """Get the market through the collection endpoint."""
+    response = self.api.get_collection(all_models.Market, self.market_id)
+    self.assert200(response)
+    markets = response.json["markets_collection"]["markets"]
+    return markets[0] if markets else None
+
+  def _get_cache_key(self, generation=None):
+    if generation is None:
+      generation = self._get_generation()
+    return generations.versioned_key(
+        "{}:{}".format(self.NAMESPACE, self.market_id), generation)
+
+  def _get_generation(self):
+    return generations.get_generations(
+        self.memcache_client, [self.NAMESPACE])[self.NAMESPACE]
+
+  def _map_control(self):
+    response = self.api.post(all_models.Relationship, {
+        "relationship": {
+            "source": {"id": self.market_id, "type": "Market"},
+            "destination": {"id": self.control_id, "type": "Control"},
+            "context": None,
+        },
+    })
+    self.assert201(response)
+    return all_models.Relationship.query.get(
+        response.json["relationship"]["id"])
+
+  @staticmethod
+  def _get_mapped_ids(market):
+    return [stub["id"] for stub in market["related_sources"] +
+            market["related_destinations"]]
+
+  def test_entry_is_cached(self):
+    """Collection reads store entries in the current generation."""
+    self._get_market()
+
+    cached = self.memcache_client.get(self._get_cache_key())
+    self.assertEqual("Market", cached["title"])
+
+  def test_put(self):
+    """Updated object is served after PUT."""
+    self._get_market()
+    response = self.api.put(all_models.Market.query.get(self.market_id),
+                            {"title": "New title"})
+    self.assert200(response)
+
+    self.assertEqual("New title", self._get_market()["title"])
+
+  def test_delete(self):
+    """Deleted object is not served after DELETE."""
+    self._get_market()
+    response = self.api.delete(all_models.Market.query.get(self.market_id))
+    self.assert200(response)
+
+    self.assertIsNone(self._get_market())
+
+  def test_new_mapping(self):
+    """Mapping a related object expires the cached entry."""
+    self.assertEqual([], self._get_mapped_ids(self._get_market()))
+    relationship = self._map_control()
+
+    self.assertEqual([relationship.id],
+                     self._get_mapped_ids(self._get_market()))
+
+  def test_deleted_mapping(self):
+    """Unmapping a related object expires the cached entry."""
+    relationship = self._map_control()
+    self.assertEqual([relationship.id],
+                     self._get_mapped_ids(self._get_market()))
+    self.assert200(self.api.delete(relationship))
+
+    self.assertEqual([], self._get_mapped_ids(self._get_market()))
+
+  def test_stale_entry_of_racing_reader(self):
+    """Entries added in a generation that was read before a commit expire.
+
+    A reader that reads the generation before a concurrent write is committed
+    adds its entry under that generation, which the write increments after
+    the commit.
+    """
+    self._get_market()
+    generation = self._get_generation()
+    response = self.api.put(all_models.Market.query.get(self.market_id),
+                            {"title": "New title"})
+    self.assert200(response)
+    self.memcache_client.set(self._get_cache_key(generation),
+                             dict(self._get_market(), title="Market"))
+
+    self.assertEqual("New title", self._get_market()["title"])
+
+  def _commit_title(self, title):
+    """Change the market title as a concurrent writer would."""
+    connection = db.engine.connect()
+    try:
+      table = all_models.Market.__table__
+      connection.execute(table.update().where(
+          table.c.id == self.market_id).values(title=title))
+    finally:
+      connection.close()
+    generations.increment(self.memcache_client, [self.NAMESPACE])
+
+  def _get_market_with_write(self, before_read):
+    """Get the market with a concurrent commit around the generation read."""
+    get_generations = generations.get_generations
+
+    def get_generations_with_write(client, namespaces):
+      namespaces = set(namespaces)
+      if self.NAMESPACE not in namespaces:
+        return get_generations(client, namespaces)
+      if before_read:
+        self._commit_title("New title")
+      result = get_generations(client, namespaces)
+      if not before_read:
+        self._commit_title("New title")
+      return result
+
+    with mock.patch("ggrc.cache.generations.get_generations",
+                    side_effect=get_generations_with_write):
+      return self._get_market()
+
+  def test_commit_before_generation_read(self):
+    """Data is read in a snapshot newer than the generations.
+
+    The request has already read the database when the generation is read,
+    so a commit in between must not be missing in the cached entry.
+    """
+    self._get_market()
+    self.assertEqual("New title",
+                     self._get_market_with_write(before_read=True)["title"])
+    self.assertEqual("New title", self._get_market()["title"])
+
+  def test_commit_after_generation_read(self):
+    """A commit between the generation read and the data load expires it."""
+    self._get_market()
+    self._get_market_with_write(before_read=False)
+    self.assertEqual("New title", self._get_market()["title"])
+
+  def test_other_namespaces_kept(self):
+    """Writes do not expire entries of unrelated resources."""
+    generation = generations.get_generations(
+        self.memcache_client, ["collection:controls"])["collection:controls"]
+    self.api.put(all_models.Market.query.get(self.market_id),
+                 {"title": "New title"})
+
+    self.assertEqual(generation, generations.get_generations(
+        self.memcache_client,
+        ["collection:controls"])["collection:controls"])
@@ -216,3 +216,50 @@ class TestCollectionPost(TestCase):
     relationships = models.Relationship.eager_query().all()
     self.assertEqual(len(relationships), 3)  # This should be 2
     rel1 = relationships[0]
+
+  def test_bulk_multiple(self):
+    """Test bulk collection post logs all revisions in one event."""
+    data = json.dumps([
+        {'services_test_mock_model': {'foo': 'bar1', 'context': None}},
+        {'services_test_mock_model': {'foo': 'bar2', 'context': None}},
+        {'services_test_mock_model': {'foo': 'bar3', 'context': None}},
+    ])
+    self.client.get("/login")
+    response = self.client.post(
+        self.mock_url() + "?__bulk=true",
+        content_type='application/json',
+        data=data,
+        headers=self.headers(),
+    )
+    self.assert200(response)
+    self.assertEqual(
+        ['bar1', 'bar2', 'bar3'],
+        [body['services_test_mock_model']['foo'] for _, body in response.json],
+    )
+    ids = [body['services_test_mock_model']['id'] for _, body in response.json]
+    revisions = models.Revision.query.filter(
+        models.Revision.resource_type == 'ServicesTestMockModel',
+        models.Revision.resource_id.in_(ids),
+    ).all()
+    self.assertEqual(3, len(revisions))
+    self.assertEqual({'created'}, {rev.action for rev in revisions})
+    self.assertEqual(1, len({rev.event_id for rev in revisions}))
+
+  def test_bulk_invalid_source(self):
+    """Test bulk collection post validates all sources before creating."""
+    data = json.dumps([
+        {'services_test_mock_model': {'foo': 'bar1', 'context': None}},
+        {'services_test_mock_model': {'foo': 'bar2'}},
+    ])
+    self.client.get("/login")
+    response = self.client.post(
+        self.mock_url() + "?__bulk=true",
+        content_type='application/json',
+        data=data,
+        headers=self.headers(),
+    )
+    self.assert400(response)
+    response = self.client.get(self.mock_url(), headers=self.headers())
+    self.assert200(response)
+    self.assertEqual(
+        0, len(response.json['test_model_collection']['test_model']))
@@ -16,6 +16,7 @@ from integration.ggrc.api_helper import Api
 from integration.ggrc.generator import ObjectGenerator
 from ggrc.models import all_models
 from ggrc import db
+from ggrc.services.common import Resource
 
 
 COLLECTION_ALLOWED = ["HEAD", "GET", "POST", "OPTIONS"]
@@ -75,6 +76,85 @@ class TestServices(TestCase):
     response = self.client.get(self.mock_url(), headers=self.headers())
     self.assert200(response)
 
+  def test_collection_get_stream(self):
+    """Streamed collection GET returns the same body as a regular one."""
+    for foo in ("a", "b", "c", "d", "e"):
+      self.mock_model(foo=foo)
+    response = self.client.get(self.mock_url(), headers=self.headers())
+    self.assert200(response)
+    with mock.patch.object(Resource, "STREAM_CHUNK_SIZE", 2):
+      streamed = self.client.get(
+          self.mock_url() + "?__stream=true", headers=self.headers())
+    self.assert200(streamed)
+    self.assertIn("Last-Modified", streamed.headers)
+    collection = response.json["test_model_collection"]
+    streamed_collection = streamed.json["test_model_collection"]
+    self.assertEqual(collection["test_model"],
+                     streamed_collection["test_model"])
+    self.assertEqual(len(streamed_collection["test_model"]), 5)
+
+  def test_empty_collection_get_stream(self):
+    response = self.client.get(
+        self.mock_url() + "?__stream=true", headers=self.headers())
+    self.assert200(response)
+    self.assertEqual(response.json["test_model_collection"]["test_model"], [])
+
+  def _get_cursor_page(self, url):
+    response = self.client.get(url, headers=self.headers())
+    self.assert200(response)
+    collection = response.json["test_model_collection"]
+    ids = [obj["id"] for obj in collection["test_model"]]
+    return ids, collection["paging"]
+
+  def test_collection_get_cursor(self):
+    """Cursor paging walks the collection in the default order."""
+    for foo in ("a", "b", "c", "d", "e"):
+      self.mock_model(foo=foo)
+    response = self.client.get(self.mock_url(), headers=self.headers())
+    expected_ids = [obj["id"] for obj in
+                    response.json["test_model_collection"]["test_model"]]
+
+    ids, paging = self._get_cursor_page(
+        self.mock_url() + "?__cursor=&__page_size=2&__skipped=true")
+    pages = [ids]
+    self.assertNotIn("prev", paging)
+    self.assertEqual(paging["skipped"], 0)
+    while "next" in paging:
+      ids, paging = self._get_cursor_page(paging["next"])
+      pages.append(ids)
+    self.assertEqual([len(page) for page in pages], [2, 2, 1])
+    self.assertEqual(sum(pages, []), expected_ids)
+    self.assertEqual(paging["skipped"], 4)
+
+    ids, paging = self._get_cursor_page(paging["prev"])
+    self.assertEqual(ids, pages[1])
+    self.assertIn("next", paging)
+    ids, paging = self._get_cursor_page(paging["prev"])
+    self.assertEqual(ids, pages[0])
+    self.assertNotIn("prev", paging)
+
+  def test_collection_get_invalid_cursor(self):
+    response = self.client.get(
+        self.mock_url() + "?__cursor=invalid", headers=self.headers())
+    self.assert400(response)
+
+  def test_collection_get_sparse_fields(self):
+    """Column-only __fields are loaded without full objects."""
+    for foo in ("a", "b"):
+      self.mock_model(foo=foo)
+    response = self.client.get(
+        self.mock_url() + "?__fields=id,foo,selfLink", headers=self.headers())
+    self.assert200(response)
+    expected = [{"id": obj["id"], "foo": obj["foo"]} for obj in
+                response.json["test_model_collection"]["test_model"]]
+    with mock.patch.object(Resource, "get_resources_from_database") as full:
+      response = self.client.get(
+          self.mock_url() + "?__fields=id,foo", headers=self.headers())
+    self.assert200(response)
+    self.assertFalse(full.called)
+    self.assertEqual(
+        expected, response.json["test_model_collection"]["test_model"])
+
   def test_missing_resource_get(self):
     response = self.client.get(self.mock_url("foo"), headers=self.headers())
     self.assert404(response)
@@ -277,6 +357,53 @@ class TestServices(TestCase):
     )
     check_response_409(response_date_invalid)
 
+  def _batch_put(self, updates):
+    return self.client.put(
+        self.mock_url() + "/batch",
+        data=json.dumps(updates),
+        headers=self.headers(),
+        content_type="application/json",
+    )
+
+  @mock.patch("ggrc.views.start_compute_attributes")
+  def test_batch_put_successful(self, _start_compute_attributes):
+    """Batch PUT applies changes to all objects."""
+    responses = [self._prepare_model_for_put(foo_param=foo)
+                 for foo in ("a", "b")]
+    response = self._batch_put([{
+        "id": resp.json["services_test_mock_model"]["id"],
+        "etag": resp.headers["Etag"],
+        "changes": {"foo": resp.json["services_test_mock_model"]["foo"] * 2},
+    } for resp in responses])
+    self.assert200(response)
+    self.assertEqual([200, 200], [status for status, _ in response.json])
+    self.assertEqual(
+        ["aa", "bb"],
+        [body["services_test_mock_model"]["foo"]
+         for _, body in response.json],
+    )
+
+  def test_batch_put_conflict(self):
+    """Batch PUT is not applied if any of the updates conflicts."""
+    first = self._prepare_model_for_put(foo_param="a")
+    second = self._prepare_model_for_put(foo_param="b")
+    response = self._batch_put([{
+        "id": first.json["services_test_mock_model"]["id"],
+        "etag": first.headers["Etag"],
+        "changes": {"foo": "aa"},
+    }, {
+        "id": second.json["services_test_mock_model"]["id"],
+        "etag": "invalid",
+        "changes": {"foo": "bb"},
+    }])
+    self.assertStatus(response, 409)
+    self.assertEqual([424, 409], [status for status, _ in response.json])
+    response = self.client.get(
+        urlparse(first.json["services_test_mock_model"]["selfLink"]).path,
+        headers=self.headers(),
+    )
+    self.assertEqual("a", response.json["services_test_mock_model"]["foo"])
+
   def test_options(self):
     mock = self.mock_model()
     response = self.client.open(
@@ -322,6 +449,65 @@ class TestServices(TestCase):
     self.assertStatus(response, 304)
     self.assertIn("Etag", response.headers)
 
+  def test_get_if_modified_since_missing(self):
+    """If-Modified-Since is checked only for existing objects."""
+    self.mock_model(foo="baz")
+    response = self.client.get(
+        self.mock_url(0),
+        headers=self.headers(
+            ("Accept", "application/json"),
+            ("If-Modified-Since", format_date_time(time.time() + 3600)),
+        ),
+    )
+    self.assert404(response)
+
+  def test_get_if_none_match_precedence(self):
+    """If-Modified-Since is ignored when If-None-Match doesn't match."""
+    mock1 = self.mock_model(foo="baz")
+    response = self.client.get(
+        self.mock_url(mock1.id),
+        headers=self.headers(
+            ("If-None-Match", '"stale"'),
+            ("If-Modified-Since", format_date_time(time.time() + 3600)),
+        ),
+    )
+    self.assert200(response)
+
+  def test_collection_get_if_none_match_precedence(self):
+    """Collection If-Modified-Since is ignored with a stale If-None-Match."""
+    self.mock_model(foo="baz")
+    response = self.client.get(
+        self.mock_url(),
+        headers=self.headers(
+            ("If-None-Match", '"stale"'),
+            ("If-Modified-Since", format_date_time(time.time() + 3600)),
+        ),
+    )
+    self.assert200(response)
+
+  def test_collection_get_if_none_match(self):
+    """Collection etag is valid until the collection type is modified."""
+    self.mock_model(foo="baz")
+    response = self.client.get(self.mock_url(), headers=self.headers())
+    self.assert200(response)
+    collection_etag = response.headers["Etag"]
+    response = self.client.get(
+        self.mock_url(),
+        headers=self.headers(("If-None-Match", collection_etag)),
+    )
+    self.assertStatus(response, 304)
+    self.assertEqual(collection_etag, response.headers["Etag"])
+
+    self.mock_model(foo="bar")
+    response = self.client.get(
+        self.mock_url(),
+        headers=self.headers(("If-None-Match", collection_etag)),
+    )
+    self.assert200(response)
+    self.assertNotEqual(collection_etag, response.headers["Etag"])
+    self.assertEqual(len(response.json["test_model_collection"]["test_model"]),
+                     2)
+
 
 class TestFilteringByRequest(TestCase):
   """Test filter query by request"""
@@ -12,7 +12,10 @@ from ggrc import models
 from ggrc.models import all_models
 from ggrc.views import do_reindex
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
+from ggrc.snapshotter.datastructures import Pair
 from ggrc.snapshotter.indexer import delete_records
+from ggrc.snapshotter.indexer import reindex_pairs
+from ggrc.utils import QueryCounter
 
 from integration.ggrc.snapshotter import SnapshotterBaseTestCase
 from integration.ggrc.models import factories
@@ -521,3 +524,27 @@ class TestSnapshotIndexing(SnapshotterBaseTestCase):
         Record.property == role_name.lower()
     ).values("subproperty", "content"))
     self.assertFalse(all_found_records)
+
+  def test_reindex_pairs(self):
+    """Reindex of snapshots loads revision content with the snapshots."""
+    with factories.single_commit():
+      markets = [factories.MarketFactory() for _ in range(3)]
+      audit = factories.AuditFactory()
+    snapshots = self._create_snapshots(audit, markets)
+    snapshot_ids = [snapshot.id for snapshot in snapshots]
+    pairs = [Pair.from_4tuple((s.parent_type, s.parent_id,
+                               s.child_type, s.child_id)) for s in snapshots]
+    delete_records(snapshot_ids)
+
+    def count_queries(reindexed_pairs):
+      db.session.expire_all()
+      with QueryCounter() as counter:
+        reindex_pairs(reindexed_pairs)
+        return counter.get
+
+    self.assertEqual(count_queries(pairs[:1]), count_queries(pairs))
+    indexed_ids = {key for key, in db.session.query(Record.key).filter(
+        Record.type == "Snapshot",
+        Record.property == "title",
+    )}
+    self.assertEqual(set(snapshot_ids), indexed_ids)
@@ -0,0 +1,106 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+ Benchmark for loading permissions of users with many ACL entries
+
+ Creates num_users people with num_acl_entries access control list entries
+ each and reports for every user:
+
+ - the time to load the permissions of the user from the database,
+ - the number of queries sent to the database while loading them.
+
+ Memcache is disabled during the benchmark, so all permission sections are
+ loaded from the database. The created people and entries are removed at the
+ end.
+
+ Run with the same settings as the integration tests:
+
+   GGRC_SETTINGS_MODULE="development" python benchmark_load_permissions.py
+"""
+
+import time
+
+import ggrc_basic_permissions
+from ggrc import db
+from ggrc import settings
+from ggrc.app import app
+from ggrc.models import all_models
+from ggrc.utils import QueryCounter
+
+num_users = 10
+num_acl_entries = 2000
+
+EMAIL_TEMPLATE = "benchmark.permissions.{}@example.com"
+
+
+def create_users():
+  """Create people with access control list entries on controls."""
+  role = all_models.AccessControlRole(
+      name="Benchmark role", object_type="Control",
+      read=True, update=True, delete=False)
+  db.session.add(role)
+  db.session.flush()
+  person_ids = []
+  for i in range(num_users):
+    result = db.session.execute(all_models.Person.__table__.insert().values(
+        email=EMAIL_TEMPLATE.format(i), name="Benchmark {}".format(i)))
+    person_ids.append(result.inserted_primary_key[0])
+  db.session.execute(all_models.AccessControlList.__table__.insert(), [
+      {"person_id": person_id, "ac_role_id": role.id,
+       "object_type": "Control", "object_id": object_id}
+      for person_id in person_ids
+      for object_id in range(1, num_acl_entries + 1)
+  ])
+  db.session.commit()
+  return role.id, person_ids
+
+
+def delete_users(role_id, person_ids):
+  acl = all_models.AccessControlList
+  person = all_models.Person
+  context = all_models.Context
+  acl.query.filter(acl.ac_role_id == role_id).delete()
+  context.query.filter(context.related_object_type == "Person",
+                       context.related_object_id.in_(person_ids)).delete(
+                           synchronize_session=False)
+  person.query.filter(person.id.in_(person_ids)).delete(
+      synchronize_session=False)
+  all_models.AccessControlRole.query.filter_by(id=role_id).delete()
+  db.session.commit()
+
+
+def load_permissions(person_id):
+  """Load permissions of a person and return time and number of queries."""
+  db.session.expunge_all()
+  user = all_models.Person.query.get(person_id)
+  with QueryCounter() as counter:
+    start = time.time()
+    permissions = ggrc_basic_permissions.load_permissions_for(user)
+    duration = time.time() - start
+  resources = permissions["read"]["Control"]["resources"]
+  return duration, counter.get, len(resources)
+
+
+def run_benchmark():
+  with app.app_context():
+    settings.MEMCACHE_MECHANISM = False
+    role_id, person_ids = create_users()
+    try:
+      # The first load creates personal contexts of the new users
+      for person_id in person_ids:
+        load_permissions(person_id)
+      durations = []
+      for person_id in person_ids:
+        duration, queries, resources = load_permissions(person_id)
+        durations.append(duration)
+        print "User {}: {} ACL resources, {:.3f}s, {} queries".format(
+            person_id, resources, duration, queries)
+      print "Average {:.3f}s, max {:.3f}s".format(
+          sum(durations) / len(durations), max(durations))
+    finally:
+      delete_users(role_id, person_ids)
+
+
+if __name__ == '__main__':
+  run_benchmark()
@@ -0,0 +1,73 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the index of context implications."""
+
+import mock
+
+import ggrc_basic_permissions
+from ggrc import settings
+from ggrc_basic_permissions import basic_roles
+from ggrc_basic_permissions import context_implications
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from integration.ggrc_basic_permissions.models \
+    import factories as rbac_factories
+
+
+@mock.patch.object(settings, "MEMCACHE_MECHANISM", False)
+class TestContextImplications(TestCase):
+  """Implied roles are resolved with the context implication index."""
+
+  def setUp(self):
+    super(TestContextImplications, self).setUp()
+    self.person = factories.PersonFactory()
+    self.public = factories.ContextFactory()
+    self.private = factories.ContextFactory()
+
+  def _program_contexts(self):
+    permissions = ggrc_basic_permissions.load_permissions_for(self.person)
+    return set(permissions["read"]["Program"]["contexts"])
+
+  @staticmethod
+  def _add_implication(source, context, source_scope, scope):
+    rbac_factories.ContextImplicationFactory(
+        source_context=source, context=context,
+        source_context_scope=source_scope, context_scope=scope)
+
+  def test_public_program(self):
+    """Readers get program roles in public program contexts only."""
+    rbac_factories.UserRoleFactory(person=self.person,
+                                   role=basic_roles.reader())
+    self._add_implication(None, self.public, None, "Program")
+
+    contexts = self._program_contexts()
+    self.assertIn(self.public.id, contexts)
+    self.assertNotIn(self.private.id, contexts)
+
+  def test_cycles(self):
+    """Cycles terminate and implied roles do not imply further roles."""
+    third = factories.ContextFactory()
+    rbac_factories.UserRoleFactory(person=self.person, context=self.public,
+                                   role=basic_roles.program_reader())
+    self._add_implication(self.public, self.private, "Program", "Program")
+    self._add_implication(self.private, self.public, "Program", "Program")
+    self._add_implication(self.private, third, "Program", "Program")
+
+    contexts = self._program_contexts()
+    self.assertIn(self.public.id, contexts)
+    self.assertIn(self.private.id, contexts)
+    self.assertNotIn(third.id, contexts)
+
+  def test_index_reloaded(self):
+    """The index is reloaded when implications are added."""
+    rbac_factories.UserRoleFactory(person=self.person,
+                                   role=basic_roles.reader())
+    self.assertNotIn(self.public.id, self._program_contexts())
+    index = context_implications.get_index()
+
+    self._add_implication(None, self.public, None, "Program")
+
+    self.assertIsNot(index, context_implications.get_index())
+    self.assertIn(self.public.id, self._program_contexts())
@@ -0,0 +1,156 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the sectioned cache of user permissions."""
+
+import mock
+
+import ggrc_basic_permissions
+from ggrc import db
+from ggrc import settings
+from ggrc.cache import generations
+from ggrc.models import all_models
+from ggrc_basic_permissions import basic_roles
+from ggrc_basic_permissions import permissions_cache
+
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from integration.ggrc_basic_permissions.models \
+    import factories as rbac_factories
+
+from appengine import base
+
+
+@base.with_memcache
+class TestPermissionsCache(TestCase):
+  """Changes reload only the affected permission sections."""
+
+  def setUp(self):
+    super(TestPermissionsCache, self).setUp()
+    self.person = factories.PersonFactory()
+    self.other = factories.PersonFactory()
+
+  @staticmethod
+  def _load(person):
+    """Load permissions of a person.
+
+    Returns:
+      tuple of the permissions and names of sections loaded from database
+    """
+    caches = []
+    section_cache = permissions_cache.SectionCache
+
+    def create_section_cache(*args):
+      caches.append(section_cache(*args))
+      return caches[-1]
+
+    with mock.patch.object(permissions_cache, "SectionCache",
+                           side_effect=create_section_cache):
+      permissions = ggrc_basic_permissions.load_permissions_for(person)
+    return permissions, caches[0].reloaded
+
+  def _load_uncached(self, person):
+    with mock.patch.object(settings, "MEMCACHE_MECHANISM", False):
+      return self._load(person)[0]
+
+  def _add_reader_role(self):
+    rbac_factories.UserRoleFactory(person=self.person,
+                                   role=basic_roles.reader())
+
+  def test_sections_cached(self):
+    """Sections are loaded from database only once."""
+    _, reloaded = self._load(self.person)
+    self.assertEqual(list(ggrc_basic_permissions.PERMISSION_SECTIONS),
+                     reloaded)
+
+    permissions, reloaded = self._load(self.person)
+    self.assertEqual([], reloaded)
+    self.assertEqual(self._load_uncached(self.person), permissions)
+
+  def test_user_role_change(self):
+    """A new user role reloads role sections of its user only."""
+    self._load(self.person)
+    self._load(self.other)
+    self._add_reader_role()
+
+    permissions, reloaded = self._load(self.person)
+    self.assertEqual(
+        ["user_roles", "implied_roles", "context_relationships"], reloaded)
+    self.assertIn("Program", permissions["read"])
+    self.assertEqual(self._load_uncached(self.person), permissions)
+    self.assertEqual([], self._load(self.other)[1])
+
+  def test_acl_change(self):
+    """A new access control list entry reloads only the ACL section."""
+    control = factories.ControlFactory()
+    role = factories.AccessControlRoleFactory(object_type="Control",
+                                              read=True)
+    self._load(self.person)
+    factories.AccessControlListFactory(object=control, ac_role_id=role.id,
+                                       person=self.person)
+
+    permissions, reloaded = self._load(self.person)
+    self.assertEqual(["access_control_list"], reloaded)
+    self.assertIn(control.id, permissions["read"]["Control"]["resources"])
+
+  def test_context_implication_change(self):
+    """Context implications reload only users with roles in their source."""
+    self._add_reader_role()
+    self._load(self.person)
+    self._load(self.other)
+    context = factories.ContextFactory()
+    rbac_factories.ContextImplicationFactory(
+        source_context=None, context=context,
+        source_context_scope=None, context_scope="Program")
+
+    permissions, reloaded = self._load(self.person)
+    self.assertEqual(["implied_roles", "context_relationships"], reloaded)
+    self.assertEqual(self._load_uncached(self.person), permissions)
+    self.assertEqual([], self._load(self.other)[1])
+
+  def test_bulk_change(self):
+    """Changes reported by bulk writes reload sections reading the type."""
+    self._load(self.person)
+    with mock.patch.object(permissions_cache.collection_versions,
+                           "get_marked_types",
+                           return_value={"AccessControlList"}):
+      factories.PersonFactory()
+
+    self.assertEqual(["access_control_list"], self._load(self.person)[1])
+
+  def test_commit_before_generation_read(self):
+    """Sections are loaded in a snapshot newer than their generations.
+
+    A commit after the transaction of the loading request has started, but
+    before the generations are read, must be part of the cached section.
+    """
+    control = factories.ControlFactory()
+    role = factories.AccessControlRoleFactory(object_type="Control",
+                                              read=True)
+    control_id, role_id, person_id = control.id, role.id, self.person.id
+    self._load(self.person)
+    namespace = permissions_cache.acl_namespace(person_id)
+    get_generations = generations.get_generations
+
+    def get_generations_with_write(client, namespaces):
+      namespaces = set(namespaces)
+      if namespace in namespaces:
+        connection = db.engine.connect()
+        try:
+          connection.execute(
+              all_models.AccessControlList.__table__.insert().values(
+                  person_id=person_id, ac_role_id=role_id,
+                  object_id=control_id, object_type="Control"))
+        finally:
+          connection.close()
+        generations.increment(client, [namespace])
+      return get_generations(client, namespaces)
+
+    with mock.patch("ggrc.cache.generations.get_generations",
+                    side_effect=get_generations_with_write):
+      permissions, _ = self._load(self.person)
+    self.assertIn(control_id, permissions["read"]["Control"]["resources"])
+
+    permissions, reloaded = self._load(self.person)
+    self.assertEqual([], reloaded)
+    self.assertIn(control_id, permissions["read"]["Control"]["resources"])
@@ -0,0 +1,148 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unittests for the bounded local cache."""
+
+import random
+import threading
+import unittest
+
+import mock
+
+from ggrc.cache import localcache
+from ggrc.cache.cache import resource
+
+
+class TestLocalCache(unittest.TestCase):
+  """Tests for LRU eviction, TTL expiry and counters of LocalCache."""
+
+  def setUp(self):
+    super(TestLocalCache, self).setUp()
+    entries = [resource("controls", "Control", "local")]
+    with mock.patch("ggrc.cache.localcache.all_cache_entries",
+                    return_value=entries):
+      self.cache = localcache.LocalCache(max_entries=3, max_bytes=0, ttl=0)
+    self.entries = self.cache.cache_entries["collection:controls"]
+
+  def _add(self, *ids, **kwargs):
+    self.cache.add("collection", "controls",
+                   {id_: {"id": id_, "title": "Control {}".format(id_)}
+                    for id_ in ids}, **kwargs)
+
+  def _get(self, *ids):
+    return self.cache.get("collection", "controls", {"ids": list(ids)})
+
+  def test_lru_eviction(self):
+    """Least recently used entries are evicted over max entries."""
+    self._add(1)
+    self._add(2)
+    self._add(3)
+    self.assertIsNotNone(self._get(1))
+    self._add(4)
+
+    self.assertIsNone(self._get(2))
+    self.assertEqual([1, 3, 4], self._get(1, 3, 4).keys())
+    self.assertEqual(1, self.entries.evictions)
+
+  def test_ttl_expiry(self):
+    """Entries expire after their time to live."""
+    with mock.patch("ggrc.cache.localcache.time.time", return_value=100):
+      self._add(1, expiration_time=10)
+      self._add(2)
+    with mock.patch("ggrc.cache.localcache.time.time", return_value=111):
+      self.assertIsNone(self._get(1))
+      self.assertIsNotNone(self._get(2))
+      self.assertEqual([2], self.entries.keys(111))
+    self.assertEqual(1, self.entries.expirations)
+
+  def test_counters(self):
+    """Hits and misses are counted for every key."""
+    self._add(1, 2)
+    self._get(1, 2)
+    self._get(3)
+
+    stats = self.cache.get_stats()
+    self.assertDictContainsSubset(
+        {"entries": 2, "hits": 2, "misses": 1, "evictions": 0},
+        stats["resources"]["collection:controls"])
+    self.assertEqual(2, stats["total"]["hits"])
+
+  def test_remove(self):
+    """Removed entries free their size."""
+    self._add(1, 2)
+    self.cache.remove("collection", "controls", {1: None, 5: None})
+
+    self.assertIsNone(self._get(1))
+    self.assertEqual(localcache.estimate_size(
+        {"id": 2, "title": "Control 2"}), self.entries.size)
+
+
+class TestLocalCacheBounds(unittest.TestCase):
+  """Tests that memory of LocalCacheEntries stays bounded."""
+
+  MAX_ENTRIES = 500
+  MAX_BYTES = 200 * 1024
+
+  def setUp(self):
+    super(TestLocalCacheBounds, self).setUp()
+    self.entries = localcache.LocalCacheEntries(
+        max_entries=self.MAX_ENTRIES, max_bytes=self.MAX_BYTES, ttl=60)
+
+  @staticmethod
+  def _make_value(key):
+    return {"id": key, "title": "x" * random.randint(10, 2000),
+            "tags": range(random.randint(0, 50))}
+
+  def _assert_bounded(self):
+    self.assertLessEqual(len(self.entries), self.MAX_ENTRIES)
+    self.assertLessEqual(self.entries.size, self.MAX_BYTES)
+    self.assertEqual(
+        sum(size for _, size, _ in self.entries.items.values()),
+        self.entries.size)
+
+  def test_synthetic_workload(self):
+    """Size stays within limits for a random mix of reads and writes."""
+    random.seed(42)
+    for now in xrange(20000):
+      key = random.randint(1, 10000)
+      if random.random() < 0.3:
+        self.entries.set(key, self._make_value(key), now)
+      else:
+        self.entries.get(key, now)
+      if now % 1000 == 0:
+        self._assert_bounded()
+
+    self._assert_bounded()
+    self.assertGreater(self.entries.evictions, 0)
+    self.assertGreater(self.entries.expirations, 0)
+    self.assertGreater(self.entries.hits, 0)
+
+  def test_oversized_value(self):
+    """Values larger than the limit are not cached."""
+    self.entries.set(1, "x" * (self.MAX_BYTES + 1), 0)
+
+    self.assertEqual(0, len(self.entries))
+    self.assertEqual(0, self.entries.size)
+
+  def test_concurrent_access(self):
+    """Limits and size accounting hold with concurrent writers."""
+    entries = [resource("controls", "Control", "local")]
+    with mock.patch("ggrc.cache.localcache.all_cache_entries",
+                    return_value=entries):
+      cache = localcache.LocalCache(max_entries=self.MAX_ENTRIES,
+                                    max_bytes=self.MAX_BYTES, ttl=60)
+    self.entries = cache.cache_entries["collection:controls"]
+
+    def worker(offset):
+      for key in xrange(offset, offset + 2000):
+        cache.add("collection", "controls", {key: self._make_value(key)})
+        cache.get("collection", "controls", {"ids": [key - 1]})
+
+    threads = [threading.Thread(target=worker, args=(i * 10000,))
+               for i in range(4)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self._assert_bounded()
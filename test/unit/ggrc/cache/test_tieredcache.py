@@ -0,0 +1,147 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unittests for the two tier memcache client."""
+
+import unittest
+
+from ggrc.cache import generations
+from ggrc.cache import tieredcache
+
+
+class LocalMemcacheClient(object):
+  """Dictionary based stand-in for the App Engine memcache client."""
+
+  def __init__(self):
+    self.data = {}
+    self.calls = 0
+
+  def get(self, key):
+    self.calls += 1
+    return self.data.get(key)
+
+  def get_multi(self, keys):
+    self.calls += 1
+    return {key: self.data[key] for key in keys if key in self.data}
+
+  def add(self, key, value, time=0):  # pylint: disable=unused-argument
+    self.calls += 1
+    if key in self.data:
+      return False
+    self.data[key] = value
+    return True
+
+  def set(self, key, value, time=0):  # pylint: disable=unused-argument
+    self.calls += 1
+    self.data[key] = value
+    return True
+
+  def delete(self, key, seconds=0):  # pylint: disable=unused-argument
+    self.calls += 1
+    return 2 if self.data.pop(key, None) is not None else 1
+
+  def delete_multi(self, keys, seconds=0):  # pylint: disable=unused-argument
+    self.calls += 1
+    for key in keys:
+      self.data.pop(key, None)
+    return True
+
+  def incr(self, key, delta=1, initial_value=None):
+    self.calls += 1
+    if key not in self.data:
+      if initial_value is None:
+        return None
+      self.data[key] = initial_value
+    self.data[key] += delta
+    return self.data[key]
+
+  def offset_multi(self, mapping, initial_value=None):
+    self.calls += 1
+    for key, delta in mapping.items():
+      self.data[key] = self.data.get(key, initial_value) + delta
+    return {key: self.data[key] for key in mapping}
+
+  def flush_all(self):
+    self.data.clear()
+    return True
+
+
+class TestTieredClient(unittest.TestCase):
+  """Tests for reads and invalidations of TieredClient."""
+
+  KEY = "collection:controls:1"
+
+  def setUp(self):
+    super(TestTieredClient, self).setUp()
+    tieredcache.TieredClient.l1 = None
+    tieredcache.TieredClient.versions.clear()
+    tieredcache.TieredClient.last_sync.clear()
+    self.memcache = LocalMemcacheClient()
+    self.client = tieredcache.TieredClient(
+        self.memcache, max_entries=100, max_bytes=0, ttl=0, sync_interval=0)
+
+  def test_read_through(self):
+    """Reads that miss L1 fill it from memcache."""
+    self.memcache.set(self.KEY, {"id": 1})
+    self.assertEqual({"id": 1}, self.client.get(self.KEY))
+
+    # Remove the value behind the client's back, L1 still has it
+    self.memcache.data.pop(self.KEY)
+    self.assertEqual({"id": 1}, self.client.get(self.KEY))
+    self.assertEqual(1, self.client.l1.hits)
+
+  def test_hits_skip_memcache_reads(self):
+    """A batch of L1 hits costs a single stamp check."""
+    keys = ["collection:controls:{}".format(i) for i in range(10)]
+    for key in keys:
+      self.client.add(key, {"key": key})
+    calls = self.memcache.calls
+
+    self.assertEqual(10, len(self.client.get_multi(keys)))
+    self.assertEqual(calls + 1, self.memcache.calls)
+
+  def test_local_invalidation(self):
+    """Deletes clear both tiers."""
+    self.client.add(self.KEY, {"id": 1})
+    self.client.delete_multi([self.KEY])
+
+    self.assertIsNone(self.client.get(self.KEY))
+    self.assertNotIn(self.KEY, self.memcache.data)
+
+  def test_remote_invalidation(self):
+    """Invalidations of other instances are noticed via version stamps."""
+    self.client.add(self.KEY, {"id": 1})
+    self.assertEqual({"id": 1}, self.client.get(self.KEY))
+
+    # Another instance replaces the entry and bumps the stamp
+    self.memcache.set(self.KEY, {"id": 1, "title": "new"})
+    self.memcache.incr(generations.GENERATION_PREFIX + "collection:controls")
+
+    self.assertEqual({"id": 1, "title": "new"}, self.client.get(self.KEY))
+
+  def test_other_resources_kept(self):
+    """Invalidation of a resource keeps L1 entries of other resources."""
+    other_key = "collection:people:1"
+    self.client.add(self.KEY, {"id": 1})
+    self.client.add(other_key, {"id": 1})
+    self.memcache.incr(generations.GENERATION_PREFIX + "collection:controls")
+
+    self.client.get_multi([self.KEY, other_key])
+    self.assertEqual(1, self.client.l1.hits)
+    self.assertEqual(1, self.client.l1.misses)
+
+  def test_versioned_keys_skip_sync(self):
+    """Entries of a generation are read from L1 without stamp checks."""
+    key = generations.versioned_key(self.KEY, 1)
+    self.client.add(key, {"id": 1})
+    calls = self.memcache.calls
+
+    self.assertEqual({"id": 1}, self.client.get(key))
+    self.assertEqual(calls, self.memcache.calls)
+
+  def test_other_keys_pass_through(self):
+    """Keys that are not collection entries are not stored in L1."""
+    self.client.set("permissions:list", {"a"})
+
+    self.assertEqual({"a"}, self.client.get("permissions:list"))
+    self.assertEqual(0, len(self.client.l1))
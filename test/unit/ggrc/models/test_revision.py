@@ -10,6 +10,7 @@ import ddt
 import mock
 
 from ggrc.models import all_models
+from ggrc.models.types import CompressedJsonType
 
 
 @ddt.ddt
@@ -162,3 +163,55 @@ class TestCheckPopulatedContent(unittest.TestCase):
     with mock.patch("ggrc.access_control.role.get_custom_roles_for",
                     return_value={}):
       self.assertEqual(revision.content["reference_url"], expected)
+
+
+class TestContentDecoding(unittest.TestCase):
+  """Unittests for compressed revision content."""
+
+  def setUp(self):
+    super(TestContentDecoding, self).setUp()
+    obj = mock.Mock()
+    obj.id = 1
+    obj.__class__.__name__ = "Control"
+    self.revision = all_models.Revision(obj, 123, "created", {})
+
+  def _load(self, raw_content, content_format):
+    """Set stored values as if the revision has been loaded."""
+    # pylint: disable=protected-access
+    self.revision._raw_content = raw_content
+    self.revision.content_format = content_format
+
+  def test_decode_formats(self):
+    """Both plain and compressed stored content can be decoded."""
+    content = {"title": u"Control \u2713", "id": 1}
+    compressed = CompressedJsonType().process_bind_param(content, None)
+    plain = '{"title": "Control \\u2713", "id": 1}'
+    self.assertEqual(content, CompressedJsonType.decode(
+        compressed, CompressedJsonType.ZLIB))
+    self.assertEqual(content, CompressedJsonType.decode(
+        plain, CompressedJsonType.PLAIN))
+
+  def test_lazy_decoding(self):
+    """Stored content is decoded on first access only."""
+    content = {"title": "Control"}
+    self._load(CompressedJsonType().process_bind_param(content, None),
+               CompressedJsonType.ZLIB)
+    with mock.patch("ggrc.models.revision.CompressedJsonType.decode",
+                    wraps=CompressedJsonType.decode) as decode:
+      self.assertEqual(0, decode.call_count)
+      # pylint: disable=protected-access
+      self.assertEqual(content, self.revision._content)
+      self.assertEqual(content, self.revision._content)
+      self.assertEqual(1, decode.call_count)
+
+      self._load('{"title": "Plain"}', CompressedJsonType.PLAIN)
+      self.assertEqual({"title": "Plain"}, self.revision._content)
+      self.assertEqual(2, decode.call_count)
+
+  def test_set_content(self):
+    """Setting content stores it in the current format."""
+    self._load('{"title": "Plain"}', CompressedJsonType.PLAIN)
+    self.revision.content = {"title": "New"}
+    self.assertEqual(CompressedJsonType.ZLIB, self.revision.content_format)
+    # pylint: disable=protected-access
+    self.assertEqual({"title": "New"}, self.revision._content)
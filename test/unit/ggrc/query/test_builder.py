@@ -60,3 +60,25 @@ class TestQueryHelper(unittest.TestCase):
 
     for expected_result, expression in expressions:
       self.assertEqual(expected_result, helper._expression_keys(expression))
+
+  @mock.patch("ggrc.query.builder.permissions.is_allowed_read_many")
+  def test_filter_readable_ids(self, is_allowed_read_many):
+    """Read conditions are checked in chunks and keep the order of ids."""
+    # pylint: disable=protected-access
+    objects = {id_: mock.MagicMock(id=id_) for id_ in range(1, 6)}
+    object_class = mock.MagicMock()
+    object_class.eager_query.return_value.filter.side_effect = [
+        [objects[2], objects[5]],
+        [objects[1], objects[3]],
+        [objects[4]],
+    ]
+    is_allowed_read_many.side_effect = lambda objs: [
+        obj.id != 3 for obj in objs]
+
+    with mock.patch.object(builder.QueryHelper,
+                           "CONDITION_CHECK_CHUNK_SIZE", 2):
+      readable = builder.QueryHelper._filter_readable_ids(
+          object_class, [5, 2, 3, 1, 4])
+
+    self.assertEqual([5, 2, 1, 4], readable)
+    self.assertEqual(3, is_allowed_read_many.call_count)
@@ -0,0 +1,49 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for metrics of the permissions subsystem."""
+
+import unittest
+
+from ggrc.rbac import metrics
+
+
+class TestMetrics(unittest.TestCase):
+  """Tests for counters and histograms."""
+
+  def test_histogram(self):
+    """Values are counted in the first bucket with a bound not lower."""
+    histogram = metrics.Histogram((1, 10))
+    for value in (0.5, 1, 5, 20):
+      histogram.observe(value)
+
+    self.assertEqual({
+        "count": 4,
+        "sum": 26.5,
+        "max": 20,
+        "avg": 6.625,
+        "buckets": {"<=1": 2, "<=10": 1, "+Inf": 1},
+    }, histogram.as_dict())
+
+  def test_metrics(self):
+    """Counters and histograms are reported by name and can be reset."""
+    registry = metrics.Metrics()
+    registry.increment("section_hit:acl")
+    registry.increment("section_hit:acl")
+    registry.observe_time("load", 0.002)
+    registry.observe_size("permissions", {"read": {"Control": {
+        "resources": [1, 2, 3], "contexts": [None],
+    }}})
+
+    result = registry.as_dict()
+    self.assertEqual({"section_hit:acl": 2}, result["counters"])
+    self.assertEqual(1, result["histograms"]["time:load"]["buckets"]["<=5"])
+    self.assertEqual(4, result["histograms"]["size:permissions"]["sum"])
+
+    registry.reset()
+    self.assertEqual({}, registry.as_dict()["counters"])
+
+  def test_get_size(self):
+    """Sizes count items of lists in nested dicts and tuples."""
+    self.assertEqual(3, metrics.get_size(({"a": [1, 2]}, {"b": {"c": [3]}})))
+    self.assertEqual(0, metrics.get_size({"a": 1}))
@@ -0,0 +1,129 @@
+# Copyright (C) 2017 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for compiled permission checks."""
+
+import unittest
+
+import mock
+
+from ggrc.rbac import permissions_provider
+from ggrc.rbac.permissions_provider import CompiledPermissions
+from ggrc.rbac.permissions_provider import Permission
+
+
+class Instance(object):
+  """Object with the attributes read by permission checks."""
+  # pylint: disable=too-few-public-methods
+
+  def __init__(self, id_, context_id=None, type_="Control", **kwargs):
+    self.id = id_  # pylint: disable=invalid-name
+    self.type = type_
+    self._inflector = mock.Mock(model_singular=type_)
+    self.context = mock.Mock(id=context_id) if context_id else None
+    self.__dict__.update(kwargs)
+
+
+class TestCompiledPermissions(unittest.TestCase):
+  """Tests for CompiledPermissions."""
+
+  def test_resources_and_contexts(self):
+    """Actions are allowed on listed resources and in listed contexts."""
+    compiled = CompiledPermissions({
+        "read": {"Control": {"resources": [1], "contexts": [5]}},
+    })
+
+    self.assertTrue(compiled.is_allowed_for(Instance(1), "read"))
+    self.assertTrue(compiled.is_allowed_for(Instance(2, 5), "read"))
+    self.assertFalse(compiled.is_allowed_for(Instance(2, 6), "read"))
+    self.assertFalse(compiled.is_allowed_for(Instance(1), "update"))
+    self.assertFalse(compiled.is_allowed_for(
+        Instance(1, type_="Market"), "read"))
+
+  def test_all_contexts(self):
+    compiled = CompiledPermissions({"read": {"Control": {"contexts": [None]}}})
+
+    self.assertTrue(compiled.is_allowed_for(Instance(2, 6), "read"))
+    self.assertTrue(compiled.match(Permission("read", "Control", 2, 6)))
+
+  def test_conditions(self):
+    """Conditions replace context checks of the contexts they apply to."""
+    owner = object()
+    compiled = CompiledPermissions({
+        "update": {"Control": {
+            "contexts": [None, 5],
+            "conditions": {
+                None: [{"condition": "is", "terms": {
+                    "property_name": "owner.person", "value": owner}}],
+                5: [{"condition": "contains", "terms": {
+                    "list_property": "assignees", "value": owner}}],
+            },
+        }},
+    })
+
+    self.assertTrue(compiled.is_allowed_for(
+        Instance(1, owner=mock.Mock(person=owner)), "update"))
+    self.assertFalse(compiled.is_allowed_for(
+        Instance(1, owner=mock.Mock(person=None)), "update"))
+    self.assertTrue(compiled.is_allowed_for(
+        Instance(1, 5, owner=mock.Mock(person=None), assignees=[owner]),
+        "update"))
+
+  def test_partial_conditions(self):
+    """Conditions without a compiler get the checked action."""
+    compiled = CompiledPermissions({
+        "delete": {"Control": {
+            "contexts": [None],
+            "conditions": {None: [{"condition": "forbid", "terms": {
+                "blacklist": {"delete": ["Control"]}}}]},
+        }},
+    })
+
+    self.assertFalse(compiled.is_allowed_for(Instance(1), "delete"))
+
+  def test_admin(self):
+    """Admin permission allows everything unless it has conditions."""
+    compiled = CompiledPermissions({
+        "__GGRC_ADMIN__": {"__GGRC_ALL__": {"contexts": [0]}},
+    })
+    self.assertTrue(compiled.is_admin)
+    self.assertTrue(compiled.is_allowed_for(Instance(1, 5), "delete"))
+
+    compiled = CompiledPermissions({
+        "__GGRC_ADMIN__": {"__GGRC_ALL__": {
+            "contexts": [0],
+            "conditions": {None: [{"condition": "forbid", "terms": {
+                "blacklist": {"delete": ["Control"]}}}]},
+        }},
+    })
+    self.assertFalse(compiled.is_allowed_for(Instance(1), "delete"))
+    self.assertTrue(compiled.is_allowed_for(Instance(1), "update"))
+
+  def test_admin_contexts(self):
+    """Context admin permission applies to all types in the context."""
+    compiled = CompiledPermissions({
+        "read": {"__GGRC_ALL__": {"contexts": [5]}},
+    })
+
+    self.assertFalse(compiled.is_admin)
+    self.assertTrue(compiled.match(Permission("read", "Control", None, 5)))
+    self.assertFalse(compiled.match(Permission("read", "Control", None, 6)))
+
+  @mock.patch.object(permissions_provider, "preload_endpoints")
+  def test_preload(self, preload_endpoints):
+    """Endpoints are preloaded only for instances checked by conditions."""
+    compiled = CompiledPermissions({
+        "read": {"Relationship": {
+            "resources": [1],
+            "conditions": {None: [{"condition": "relationship", "terms": {
+                "property_name": "source,destination", "action": "read"}}]},
+        }},
+    })
+    checked = Instance(2, type_="Relationship")
+
+    compiled.preload([Instance(1, type_="Relationship"), checked,
+                      Instance(3)], "read")
+
+    self.assertEqual(
+        [(checked, "destination"), (checked, "source")],
+        sorted(preload_endpoints.call_args[0][0]))